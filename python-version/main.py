@@ -6,6 +6,8 @@ from datetime import datetime
 from membit_client import MembitClient
 from gemini_client import GeminiClient
 from twitter_client import TwitterClient
+from tweet_length import weighted_length, MAX_WEIGHTED_LENGTH
+from membit_fanout import parse_queries, fan_out, merge_ranked, format_entries
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
@@ -92,7 +94,20 @@ def create_and_post_tweet():
                 transient=True
             ) as progress:
                 task = progress.add_task("📊 Fetching trending data from Membit...", total=None)
-                trending_data = membit.get_trending_topics()
+                
+                # Every configured query in parallel, merged, deduplicated and ranked
+                queries = parse_queries(os.getenv('MEMBIT_QUERIES', 'Web3'))
+                results = fan_out(
+                    lambda query: membit.get_trending_topics(query=query, limit=10),
+                    queries,
+                    max_workers=int(os.getenv('MEMBIT_CONCURRENCY', 4)),
+                    timeout=35
+                )
+                topics = merge_ranked(results, 'cluster', int(os.getenv('MEMBIT_TOP_CLUSTERS', 10)))
+                if not topics:
+                    errors = [error for _, _, _, error in results if error is not None]
+                    raise errors[0] if errors else Exception("No trending data available")
+                trending_data = format_entries(topics)
             
             console.print("✅ [green]Trending data fetched[/green]")
             
@@ -131,8 +146,8 @@ Variasikan topik setiap kali - jangan selalu pilih topik yang sama!"""
             tweet_text = tweet_text.strip().strip('"').strip("'")
             
             # Validate tweet length
-            tweet_length = len(tweet_text)
-            if tweet_length > 280:
+            tweet_length = weighted_length(tweet_text)
+            if tweet_length > MAX_WEIGHTED_LENGTH:
                 console.print(f"⚠️  [yellow]Tweet too long ({tweet_length} chars), regenerating...[/yellow]\n")
                 continue  # Retry with new generation
             
@@ -148,8 +163,8 @@ Variasikan topik setiap kali - jangan selalu pilih topik yang sama!"""
             stats_table = Table(show_header=False, box=None, padding=(0, 1), show_edge=False)
             stats_table.add_column(style="dim")
             stats_table.add_column()
-            stats_table.add_row("📏 Length:", f"[cyan]{tweet_length}[/cyan] / 280 characters")
-            stats_table.add_row("📊 Status:", "[green]✓ Valid[/green]" if tweet_length <= 280 else "[red]✗ Too long[/red]")
+            stats_table.add_row("📏 Length:", f"[cyan]{tweet_length}[/cyan] / {MAX_WEIGHTED_LENGTH} characters")
+            stats_table.add_row("📊 Status:", "[green]✓ Valid[/green]" if tweet_length <= MAX_WEIGHTED_LENGTH else "[red]✗ Too long[/red]")
             console.print(stats_table)
             
             console.print("✅ [green]Tweet generated[/green]\n")
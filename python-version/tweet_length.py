@@ -0,0 +1,205 @@
+"""
+Tweet length as Twitter counts it (twitter-text v3)
+
+Kept in two identical copies, web-version/tweet_length.py and
+python-version/tweet_length.py, since each version is deployed on its own.
+Change both together (tests/test_tweet_length.py checks they match).
+"""
+import re
+import unicodedata
+from bisect import bisect_right
+
+# twitter-text v3 configuration
+MAX_WEIGHTED_LENGTH = 280
+SCALE = 100
+DEFAULT_WEIGHT = 200
+URL_LENGTH = 23
+
+# Code point ranges weighted 100 (1 char), everything else is 200 (2 chars)
+_LIGHT_RANGES = [
+    (0x0000, 0x10FF),   # Latin, Greek, Cyrillic, Hebrew, Arabic, Indic, Thai, ...
+    (0x2000, 0x200D),   # Spaces and zero width chars
+    (0x2010, 0x201F),   # Dashes and quotes
+    (0x2032, 0x2037),   # Primes
+]
+
+# Code point ranges that start an emoji (whole emoji sequence is weighted 200)
+_EMOJI_RANGES = [
+    (0x203C, 0x203C), (0x2049, 0x2049), (0x2122, 0x2122), (0x2139, 0x2139),
+    (0x2194, 0x21AA), (0x231A, 0x23FF), (0x24C2, 0x24C2), (0x25AA, 0x25FE),
+    (0x2600, 0x27BF), (0x2934, 0x2935), (0x2B05, 0x2B55), (0x3030, 0x3030),
+    (0x303D, 0x303D), (0x3297, 0x3299), (0x1F000, 0x1FAFF),
+]
+
+# Code points that extend the previous emoji instead of starting a new char
+_EMOJI_MODIFIER_RANGES = [
+    (0x200D, 0x200D),    # Zero width joiner (followed by another emoji)
+    (0x20E3, 0x20E3),    # Combining enclosing keycap
+    (0xFE0E, 0xFE0F),    # Variation selectors
+    (0x1F3FB, 0x1F3FF),  # Skin tone modifiers
+    (0xE0020, 0xE007F),  # Tag sequences (subdivision flags)
+]
+
+_REGIONAL_INDICATOR = (0x1F1E6, 0x1F1FF)
+_KEYCAP_BASES = frozenset('0123456789#*')
+
+
+def _build_table(ranges):
+    """Precompute sorted (starts, ends) arrays for bisect lookups"""
+    ranges = sorted(ranges)
+    return [start for start, _ in ranges], [end for _, end in ranges]
+
+
+_LIGHT_TABLE = _build_table(_LIGHT_RANGES)
+_EMOJI_TABLE = _build_table(_EMOJI_RANGES)
+_MODIFIER_TABLE = _build_table(_EMOJI_MODIFIER_RANGES)
+
+
+def _in_table(table, cp):
+    starts, ends = table
+    idx = bisect_right(starts, cp) - 1
+    return idx >= 0 and cp <= ends[idx]
+
+
+# URLs with scheme, or bare domains with a common TLD (t.co wraps both)
+_URL_RE = re.compile(
+    r'(?:https?://[^\s<>"]+'
+    r'|(?<![\w@#$.-])(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+'
+    r'(?:com|org|net|io|ai|xyz|co|app|dev|gg|me|finance|fi|so|to|us|uk|info|news|tech|network|exchange|money|link|id)'
+    r'(?::\d+)?(?:/[^\s<>"]*)?)',
+    re.IGNORECASE
+)
+_URL_TRAILING_PUNCT = '.,;:!?)]}\'"'
+
+
+def _find_urls(text):
+    """Return (start, end) spans of URLs Twitter would shorten"""
+    spans = []
+    for match in _URL_RE.finditer(text):
+        start, end = match.span()
+        while end > start and text[end - 1] in _URL_TRAILING_PUNCT:
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
+
+
+def _weighted_run(text, start, end):
+    """Weighted length (scaled) of a run of non-ASCII text[start:end]"""
+    weight = 0
+    i = start
+    while i < end:
+        char = text[i]
+        cp = ord(char)
+
+        # Keycap sequences (1️⃣, #️⃣) count as a single emoji
+        if char in _KEYCAP_BASES:
+            j = i + 1
+            while j < end and ord(text[j]) in (0xFE0F, 0x20E3):
+                j += 1
+            if ord(text[j - 1]) == 0x20E3:
+                weight += DEFAULT_WEIGHT
+            else:
+                weight += SCALE + DEFAULT_WEIGHT * (j - i - 1)
+            i = j
+            continue
+
+        if _REGIONAL_INDICATOR[0] <= cp <= _REGIONAL_INDICATOR[1]:
+            # Flags are a pair of regional indicators
+            weight += DEFAULT_WEIGHT
+            i += 1
+            if i < end and _REGIONAL_INDICATOR[0] <= ord(text[i]) <= _REGIONAL_INDICATOR[1]:
+                i += 1
+            continue
+
+        if _in_table(_EMOJI_TABLE, cp) or (cp in (0x00A9, 0x00AE) and i + 1 < end and ord(text[i + 1]) == 0xFE0F):
+            # Consume the whole emoji sequence (modifiers, ZWJ + next emoji)
+            weight += DEFAULT_WEIGHT
+            i += 1
+            while i < end:
+                ncp = ord(text[i])
+                if ncp == 0x200D and i + 1 < end:
+                    i += 2
+                elif _in_table(_MODIFIER_TABLE, ncp):
+                    i += 1
+                else:
+                    break
+            continue
+
+        weight += SCALE if cp <= 0x10FF or _in_table(_LIGHT_TABLE, cp) else DEFAULT_WEIGHT
+        i += 1
+    return weight
+
+
+def _weighted_segment(text, start, end):
+    """Weighted length (scaled) of text[start:end] without URLs"""
+    weight = 0
+    pos = start
+    for match in _NON_ASCII_RE.finditer(text, start, end):
+        run_start, run_end = match.span()
+        # Keep a keycap base (digit, #, *) together with its FE0F/20E3
+        if run_start > pos and text[run_start - 1] in _KEYCAP_BASES and ord(text[run_start]) in (0xFE0F, 0x20E3):
+            run_start -= 1
+        # ASCII chars always weigh 1
+        weight += (run_start - pos) * SCALE
+        weight += _weighted_run(text, run_start, run_end)
+        pos = run_end
+    weight += (end - pos) * SCALE
+    return weight
+
+
+def weighted_length(text):
+    """
+    Count tweet length the way Twitter does (twitter-text v3)
+    - Text is NFC normalized first
+    - Every URL counts as 23 characters
+    - Emoji (including ZWJ sequences, flags and keycaps) count as 2
+    - CJK and other characters outside the light ranges count as 2
+    """
+    if not text:
+        return 0
+
+    text = unicodedata.normalize('NFC', text)
+
+    # Fast path: plain ASCII without anything that could be a URL
+    if text.isascii() and '.' not in text:
+        return len(text)
+
+    weight = 0
+    pos = 0
+    for start, end in _find_urls(text):
+        weight += _weighted_segment(text, pos, start)
+        weight += URL_LENGTH * SCALE
+        pos = end
+    weight += _weighted_segment(text, pos, len(text))
+
+    return weight // SCALE
+
+
+def is_valid_length(text, max_length=MAX_WEIGHTED_LENGTH):
+    """Check if tweet fits into max_length weighted characters"""
+    return weighted_length(text) <= max_length
+
+
+if __name__ == '__main__':
+    # Benchmark against plain len()
+    import timeit
+
+    samples = {
+        'ascii': 'Ethereum L2 activity keeps climbing as fees drop below a cent. Builders are shipping faster than ever #Web3 #Layer2',
+        'url': 'New Membit report on restaking risk is out, read it here https://membit.ai/reports/restaking-2025 #DeFi',
+        'emoji': '🚀 Bitcoin ETF inflows hit a new weekly record 📈 👨‍👩‍👧 families are stacking sats 🇮🇩 #Bitcoin #Crypto',
+        'cjk': '以太坊二层网络的活跃度持续上升，手续费降到一美分以下。#Web3',
+    }
+
+    number = 20000
+    print('=' * 60)
+    print('Tweet length benchmark (%d iterations)' % number)
+    print('=' * 60)
+    for name, sample in samples.items():
+        t_len = timeit.timeit(lambda: len(sample), number=number)
+        t_weighted = timeit.timeit(lambda: weighted_length(sample), number=number)
+        print(f'{name:6} len={len(sample):3} weighted={weighted_length(sample):3}  '
+              f'len(): {t_len / number * 1e6:6.2f}us  weighted_length(): {t_weighted / number * 1e6:6.2f}us')
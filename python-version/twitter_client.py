@@ -1,4 +1,5 @@
 import tweepy
+from tweet_length import weighted_length, MAX_WEIGHTED_LENGTH
 
 class TwitterClient:
     """Client for Twitter API v2"""
@@ -16,8 +17,9 @@ class TwitterClient:
         """Post a tweet"""
         try:
             # Validate tweet length
-            if len(text) > 280:
-                raise ValueError(f"Tweet too long: {len(text)} characters (max 280)")
+            tweet_length = weighted_length(text)
+            if tweet_length > MAX_WEIGHTED_LENGTH:
+                raise ValueError(f"Tweet too long: {tweet_length} characters (max {MAX_WEIGHTED_LENGTH})")
             
             if len(text) == 0:
                 raise ValueError("Tweet cannot be empty")
@@ -1,103 +1,95 @@
 import os
-import sys
-from flask import Flask, render_template, jsonify, request, session
-from flask_socketio import SocketIO, emit
-from flask_cors import CORS
+from pathlib import Path
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-import threading
-import time
-from functools import wraps
-from membit_client import MembitClient
-from gemini_client import GeminiClient
-from twitter_client import TwitterClient
-from image_generator import ImageGenerator
-from auth_manager import AuthManager
-
-# Suppress Gemini warnings
-os.environ['GRPC_VERBOSITY'] = 'ERROR'
-os.environ['GLOG_minloglevel'] = '2'
 
 # Load environment variables from .env file
-from pathlib import Path
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path, override=True)
 
+# Green thread modes (eventlet/gevent) must patch the stdlib before other imports
+import server_mode
+server_mode.patch()
+from server_mode import run_blocking
+
+from flask import Flask, Response, jsonify, request, session
+from flask_socketio import SocketIO, emit
+from flask_cors import CORS
+from datetime import timedelta
+import threading
+import json
+import hashlib
+from functools import wraps
+from membit_archive import replay_runs, parse_time
+from auth_manager import AuthManager, BusyError
+from login_limiter import LoginLimiter
+from prompt_templates import TemplateError, compile_template
+from membit_fanout import parse_queries
+from draft_queue import OPEN_STATUSES
+from tweet_length import weighted_length, MAX_WEIGHTED_LENGTH
+from log_store import LogStore, format_entry
+from emitter import SocketEmitter
+from pipeline_worker import PipelineWorker
+from bot_state import (
+    settings, draft_queue, membit_archive, trace_store, run_history,
+    bot_status, bot_config, prompt_store, load_prompt_config, format_duration
+)
+import metrics
+from tracing import waterfall
+from timeseries import TimeSeriesStore
+from http_cache import CachedJson, compress_response, etag_matches, not_modified, BOOT_ID
+import frontend_static
+
+# PIPELINE_WORKER=1: the scheduler and pipeline run in a worker process. This
+# process then never imports pipeline (its stores belong to the worker), it
+# reads the shared on-disk stores and sends changes to the worker as commands.
+USE_PIPELINE_WORKER = os.getenv('PIPELINE_WORKER', '0') == '1'
+if not USE_PIPELINE_WORKER:
+    import pipeline
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
 CORS(app, supports_credentials=True)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
-
-# Initialize Auth Manager
-auth_manager = AuthManager()
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=server_mode.ASYNC_MODE)
 
-# Global variables
-bot_status = {
-    'running': False,
-    'last_run': None,
-    'next_run': None,
-    'total_tweets': 0,
-    'success_count': 0,
-    'error_count': 0,
-    'last_tweet': None,
-    'last_error': None
-}
+# gzip/brotli for JSON and text responses
+app.after_request(compress_response)
 
-# Store logs in memory (max 100 entries)
-log_history = []
-MAX_LOGS = 100
+# Batch log/status frames sent to dashboards
+emitter = SocketEmitter(socketio)
 
-# Store bot configuration
-bot_config = {
-    'enable_image': False,
-    'image_style': 'digital art',
-    'image_width': 1200,
-    'image_height': 675,
-    'membit_use_trending': True,   # Always enabled (required)
-    'membit_use_cluster_info': False,  # Optional, default unchecked
-    'membit_use_posts': False  # Optional, default unchecked
-}
-
-# Load prompt from file if exists
-def load_prompt_config():
-    """Load prompt template from file"""
-    prompt_file = Path(__file__).parent / 'prompt_template.txt'
-    if prompt_file.exists():
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            bot_config['prompt_template'] = f.read()
-    else:
-        # Default prompt
-        bot_config['prompt_template'] = """Anda adalah seorang social media manager yang ahli di bidang Web3 dan cryptocurrency. 
+# Initialize Auth Manager
+auth_manager = AuthManager()
 
-Analisis data trending dari Membit berikut:
-{trending_data}
+# Throttle password checks per IP and username, before any bcrypt work
+login_limiter = LoginLimiter(
+    ip_limit=int(os.getenv('LOGIN_IP_LIMIT', 10)),
+    username_limit=int(os.getenv('LOGIN_USERNAME_LIMIT', 20)),
+    window=int(os.getenv('LOGIN_WINDOW_SECONDS', 300))
+)
 
-Tugas Anda:
-1. Pilih SATU topik paling menarik dan relevan dari data di atas
-2. Prioritaskan topik yang sedang trending atau memiliki pergerakan signifikan
-3. Buat tweet informatif dan engaging dalam Bahasa Inggris
+# Rolling minute/hour/day statistics, fed by every recorded metric
+timeseries_store = TimeSeriesStore()
+metrics.REGISTRY.add_listener(timeseries_store.on_metric)
 
-Aturan PENTING:
-- Tweet MAKSIMAL {max_tweet_length} karakter (termasuk spasi dan hashtag)
-- Singkat, padat, dan menarik
-- Fokus pada insight atau fakta menarik
-- Gunakan tone profesional tapi tetap casual
-- Akhiri dengan 1-2 hashtag relevan (contoh: #Web3, #Crypto, #DeFi, #NFT, #Oracle, #Layer2, dll sesuai topik)
-- Jawab HANYA dengan tweet final, tanpa penjelasan atau pengantar apapun"""
+# Store logs in a ring buffer (last 100 entries) backed by rotating log files
+MAX_LOGS = 100
+log_store = LogStore(capacity=MAX_LOGS)
 
-def save_prompt_config():
-    """Save prompt template to file"""
-    prompt_file = Path(__file__).parent / 'prompt_template.txt'
-    with open(prompt_file, 'w', encoding='utf-8') as f:
-        f.write(bot_config.get('prompt_template', ''))
+# Pipeline worker process (PIPELINE_WORKER=1), started in __main__
+pipeline_worker = None
 
-# Load prompt on startup
-load_prompt_config()
+# Bumped whenever settings or keys are saved (cached /api/config, /api/keys)
+config_version = 0
 
-scheduler_thread = None
-stop_scheduler = False
+# Server gauges are read when /metrics is scraped, nothing to update on the hot path
+metrics.LOG_QUEUE_DEPTH.set_function(lambda: emitter.pending())
+metrics.LOG_BUFFER_SIZE.set_function(lambda: len(log_store))
+metrics.SOCKET_LAGGING_CLIENTS.set_function(lambda: emitter.lagging())
+metrics.BOT_RUNNING.set_function(lambda: 1 if bot_status['running'] else 0)
+metrics.LOGIN_TRACKED_KEYS.set_function(lambda: len(login_limiter.by_ip) + len(login_limiter.by_username))
+metrics.LOGIN_LOCKED_KEYS.set_function(lambda: login_limiter.stats()['locked_keys'])
 
 # Auth decorator
 def login_required(f):
@@ -109,273 +101,99 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def throttle_password_check(route, username):
+    """
+    Count a password attempt against the login limiter
+    Returns a 429 response when the client or username is throttled, else None.
+    """
+    allowed, retry_after = login_limiter.check(request.remote_addr, username)
+    if allowed:
+        return None
+    metrics.LOGIN_ATTEMPTS.inc(route=route, result='rejected')
+    response = jsonify({
+        'success': False,
+        'error': f'Too many attempts. Try again in {format_duration(retry_after)}',
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def busy_response(route, error):
+    """
+    503 for a password check that never ran (too many bcrypt calls waiting)
+    Not a failed attempt, so the login limiter is not told about it.
+    """
+    metrics.LOGIN_ATTEMPTS.inc(route=route, result='busy')
+    response = jsonify({'success': False, 'error': str(error), 'retry_after': error.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def record_password_check(route, username, success):
+    """Feed the result of a password check back to the login limiter"""
+    if success:
+        login_limiter.success(request.remote_addr, username)
+    else:
+        login_limiter.failure(request.remote_addr, username)
+    metrics.LOGIN_ATTEMPTS.inc(route=route, result='success' if success else 'failure')
+
 def emit_log(message, level='info'):
     """Emit log message to frontend"""
-    global log_history
-    
-    log_entry = {
-        'message': message,
-        'level': level,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    
-    # Add to history
-    log_history.append(log_entry)
-    
-    # Keep only last MAX_LOGS entries
-    if len(log_history) > MAX_LOGS:
-        log_history = log_history[-MAX_LOGS:]
-    
-    # Emit to connected clients
-    socketio.emit('log', log_entry)
-
-def create_and_post_tweet():
-    """Main function to create and post tweet"""
-    global bot_status, stop_scheduler
-    
-    max_retries = int(os.getenv('MAX_RETRIES', 3))
-    max_tweet_length = int(os.getenv('MAX_TWEET_LENGTH', 250))
-    
-    emit_log('Starting tweet generation...', 'info')
-    
-    for attempt in range(max_retries):
-        # Check if bot was stopped
-        if stop_scheduler:
-            emit_log('Bot stopped, cancelling tweet generation', 'warning')
-            return
-        
-        try:
-            if attempt > 0:
-                emit_log(f'Retry attempt {attempt + 1}/{max_retries}', 'warning')
-            
-            # Initialize clients
-            emit_log('Initializing clients...', 'info')
-            
-            # Debug: Check if API keys are loaded
-            gemini_key = os.getenv('GEMINI_API_KEY')
-            if not gemini_key:
-                raise Exception("GEMINI_API_KEY not found in environment variables")
-            
-            membit = MembitClient(os.getenv('MEMBIT_API_KEY'))
-            gemini = GeminiClient(gemini_key)
-            twitter = TwitterClient(
-                api_key=os.getenv('TWITTER_API_KEY'),
-                api_secret=os.getenv('TWITTER_API_SECRET'),
-                access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-                access_secret=os.getenv('TWITTER_ACCESS_SECRET')
-            )
-            
-            # Check if bot was stopped
-            if stop_scheduler:
-                emit_log('Bot stopped, cancelling tweet generation', 'warning')
-                return
-            
-            # Get data from Membit based on user settings
-            emit_log('Fetching data from Membit...', 'info')
-            
-            membit_data_parts = []
-            cluster_label = None
-            
-            # 1. Trending Topics (clusters_search) - Always enabled
-            if True:  # Always fetch trending topics (required)
-                emit_log('→ Getting trending topics...', 'info')
-                try:
-                    trending = membit.get_trending_topics(query="Web3", limit=10)
-                    membit_data_parts.append(f"TRENDING TOPICS:\n{trending}")
-                    emit_log('Got trending topics', 'success')
-                    
-                    # Try to extract first cluster label for deep dive
-                    # Format: label="Cluster Name Here"
-                    try:
-                        import re
-                        # Find first occurrence of label="..."
-                        match = re.search(r'label="([^"]+)"', trending)
-                        if match:
-                            cluster_label = match.group(1)
-                            emit_log(f'Found cluster label: {cluster_label}', 'info')
-                    except Exception as e:
-                        emit_log(f'⚠️ Failed to extract cluster label: {str(e)}', 'warning')
-                except Exception as e:
-                    emit_log(f'⚠️ Failed to get trending topics: {str(e)}', 'warning')
-            
-            # 2. Cluster Details (clusters_info)
-            if bot_config.get('membit_use_cluster_info', False):
-                emit_log('Getting cluster details...', 'info')
-                try:
-                    if cluster_label:
-                        cluster_info = membit.get_cluster_info(label=cluster_label, limit=10)
-                        membit_data_parts.append(f"\nDETAILED CONTEXT:\n{cluster_info}")
-                        emit_log(f'Got details for cluster: {cluster_label}', 'success')
-                    else:
-                        emit_log('⚠️ No cluster label found, skipping deep dive', 'warning')
-                        emit_log('💡 Tip: Enable Trending Topics to get cluster labels', 'info')
-                except Exception as e:
-                    emit_log(f'⚠️ Failed to get cluster details: {str(e)}', 'warning')
-            
-            # 3. Posts Search (posts_search)
-            if bot_config.get('membit_use_posts', False):
-                emit_log('Getting community posts...', 'info')
-                try:
-                    posts = membit.search_posts(query="Web3", limit=5)
-                    membit_data_parts.append(f"\nCOMMUNITY POSTS:\n{posts}")
-                    emit_log('Got community posts', 'success')
-                except Exception as e:
-                    emit_log(f'⚠️ Failed to get posts: {str(e)}', 'warning')
-            
-            # Combine all data
-            if membit_data_parts:
-                trending_data = "\n\n".join(membit_data_parts)
-            else:
-                # Trending failed (should not happen often)
-                emit_log('⚠️ Failed to fetch Membit data. Using fallback.', 'warning')
-                trending_data = "Web3 and cryptocurrency trending topics"
-            
-            # Check if bot was stopped
-            if stop_scheduler:
-                emit_log('Bot stopped, cancelling tweet generation', 'warning')
-                return
-            
-            # Generate tweet
-            emit_log('Generating tweet with Gemini AI...', 'info')
-            
-            # Use custom prompt template from config
-            prompt_template = bot_config.get('prompt_template', '')
-            
-            if not prompt_template:
-                raise Exception("Prompt template not configured. Please set it in Settings.")
-            
-            # Validate prompt template
-            if '{max_tweet_length}' not in prompt_template:
-                emit_log('Warning: Prompt template missing {max_tweet_length} variable. Gemini may generate long tweets.', 'warning')
-            
-            # Format prompt with variables
-            try:
-                prompt = prompt_template.format(
-                    trending_data=trending_data,
-                    max_tweet_length=max_tweet_length
-                )
-            except KeyError as e:
-                raise Exception(f"Invalid prompt template. Missing variable: {e}")
-            
-            emit_log(f'Using custom prompt (template: {len(prompt_template)} chars, formatted: {len(prompt)} chars)', 'info')
-            
-            tweet_text = gemini.generate_content(prompt)
-            tweet_text = tweet_text.strip().strip('"').strip("'")
-            
-            # Validate length
-            if len(tweet_text) > 280:
-                emit_log(f'Tweet too long ({len(tweet_text)} chars), regenerating...', 'warning')
-                continue
-            
-            emit_log(f'Generated tweet ({len(tweet_text)} chars): {tweet_text}', 'success')
-            
-            # Check if bot was stopped before posting
-            if stop_scheduler:
-                emit_log('Bot stopped, cancelling tweet posting', 'warning')
-                return
-            
-            # Generate and upload image if enabled
-            media_ids = None
-            if bot_config.get('enable_image', False):
-                try:
-                    emit_log('Generating image with AI...', 'info')
-                    
-                    # Generate image prompt from tweet
-                    image_prompt = gemini.generate_image_prompt(tweet_text)
-                    emit_log(f'Image prompt: {image_prompt}', 'info')
-                    
-                    # Generate image
-                    image_gen = ImageGenerator()
-                    image_path = image_gen.generate_image(
-                        prompt=image_prompt,
-                        width=bot_config.get('image_width', 1200),
-                        height=bot_config.get('image_height', 675),
-                        style=bot_config.get('image_style', 'digital art')
-                    )
-                    emit_log(f'Image generated: {image_path}', 'success')
-                    
-                    # Upload to Twitter
-                    emit_log('Uploading image to Twitter...', 'info')
-                    media_id = twitter.upload_media(image_path)
-                    media_ids = [media_id]
-                    emit_log('Image uploaded successfully', 'success')
-                    
-                    # Cleanup
-                    image_gen.cleanup()
-                    
-                except Exception as img_error:
-                    emit_log(f'Failed to generate/upload image: {str(img_error)}', 'warning')
-                    emit_log('Continuing with text-only tweet...', 'info')
-                    media_ids = None
-            
-            # Post tweet
-            if media_ids:
-                emit_log('Posting tweet with image to Twitter...', 'info')
-            else:
-                emit_log('Posting tweet to Twitter...', 'info')
-            result = twitter.post_tweet(tweet_text, media_ids=media_ids)
-            
-            # Update status
-            bot_status['last_run'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            bot_status['total_tweets'] += 1
-            bot_status['success_count'] += 1
-            bot_status['last_tweet'] = {
-                'text': tweet_text,
-                'id': result.get('id'),
-                'url': f"https://twitter.com/i/web/status/{result.get('id')}",
-                'timestamp': bot_status['last_run']
-            }
-            
-            emit_log(f'Tweet posted successfully! ID: {result.get("id")}', 'success')
-            socketio.emit('status_update', bot_status)
-            return
-            
-        except Exception as e:
-            error_msg = str(e)
-            emit_log(f'Error: {error_msg}', 'error')
-            bot_status['error_count'] += 1
-            bot_status['last_error'] = {
-                'message': error_msg,
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            if attempt < max_retries - 1:
-                emit_log('Retrying in 5 seconds...', 'warning')
-                # Sleep in small intervals to allow stopping
-                for _ in range(5):
-                    if stop_scheduler:
-                        emit_log('Bot stopped during retry wait', 'warning')
-                        return
-                    time.sleep(1)
-            else:
-                emit_log('Max retries reached. Giving up.', 'error')
-                socketio.emit('status_update', bot_status)
-                return
-
-def scheduler_loop():
-    """Scheduler loop for auto-posting"""
-    global stop_scheduler, bot_status
-    
-    schedule_hours = int(os.getenv('SCHEDULE_HOURS', 6))
-    
-    while not stop_scheduler:
-        create_and_post_tweet()
-        
-        if stop_scheduler:
-            break
-        
-        # Calculate next run
-        next_run_time = datetime.now().timestamp() + (schedule_hours * 3600)
-        bot_status['next_run'] = datetime.fromtimestamp(next_run_time).strftime('%Y-%m-%d %H:%M:%S')
-        socketio.emit('status_update', bot_status)
-        
-        emit_log(f'Next run in {schedule_hours} hours', 'info')
-        
-        # Sleep in small intervals to allow stopping
-        for _ in range(schedule_hours * 3600):
-            if stop_scheduler:
-                break
-            time.sleep(1)
+    entry = log_store.append(message, level)
+    
+    # Queue for the next batched frame to connected clients
+    emitter.log(format_entry(entry))
+
+# The pipeline logs and reports status straight to dashboards (a worker process forwards them instead)
+if not USE_PIPELINE_WORKER:
+    pipeline.emit_log = emit_log
+    pipeline.emitter = emitter
+
+# The prompt was first loaded before any log sink existed, report a fallback on the dashboard too
+load_prompt_config(emit_log)
+
+def refresh_quota():
+    """Update quota headroom in bot_status (the worker process reports its own)"""
+    if not USE_PIPELINE_WORKER:
+        headroom = pipeline.quota_ledger.headroom()
+        if headroom != bot_status['quota']:
+            bot_status['quota'] = headroom
+            emitter.status(bot_status)
+
+def config_changed():
+    """Settings were saved: invalidate cached responses, update the worker"""
+    global config_version
+    config_version += 1
+    sync_worker_config()
+
+def sync_worker_config():
+    """Send current bot config and settings to the worker process"""
+    if pipeline_worker:
+        pipeline_worker.send(
+            'config',
+            bot_config=dict(bot_config),
+            settings=settings.env_values()
+        )
+
+def handle_worker_event(event):
+    """Handle an event from the worker process"""
+    kind = event[0]
+    if kind == 'log':
+        emit_log(event[1], event[2])
+    elif kind == 'status':
+        bot_status.update(event[1])
+        emitter.status(bot_status)
+    elif kind == 'metric':
+        metrics.REGISTRY.apply(event[1], event[2], event[3])
+    elif kind == 'ready':
+        # Fresh worker (first start or after a crash), hand it the current settings
+        sync_worker_config()
+    elif kind == 'crashed':
+        emit_log(f'Pipeline worker crashed (exit code {event[1]}), restarting it. Start the bot again if needed.', 'error')
+        bot_status['running'] = False
+        bot_status['next_run'] = None
+        emitter.status(bot_status)
 
 # ============================================================================
 # AUTHENTICATION ROUTES
@@ -402,7 +220,10 @@ def auth_setup():
         username = data.get('username', '').strip()
         password = data.get('password', '')
         
-        success, qr_code, totp_secret, backup_codes, error = auth_manager.setup_auth(username, password)
+        try:
+            success, qr_code, totp_secret, backup_codes, error = run_blocking(auth_manager.setup_auth, username, password)
+        except BusyError as e:
+            return busy_response('setup', e)
         
         if success:
             return jsonify({
@@ -444,7 +265,15 @@ def auth_login():
         password = data.get('password', '')
         totp_code = data.get('totp_code', '').strip()
         
-        success, error = auth_manager.verify_login(username, password, totp_code)
+        throttled = throttle_password_check('login', username)
+        if throttled:
+            return throttled
+        
+        try:
+            success, error = run_blocking(auth_manager.verify_login, username, password, totp_code)
+        except BusyError as e:
+            return busy_response('login', e)
+        record_password_check('login', username, success)
         
         if success:
             session['logged_in'] = True
@@ -478,7 +307,15 @@ def auth_change_password():
         new_password = data.get('new_password', '')
         totp_code = data.get('totp_code', '').strip()
         
-        success, error = auth_manager.change_password(old_password, new_password, totp_code)
+        throttled = throttle_password_check('change_password', session.get('username'))
+        if throttled:
+            return throttled
+        
+        try:
+            success, error = run_blocking(auth_manager.change_password, old_password, new_password, totp_code)
+        except BusyError as e:
+            return busy_response('change_password', e)
+        record_password_check('change_password', session.get('username'), success)
         
         if success:
             emit_log('Password changed successfully', 'success')
@@ -498,7 +335,15 @@ def auth_regenerate_backup_codes():
         password = data.get('password', '')
         totp_code = data.get('totp_code', '').strip()
         
-        success, backup_codes, error = auth_manager.regenerate_backup_codes(password, totp_code)
+        throttled = throttle_password_check('regenerate_backup_codes', session.get('username'))
+        if throttled:
+            return throttled
+        
+        try:
+            success, backup_codes, error = run_blocking(auth_manager.regenerate_backup_codes, password, totp_code)
+        except BusyError as e:
+            return busy_response('regenerate_backup_codes', e)
+        record_password_check('regenerate_backup_codes', session.get('username'), success)
         
         if success:
             emit_log('Backup codes regenerated', 'success')
@@ -513,16 +358,23 @@ def auth_regenerate_backup_codes():
 # MAIN ROUTES
 # ============================================================================
 
-@app.route('/')
-def index():
-    """Main page"""
-    return render_template('index.html')
+# Built dashboard (frontend/dist): precompressed, fingerprinted assets
+frontend_static.register(app)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus metrics (Bearer METRICS_TOKEN required when it is set)"""
+    token = settings.current.metrics_token
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Invalid metrics token'}), 401
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/status')
 @login_required
 def get_status():
-    """Get bot status"""
-    return jsonify(bot_status)
+    """Get bot status (ETag/304 aware)"""
+    refresh_quota()
+    return status_response.response()
 
 @app.route('/api/config', methods=['GET', 'POST'])
 @login_required
@@ -532,37 +384,31 @@ def handle_config():
         try:
             data = request.json
             
-            # Update environment variables
-            os.environ['SCHEDULE_HOURS'] = str(data.get('schedule_hours', 6))
-            os.environ['MAX_RETRIES'] = str(data.get('max_retries', 3))
-            os.environ['MAX_TWEET_LENGTH'] = str(data.get('max_tweet_length', 250))
-            
-            # Update image config in memory
-            bot_config['enable_image'] = data.get('enable_image', False)
-            bot_config['image_style'] = data.get('image_style', 'digital art')
-            bot_config['image_width'] = int(data.get('image_width', 1200))
-            bot_config['image_height'] = int(data.get('image_height', 675))
-            
-            # Update Membit data source config
-            bot_config['membit_use_trending'] = True  # Always enabled (required)
-            bot_config['membit_use_cluster_info'] = data.get('membit_use_cluster_info', False)
-            bot_config['membit_use_posts'] = data.get('membit_use_posts', False)
+            # Image and Membit data source config, applied in one step so a
+            # running pipeline reads either the old or the new values
+            run_config = {
+                'enable_image': data.get('enable_image', False),
+                'image_style': data.get('image_style', 'digital art'),
+                'image_width': int(data.get('image_width', 1200)),
+                'image_height': int(data.get('image_height', 675)),
+                'membit_use_trending': True,  # Always enabled (required)
+                'membit_use_cluster_info': data.get('membit_use_cluster_info', False),
+                'membit_use_posts': data.get('membit_use_posts', False)
+            }
             
-            # Update .env file
-            env_path = Path(__file__).parent / '.env'
-            with open(env_path, 'r') as f:
-                lines = f.readlines()
+            # Validate and save settings (.env), nothing changes if a value is invalid
+            settings.update(
+                schedule_hours=data.get('schedule_hours', 6),
+                max_retries=data.get('max_retries', 3),
+                max_tweet_length=data.get('max_tweet_length', 250),
+                membit_queries=data.get('membit_queries', settings.current.membit_queries),
+                membit_prompt_mode=data.get('membit_prompt_mode', settings.current.membit_prompt_mode),
+                draft_batch_size=data.get('draft_batch_size', settings.current.draft_batch_size),
+                draft_require_approval=data.get('draft_require_approval', settings.current.draft_require_approval)
+            )
+            bot_config.update(run_config)
             
-            with open(env_path, 'w') as f:
-                for line in lines:
-                    if line.startswith('SCHEDULE_HOURS='):
-                        f.write(f"SCHEDULE_HOURS={data.get('schedule_hours', 6)}\n")
-                    elif line.startswith('MAX_RETRIES='):
-                        f.write(f"MAX_RETRIES={data.get('max_retries', 3)}\n")
-                    elif line.startswith('MAX_TWEET_LENGTH='):
-                        f.write(f"MAX_TWEET_LENGTH={data.get('max_tweet_length', 250)}\n")
-                    else:
-                        f.write(line)
+            config_changed()
             
             # Don't emit log here, let frontend handle it
             return jsonify({'success': True})
@@ -570,10 +416,16 @@ def handle_config():
             return jsonify({'success': False, 'error': str(e)})
     
     # GET request
-    return jsonify({
-        'schedule_hours': int(os.getenv('SCHEDULE_HOURS', 6)),
-        'max_retries': int(os.getenv('MAX_RETRIES', 3)),
-        'max_tweet_length': int(os.getenv('MAX_TWEET_LENGTH', 250)),
+    return config_response.response()
+
+def config_payload():
+    """Current settings as sent to the dashboard"""
+    current = settings.current
+    return {
+        'schedule_hours': current.schedule_hours,
+        'max_retries': current.max_retries,
+        'max_tweet_length': current.max_tweet_length,
+        'prompt_name': bot_config.get('prompt_name', 'default'),
         'prompt_template': bot_config.get('prompt_template', ''),
         'enable_image': bot_config.get('enable_image', False),
         'image_style': bot_config.get('image_style', 'digital art'),
@@ -581,31 +433,77 @@ def handle_config():
         'image_height': bot_config.get('image_height', 675),
         'membit_use_trending': bot_config.get('membit_use_trending', True),
         'membit_use_cluster_info': bot_config.get('membit_use_cluster_info', False),
-        'membit_use_posts': bot_config.get('membit_use_posts', False)
-    })
+        'membit_use_posts': bot_config.get('membit_use_posts', False),
+        'membit_queries': current.membit_queries,
+        'membit_prompt_mode': current.membit_prompt_mode,
+        'draft_batch_size': current.draft_batch_size,
+        'draft_require_approval': current.draft_require_approval
+    }
 
 @app.route('/api/prompt', methods=['POST'])
 @login_required
 def update_prompt():
-    """Update prompt template"""
+    """Validate and save a prompt template as a new version (active by default)"""
     try:
         data = request.json
+        name = (data.get('name') or prompt_store.active_name()).strip()
         new_prompt = data.get('prompt_template', '')
         
-        if not new_prompt:
-            return jsonify({'success': False, 'error': 'Prompt template cannot be empty'})
-        
-        # Update in memory
-        bot_config['prompt_template'] = new_prompt
+        try:
+            version, warnings = prompt_store.save(name, new_prompt, activate=data.get('activate', True))
+        except TemplateError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Save to file for persistence
-        save_prompt_config()
+        load_prompt_config(emit_log)
+        config_changed()
         
-        emit_log('Updated and saved', 'success')
-        return jsonify({'success': True})
+        emit_log(f"Prompt template '{name}' v{version} saved", 'success')
+        return jsonify({'success': True, 'name': name, 'version': version, 'warnings': warnings})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/prompts', methods=['GET'])
+@login_required
+def list_prompts():
+    """Saved prompt templates, their versions and the available variables"""
+    return jsonify(prompt_store.summary())
+
+@app.route('/api/prompts/<name>/activate', methods=['POST'])
+@login_required
+def activate_prompt(name):
+    """Switch to another template, or restore an older version with {version}"""
+    try:
+        version = (request.json or {}).get('version')
+        version = prompt_store.activate(name, version)
+    except (TemplateError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    load_prompt_config(emit_log)
+    config_changed()
+    
+    emit_log(f"Prompt template '{name}' v{version} activated", 'success')
+    return jsonify({'success': True, 'name': name, 'version': version})
+
+@app.route('/api/prompts/<name>', methods=['DELETE'])
+@login_required
+def delete_prompt(name):
+    """Delete a prompt template that is not active"""
+    try:
+        prompt_store.delete(name)
+    except TemplateError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True})
+
+# Dashboard field -> setting name
+KEY_FIELDS = {
+    'membit_key': 'membit_api_key',
+    'gemini_key': 'gemini_api_key',
+    'twitter_key': 'twitter_api_key',
+    'twitter_secret': 'twitter_api_secret',
+    'twitter_token': 'twitter_access_token',
+    'twitter_access_secret': 'twitter_access_secret'
+}
+
 @app.route('/api/keys', methods=['GET', 'POST'])
 @login_required
 def handle_keys():
@@ -614,67 +512,14 @@ def handle_keys():
         try:
             data = request.json
             
-            # Update environment variables
-            if data.get('membit_key'):
-                os.environ['MEMBIT_API_KEY'] = data['membit_key']
-            if data.get('gemini_key'):
-                os.environ['GEMINI_API_KEY'] = data['gemini_key']
-            if data.get('twitter_key'):
-                os.environ['TWITTER_API_KEY'] = data['twitter_key']
-            if data.get('twitter_secret'):
-                os.environ['TWITTER_API_SECRET'] = data['twitter_secret']
-            if data.get('twitter_token'):
-                os.environ['TWITTER_ACCESS_TOKEN'] = data['twitter_token']
-            if data.get('twitter_access_secret'):
-                os.environ['TWITTER_ACCESS_SECRET'] = data['twitter_access_secret']
-            
-            # Update .env file
-            env_path = Path(__file__).parent / '.env'
-            
-            # Read existing content or create new
-            env_content = {}
-            if env_path.exists():
-                with open(env_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            env_content[key] = value
-            
-            # Update with new values
-            if data.get('membit_key'):
-                env_content['MEMBIT_API_KEY'] = data['membit_key']
-            if data.get('gemini_key'):
-                env_content['GEMINI_API_KEY'] = data['gemini_key']
-            if data.get('twitter_key'):
-                env_content['TWITTER_API_KEY'] = data['twitter_key']
-            if data.get('twitter_secret'):
-                env_content['TWITTER_API_SECRET'] = data['twitter_secret']
-            if data.get('twitter_token'):
-                env_content['TWITTER_ACCESS_TOKEN'] = data['twitter_token']
-            if data.get('twitter_access_secret'):
-                env_content['TWITTER_ACCESS_SECRET'] = data['twitter_access_secret']
-            
-            # Write back to file
-            with open(env_path, 'w', encoding='utf-8') as f:
-                f.write("# Flask Configuration\n")
-                f.write(f"SECRET_KEY={env_content.get('SECRET_KEY', 'change-this-secret-key')}\n\n")
-                
-                f.write("# Bot Configuration\n")
-                f.write(f"SCHEDULE_HOURS={env_content.get('SCHEDULE_HOURS', '6')}\n")
-                f.write(f"MAX_RETRIES={env_content.get('MAX_RETRIES', '3')}\n")
-                f.write(f"MAX_TWEET_LENGTH={env_content.get('MAX_TWEET_LENGTH', '250')}\n\n")
-                
-                f.write("# API Keys\n")
-                f.write(f"MEMBIT_API_KEY={env_content.get('MEMBIT_API_KEY', '')}\n")
-                f.write(f"GEMINI_API_KEY={env_content.get('GEMINI_API_KEY', '')}\n")
-                f.write(f"TWITTER_API_KEY={env_content.get('TWITTER_API_KEY', '')}\n")
-                f.write(f"TWITTER_API_SECRET={env_content.get('TWITTER_API_SECRET', '')}\n")
-                f.write(f"TWITTER_ACCESS_TOKEN={env_content.get('TWITTER_ACCESS_TOKEN', '')}\n")
-                f.write(f"TWITTER_ACCESS_SECRET={env_content.get('TWITTER_ACCESS_SECRET', '')}\n")
-            
-            # Reload environment variables
-            load_dotenv(dotenv_path=env_path, override=True)
+            # Only keys that were filled in are changed
+            changes = {
+                setting: data[field]
+                for field, setting in KEY_FIELDS.items()
+                if data.get(field)
+            }
+            settings.update(**changes)
+            config_changed()
             
             # Don't emit log here, let frontend handle it
             return jsonify({'success': True})
@@ -683,29 +528,268 @@ def handle_keys():
             return jsonify({'success': False, 'error': str(e)})
     
     # GET request - return masked keys for security
-    return jsonify({
-        'membit_key': mask_key(os.getenv('MEMBIT_API_KEY', '')),
-        'gemini_key': mask_key(os.getenv('GEMINI_API_KEY', '')),
-        'twitter_key': mask_key(os.getenv('TWITTER_API_KEY', '')),
-        'twitter_secret': mask_key(os.getenv('TWITTER_API_SECRET', '')),
-        'twitter_token': mask_key(os.getenv('TWITTER_ACCESS_TOKEN', '')),
-        'twitter_access_secret': mask_key(os.getenv('TWITTER_ACCESS_SECRET', ''))
-    })
+    return keys_response.response()
+
+def keys_payload():
+    """Masked API keys as sent to the dashboard"""
+    current = settings.current
+    return {field: mask_key(getattr(current, setting)) for field, setting in KEY_FIELDS.items()}
 
 def mask_key(key):
     """Return full key (will be masked by password input type in browser)"""
     return key if key else ''
 
+# Cached JSON bodies for dashboard polling, rebuilt only when their state changes
+status_response = CachedJson('status', lambda: emitter.snapshot(bot_status), lambda: emitter.version)
+config_response = CachedJson('config', config_payload, lambda: config_version)
+keys_response = CachedJson('keys', keys_payload, lambda: config_version)
+bootstrap_response = CachedJson(
+    'bootstrap',
+    lambda: {
+        'username': session.get('username'),
+        'status': status_response.data(),
+        'config': config_response.data(),
+        'logs': [format_entry(entry) for entry in log_store.recent()]
+    },
+    lambda: (session.get('username'), emitter.version, config_version, log_store.last_seq)
+)
+
+@app.route('/api/bootstrap')
+@login_required
+def get_bootstrap():
+    """Everything the dashboard needs on page load in one request"""
+    refresh_quota()
+    return bootstrap_response.response()
+
 @app.route('/api/logs')
 @login_required
 def get_logs():
-    """Get log history"""
-    return jsonify(log_history)
+    """
+    Get log history, newest page first
+    Query params: cursor (id from next_cursor), limit, level (comma separated),
+    since/until (epoch seconds)
+    """
+    try:
+        # Nothing logged since the client's copy: answer 304 without reading the store
+        query = hashlib.sha1(request.query_string).hexdigest()[:8]
+        etag = f'"logs-{BOOT_ID}-{log_store.last_seq}-{query}"'
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        level = request.args.get('level')
+        entries, next_cursor = log_store.query(
+            cursor=request.args.get('cursor', type=int),
+            limit=request.args.get('limit', MAX_LOGS, type=int),
+            level=set(level.split(',')) if level else None,
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float)
+        )
+        response = jsonify({
+            'logs': [format_entry(entry) for entry in entries],
+            'next_cursor': next_cursor
+        })
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/history')
+@login_required
+def get_history():
+    """
+    Run history, newest first
+    Query params: before (id from next_before), limit, tweets=1 (only runs
+    that posted), outcome
+    """
+    try:
+        runs, next_before = run_history.page(
+            before=request.args.get('before', type=int),
+            limit=request.args.get('limit', 20, type=int),
+            tweets_only=request.args.get('tweets') == '1',
+            outcome=request.args.get('outcome')
+        )
+        return jsonify({'runs': runs, 'next_before': next_before})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/history/stats')
+@login_required
+def get_history_stats():
+    """Per-day success rate and p95 run latency"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        return jsonify({'days': run_history.daily_stats(days), 'summary': run_history.summary(days)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/timeseries')
+@login_required
+def get_timeseries():
+    """
+    Rolling statistics as compact arrays
+    Query params: resolution (minute, hour, day), series (comma separated,
+    default all), limit (newest buckets), points (downsample to)
+    """
+    try:
+        names = request.args.get('series')
+        return jsonify(timeseries_store.query(
+            resolution=request.args.get('resolution', 'hour'),
+            names=names.split(',') if names else None,
+            limit=request.args.get('limit', type=int),
+            points=request.args.get('points', type=int)
+        ))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/drafts')
+@login_required
+def get_drafts():
+    """
+    Queued drafts, oldest first
+    Query params: status (comma separated, default pending,approved,posting), limit
+    """
+    try:
+        statuses = request.args.get('status')
+        return jsonify({
+            'drafts': draft_queue.list(
+                statuses=statuses.split(',') if statuses else OPEN_STATUSES,
+                limit=request.args.get('limit', 50, type=int)
+            ),
+            'counts': draft_queue.counts()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def update_draft(action, draft_id, **options):
+    """
+    Approve or reject a draft in the process that posts drafts
+    Raises ValueError when the draft is not in a state that allows it.
+    Returns: open draft counts afterwards
+    """
+    if pipeline_worker:
+        return pipeline_worker.request('draft', action=action, draft_id=draft_id, options=options)
+    getattr(draft_queue, action)(draft_id, **options)
+    return draft_queue.counts()
+
+@app.route('/api/drafts/<int:draft_id>/approve', methods=['POST'])
+@login_required
+def approve_draft(draft_id):
+    """Approve a pending draft for posting, optionally with edited text"""
+    try:
+        text = (request.get_json(silent=True) or {}).get('text')
+        if text is not None and weighted_length(text.strip()) > MAX_WEIGHTED_LENGTH:
+            return jsonify({'success': False, 'error': f'Tweet is longer than {MAX_WEIGHTED_LENGTH} characters'}), 400
+        counts = update_draft('approve', draft_id, text=text)
+        metrics.DRAFTS.inc(event='approved')
+        emit_log(f'Draft #{draft_id} approved', 'info')
+        return jsonify({'success': True, 'counts': counts})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/drafts/<int:draft_id>/reject', methods=['POST'])
+@login_required
+def reject_draft(draft_id):
+    """Drop a queued draft"""
+    try:
+        counts = update_draft('reject', draft_id)
+        metrics.DRAFTS.inc(event='rejected')
+        emit_log(f'Draft #{draft_id} rejected', 'info')
+        return jsonify({'success': True, 'counts': counts})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/membit/archive')
+@login_required
+def get_membit_archive():
+    """
+    Archived Membit calls
+    Query params: start/end (epoch seconds or ISO date), tool
+    """
+    try:
+        if membit_archive is None:
+            return jsonify({'success': False, 'error': 'Membit archive is disabled (set MEMBIT_ARCHIVE=1)'}), 404
+        entries = membit_archive.entries(
+            start=parse_time(request.args.get('start')),
+            end=parse_time(request.args.get('end')),
+            tool=request.args.get('tool')
+        )
+        return jsonify({
+            'calls': [
+                {'timestamp': timestamp, 'tool': tool, 'args_hash': f'{hash_value:016x}', 'bytes': length}
+                for timestamp, tool, hash_value, _, _, length in entries
+            ],
+            'stats': membit_archive.stats()
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/membit/archive/replay')
+@login_required
+def replay_membit_archive():
+    """
+    Rebuild the prompt of every archived run in a time range, streamed as NDJSON
+    Query params: start/end (epoch seconds or ISO date), template (prompt
+    template name, default the active one)
+    """
+    try:
+        if membit_archive is None:
+            return jsonify({'success': False, 'error': 'Membit archive is disabled (set MEMBIT_ARCHIVE=1)'}), 404
+        start = parse_time(request.args.get('start'))
+        end = parse_time(request.args.get('end'))
+        name = request.args.get('template')
+        if name:
+            versions = prompt_store.state['templates'].get(name)
+            if not versions:
+                return jsonify({'success': False, 'error': f"Unknown prompt template '{name}'"}), 404
+            template = compile_template(versions[-1]['source'])
+        else:
+            template = compile_template(prompt_store.active_source(emit_log))
+    except (ValueError, TemplateError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    current = settings.current
+    runs = replay_runs(
+        membit_archive, start, end, template,
+        max_tweet_length=current.max_tweet_length,
+        top_clusters=current.membit_top_clusters,
+        top_posts=current.membit_top_posts,
+        weights={query.lower(): weight for query, weight in parse_queries(current.membit_queries)}
+    )
+    return Response((json.dumps(run, ensure_ascii=False) + '\n' for run in runs), mimetype='application/x-ndjson')
+
+@app.route('/api/traces')
+@login_required
+def get_traces():
+    """Summaries of recent runs (id, start time, duration, outcome)"""
+    try:
+        return jsonify({'traces': trace_store.recent(request.args.get('limit', 20, type=int))})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/traces/<trace_id>')
+@login_required
+def get_trace(trace_id):
+    """Span waterfall of one run"""
+    try:
+        record = trace_store.get(trace_id)
+        if record is None:
+            return jsonify({'success': False, 'error': 'Trace not found'}), 404
+        return jsonify(waterfall(record))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @socketio.on('start_bot')
 def handle_start_bot():
     """Start the bot"""
-    global scheduler_thread, stop_scheduler, bot_status
     
     # Check authentication
     if not session.get('logged_in'):
@@ -728,7 +812,7 @@ def handle_start_bot():
     
     missing_keys = []
     for key, name in required_keys.items():
-        if not os.getenv(key):
+        if not settings.current.get(key):
             missing_keys.append(name)
     
     if missing_keys:
@@ -737,18 +821,16 @@ def handle_start_bot():
         emit('error', {'message': error_msg})
         return
     
-    bot_status['running'] = True
-    stop_scheduler = False
-    
-    scheduler_thread = threading.Thread(target=scheduler_loop, daemon=True)
-    scheduler_thread.start()
-    
-    emit('status_update', bot_status)
+    if pipeline_worker:
+        bot_status['running'] = True
+        pipeline_worker.send('start')
+        emitter.status(bot_status)
+    else:
+        pipeline.start_scheduler()
 
 @socketio.on('stop_bot')
 def handle_stop_bot():
     """Stop the bot"""
-    global stop_scheduler, bot_status
     
     # Check authentication
     if not session.get('logged_in'):
@@ -759,12 +841,15 @@ def handle_stop_bot():
         emit('error', {'message': 'Bot is not running'})
         return
     
-    stop_scheduler = True
-    bot_status['running'] = False
-    bot_status['next_run'] = None
+    if pipeline_worker:
+        pipeline_worker.send('stop')
+        bot_status['running'] = False
+        bot_status['next_run'] = None
+        emitter.status(bot_status)
+    else:
+        pipeline.stop_bot_scheduler()
     
     emit_log('Bot stopped by user', 'warning')
-    emit('status_update', bot_status)
 
 @socketio.on('run_once')
 def handle_run_once():
@@ -786,7 +871,7 @@ def handle_run_once():
     
     missing_keys = []
     for key, name in required_keys.items():
-        if not os.getenv(key):
+        if not settings.current.get(key):
             missing_keys.append(name)
     
     if missing_keys:
@@ -796,24 +881,44 @@ def handle_run_once():
         return
     
     emit_log('Running single tweet generation...', 'info')
-    threading.Thread(target=create_and_post_tweet, daemon=True).start()
+    if pipeline_worker:
+        pipeline_worker.send('run_once')
+    else:
+        threading.Thread(target=pipeline.create_and_post_tweet, daemon=True).start()
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     # Send current status
-    emit('status_update', bot_status)
+    refresh_quota()
+    emit('status_update', emitter.snapshot(bot_status))
     
-    # Send log history to new client
-    for log_entry in log_history:
-        emit('log', log_entry)
+    # Send log history to new client in one frame
+    emit('log_batch', {'logs': [format_entry(entry) for entry in log_store.recent()], 'dropped': 0})
+    
+    # Batched frames from now on, skipped while the client falls behind
+    emitter.connect(request.sid)
     
     emit_log('🔌 Connected to server', 'info')
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    """Stop sending frames to a closed connection"""
+    emitter.disconnect(request.sid)
+
+@socketio.on('request_status')
+def handle_request_status():
+    """Send a full status snapshot (client missed a status_delta version)"""
+    if not session.get('logged_in'):
+        emit('error', {'message': 'Authentication required'})
+        return
+    
+    emit('status_update', emitter.snapshot(bot_status))
+
 def check_initial_setup():
     """Check if initial setup is needed"""
     required_keys = ['MEMBIT_API_KEY', 'GEMINI_API_KEY', 'TWITTER_API_KEY']
-    missing_keys = [key for key in required_keys if not os.getenv(key)]
+    missing_keys = [key for key in required_keys if not settings.current.get(key)]
     
     if missing_keys:
         print('\n' + '='*60)
@@ -845,4 +950,10 @@ if __name__ == '__main__':
     # Check if initial setup is needed
     check_initial_setup()
     
+    # Run the scheduler and pipeline in a separate process
+    if USE_PIPELINE_WORKER:
+        pipeline_worker = PipelineWorker(handle_worker_event, start_task=socketio.start_background_task)
+        pipeline_worker.start()
+        print('⚙️  Pipeline running in worker process')
+    
     socketio.run(app, host='0.0.0.0', port=5000, debug=False, log_output=False)
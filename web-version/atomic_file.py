@@ -0,0 +1,68 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from server_mode import native_threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# One in-process lock per lock file: flock() does not exclude threads that
+# share a process on every platform. Native locks, since files are also
+# written from run_blocking's OS threads (nothing yields while they are held)
+_thread_locks = {}
+_thread_locks_guard = native_threading().Lock()
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        lock = _thread_locks.get(path)
+        if lock is None:
+            lock = _thread_locks[path] = native_threading().RLock()
+        return lock
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock shared by threads and processes writing `path`
+    Uses a separate `<name>.lock` file so the data file itself can be
+    replaced by a rename while the lock is held.
+    """
+    path = Path(path)
+    lock_path = path.with_name(path.name + '.lock')
+    with _thread_lock(str(lock_path)):
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a+') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def atomic_write(path, text, private=False):
+    """
+    Replace `path` with `text` (temp file, fsync, rename)
+    Readers see either the old or the new content, never a partial file.
+    private: create the file readable by the owner only (secrets).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    fd = os.open(tmp_path, flags, 0o600 if private else 0o666)
+    if private:
+        os.chmod(tmp_path, 0o600)
+    with open(fd, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -1,19 +1,69 @@
 import os
+import re
 import json
 import pyotp
 import qrcode
 import bcrypt
 import secrets
 from pathlib import Path
+from atomic_file import atomic_write, file_lock
+from server_mode import native_threading
 from io import BytesIO
 import base64
 
+# Backup code: non-secret lookup id + secret, e.g. 3F9A-0C41B7E2
+BACKUP_CODE_RE = re.compile(r'^([0-9A-F]{4})-([0-9A-F]{8})$')
+# Codes generated before lookup ids existed: 8 hex characters, hash only
+LEGACY_BACKUP_CODE_RE = re.compile(r'^[0-9A-F]{8}$')
+TOTP_CODE_RE = re.compile(r'^\d{6}$')
+
+class BusyError(Exception):
+    """Too many password checks already waiting, nothing was checked"""
+    retry_after = 2  # Seconds
+
+class BcryptLimiter:
+    """
+    Cap concurrent bcrypt calls with two semaphores
+
+    Calls run on the caller's own thread (a request thread, or the OS
+    thread run_blocking hands them in green thread modes). At most
+    `workers` run at once, so password checks cannot use more than that
+    many cores, and at most `max_pending` more may wait; beyond that a call
+    fails immediately with BusyError. The semaphores are native ones: green
+    ones hang when used from run_blocking's OS threads.
+    """
+    
+    def __init__(self, workers=2, max_pending=16):
+        native = native_threading()
+        self.running = native.BoundedSemaphore(workers)
+        self.slots = native.BoundedSemaphore(workers + max_pending)
+    
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise BusyError("Too many login attempts in progress, try again shortly")
+        try:
+            with self.running:
+                return func(*args)
+        finally:
+            self.slots.release()
+    
+    def hashpw(self, secret):
+        return self.run(bcrypt.hashpw, secret.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    
+    def checkpw(self, secret, hashed):
+        return self.run(bcrypt.checkpw, secret.encode('utf-8'), hashed.encode('utf-8'))
+
 class AuthManager:
     """Manage authentication with 2FA (TOTP)"""
     
     def __init__(self, config_file='auth_config.json'):
         self.config_path = Path(__file__).parent / config_file
         self.config = self._load_config()
+        self.bcrypt = BcryptLimiter(
+            workers=int(os.getenv('BCRYPT_WORKERS', 2)),
+            max_pending=int(os.getenv('BCRYPT_MAX_PENDING', 16))
+        )
+        self._backup_lock = native_threading().Lock()  # A backup code is only used once
     
     def _load_config(self):
         """Load auth configuration from file"""
@@ -29,9 +79,54 @@ class AuthManager:
         }
     
     def _save_config(self):
-        """Save auth configuration to file"""
-        with open(self.config_path, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        """Save auth configuration to file (locked, atomic rename, owner-only)"""
+        with file_lock(self.config_path):
+            atomic_write(self.config_path, json.dumps(self.config, indent=2), private=True)
+    
+    def _generate_backup_codes(self, count=10):
+        """
+        Generate backup codes with unique lookup ids
+        Returns: (codes shown to the user, stored entries {id, hash})
+        """
+        codes, stored, ids = [], [], set()
+        while len(codes) < count:
+            lookup_id = secrets.token_hex(2).upper()
+            if lookup_id in ids:
+                continue
+            ids.add(lookup_id)
+            secret = secrets.token_hex(4).upper()
+            codes.append(f'{lookup_id}-{secret}')
+            stored.append({'id': lookup_id, 'hash': self.bcrypt.hashpw(secret)})
+        return codes, stored
+    
+    def _use_backup_code(self, code):
+        """
+        Check and consume a backup code
+        New codes cost at most one bcrypt check (found by lookup id). Codes
+        from before lookup ids existed are still accepted, checked one by one.
+        """
+        code = code.upper()
+        backup_codes = self.config.get('backup_codes', [])
+        
+        match = BACKUP_CODE_RE.match(code)
+        if match:
+            lookup_id, secret = match.groups()
+            for idx, entry in enumerate(backup_codes):
+                if isinstance(entry, dict) and entry['id'] == lookup_id:
+                    if not self.bcrypt.checkpw(secret, entry['hash']):
+                        return False
+                    backup_codes.pop(idx)
+                    self._save_config()
+                    return True
+            return False
+        
+        if LEGACY_BACKUP_CODE_RE.match(code):
+            for idx, entry in enumerate(backup_codes):
+                if isinstance(entry, str) and self.bcrypt.checkpw(code, entry):
+                    backup_codes.pop(idx)
+                    self._save_config()
+                    return True
+        return False
     
     def is_setup_completed(self):
         """Check if initial setup is completed"""
@@ -54,14 +149,10 @@ class AuthManager:
             totp_secret = pyotp.random_base32()
             
             # Hash password
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            password_hash = self.bcrypt.hashpw(password)
             
             # Generate backup codes (10 codes)
-            backup_codes = [secrets.token_hex(4).upper() for _ in range(10)]
-            backup_codes_hashed = [
-                bcrypt.hashpw(code.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                for code in backup_codes
-            ]
+            backup_codes, backup_codes_hashed = self._generate_backup_codes()
             
             # Generate QR code
             totp = pyotp.TOTP(totp_secret)
@@ -85,7 +176,7 @@ class AuthManager:
             self.config = {
                 'setup_completed': False,  # Will be set to True after verification
                 'username': username,
-                'password_hash': password_hash.decode('utf-8'),
+                'password_hash': password_hash,
                 'totp_secret': totp_secret,
                 'backup_codes': backup_codes_hashed
             }
@@ -93,6 +184,8 @@ class AuthManager:
             
             return True, qr_code_base64, totp_secret, backup_codes, None
             
+        except BusyError:
+            raise
         except Exception as e:
             return False, None, None, None, str(e)
     
@@ -125,6 +218,7 @@ class AuthManager:
     def verify_login(self, username, password, totp_code):
         """
         Verify login credentials with 2FA
+        Raises BusyError when the password could not be checked yet.
         Returns: (success, error)
         """
         try:
@@ -137,33 +231,30 @@ class AuthManager:
             
             # Check password
             stored_hash = self.config.get('password_hash')
-            if not bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
+            if not self.bcrypt.checkpw(password, stored_hash):
                 return False, "Invalid credentials"
             
-            # Check TOTP code
-            totp_secret = self.config.get('totp_secret')
-            totp = pyotp.TOTP(totp_secret)
-            
-            if totp.verify(totp_code, valid_window=1):
-                return True, None
+            # 6 digits: TOTP code, anything else: backup code
+            if TOTP_CODE_RE.match(totp_code):
+                totp = pyotp.TOTP(self.config.get('totp_secret'))
+                if totp.verify(totp_code, valid_window=1):
+                    return True, None
             else:
-                # Try backup codes
-                backup_codes = self.config.get('backup_codes', [])
-                for idx, hashed_code in enumerate(backup_codes):
-                    if bcrypt.checkpw(totp_code.encode('utf-8'), hashed_code.encode('utf-8')):
-                        # Remove used backup code
-                        self.config['backup_codes'].pop(idx)
-                        self._save_config()
+                with self._backup_lock:
+                    if self._use_backup_code(totp_code):
                         return True, None
+            
+            return False, "Invalid verification code"
                 
-                return False, "Invalid verification code"
-                
+        except BusyError:
+            raise
         except Exception as e:
             return False, str(e)
     
     def change_password(self, old_password, new_password, totp_code):
         """
         Change password (requires old password + TOTP)
+        Raises BusyError when the password could not be checked yet.
         Returns: (success, error)
         """
         try:
@@ -172,7 +263,7 @@ class AuthManager:
             
             # Verify old password
             stored_hash = self.config.get('password_hash')
-            if not bcrypt.checkpw(old_password.encode('utf-8'), stored_hash.encode('utf-8')):
+            if not self.bcrypt.checkpw(old_password, stored_hash):
                 return False, "Invalid current password"
             
             # Verify TOTP
@@ -186,18 +277,20 @@ class AuthManager:
                 return False, "New password must be at least 8 characters"
             
             # Hash and save new password
-            new_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            self.config['password_hash'] = new_hash.decode('utf-8')
+            self.config['password_hash'] = self.bcrypt.hashpw(new_password)
             self._save_config()
             
             return True, None
             
+        except BusyError:
+            raise
         except Exception as e:
             return False, str(e)
     
     def regenerate_backup_codes(self, password, totp_code):
         """
         Regenerate backup codes (requires password + TOTP)
+        Raises BusyError when the password could not be checked yet.
         Returns: (success, backup_codes, error)
         """
         try:
@@ -206,7 +299,7 @@ class AuthManager:
             
             # Verify password
             stored_hash = self.config.get('password_hash')
-            if not bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
+            if not self.bcrypt.checkpw(password, stored_hash):
                 return False, None, "Invalid password"
             
             # Verify TOTP
@@ -216,11 +309,7 @@ class AuthManager:
                 return False, None, "Invalid verification code"
             
             # Generate new backup codes
-            backup_codes = [secrets.token_hex(4).upper() for _ in range(10)]
-            backup_codes_hashed = [
-                bcrypt.hashpw(code.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                for code in backup_codes
-            ]
+            backup_codes, backup_codes_hashed = self._generate_backup_codes()
             
             # Save
             self.config['backup_codes'] = backup_codes_hashed
@@ -228,6 +317,8 @@ class AuthManager:
             
             return True, backup_codes, None
             
+        except BusyError:
+            raise
         except Exception as e:
             return False, None, str(e)
     
@@ -0,0 +1,110 @@
+"""
+State shared by the web process and the pipeline
+
+Settings, bot status/config, prompt templates and the on-disk stores the
+dashboard reads (drafts, traces, run history, Membit archive). Importing
+this module only opens those stores: nothing is recovered, pruned or
+scheduled, so the web process can import it while a worker process runs
+the pipeline. Stores only the pipeline uses live in pipeline.py.
+"""
+import os
+from datetime import datetime
+from settings_store import SettingsStore
+from prompt_templates import PromptTemplateStore
+from draft_queue import DraftQueue
+from membit_archive import MembitArchive
+from tracing import TraceStore
+from history_store import RunHistory
+
+# Typed settings (schedule, retries, API keys...) persisted to .env
+settings = SettingsStore()
+
+# Drafts generated in batches, posted one per run (batch mode); the pipeline releases drafts a dead run left claimed
+draft_queue = DraftQueue(max_age_hours=int(os.getenv('DRAFT_MAX_AGE_HOURS', 24)))
+
+# Archive of every raw Membit response (replay: python membit_archive.py), off by default
+membit_archive = MembitArchive(
+    max_age_days=int(os.getenv('MEMBIT_ARCHIVE_MAX_DAYS', 14)),
+    max_mb=int(os.getenv('MEMBIT_ARCHIVE_MAX_MB', 500))
+) if os.getenv('MEMBIT_ARCHIVE', '0') == '1' else None
+
+# Initialize run trace store (span timings of every run)
+trace_store = TraceStore()
+
+# Initialize persistent run/tweet history (SQLite)
+run_history = RunHistory()
+
+# Global variables
+bot_status = {
+    'running': False,
+    'last_run': None,
+    'next_run': None,
+    'total_tweets': 0,
+    'success_count': 0,
+    'error_count': 0,
+    'last_tweet': None,
+    'last_error': None,
+    'quota': None,  # Quota headroom, reported by the pipeline
+    'last_trace': None,
+    'draft_updates': 0  # Bumped when a run changes the draft queue (dashboard reloads it)
+}
+
+def restore_status():
+    """Restore counters and last tweet/error from run history after a restart"""
+    try:
+        totals = run_history.totals()
+        bot_status['total_tweets'] = totals['tweets']
+        bot_status['success_count'] = totals['tweets']
+        bot_status['error_count'] = totals['errors']
+        
+        last_tweet = run_history.last('tweet')
+        if last_tweet:
+            bot_status['last_tweet'] = {
+                'text': last_tweet['tweet_text'],
+                'id': last_tweet['tweet_id'],
+                'url': f"https://twitter.com/i/web/status/{last_tweet['tweet_id']}",
+                'timestamp': datetime.fromtimestamp(last_tweet['started_at']).strftime('%Y-%m-%d %H:%M:%S')
+            }
+        last_error = run_history.last('error')
+        if last_error:
+            bot_status['last_error'] = {
+                'message': last_error['error'],
+                'timestamp': datetime.fromtimestamp(last_error['started_at']).strftime('%Y-%m-%d %H:%M:%S')
+            }
+    except Exception as e:
+        print(f'Failed to restore status from run history: {e}')
+
+restore_status()
+
+# Store bot configuration
+bot_config = {
+    'enable_image': False,
+    'image_style': 'digital art',
+    'image_width': 1200,
+    'image_height': 675,
+    'membit_use_trending': True,   # Always enabled (required)
+    'membit_use_cluster_info': False,  # Optional, default unchecked
+    'membit_use_posts': False  # Optional, default unchecked
+}
+
+# Named, versioned prompt templates (validated when saved)
+prompt_store = PromptTemplateStore()
+
+def load_prompt_config(emit_log=None):
+    """Put the active prompt template into bot_config (also sent to the worker)"""
+    bot_config.update({
+        'prompt_name': prompt_store.active_name(),
+        'prompt_template': prompt_store.active_source(emit_log)
+    })
+
+# Load prompt on startup
+load_prompt_config()
+
+def format_duration(seconds):
+    """Format seconds as a short human readable duration"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f'{seconds}s'
+    if seconds < 3600:
+        return f'{seconds // 60}m'
+    return f'{seconds // 3600}h {(seconds % 3600) // 60}m'
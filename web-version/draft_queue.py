@@ -0,0 +1,220 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    topic TEXT,
+    membit_ref TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    decided_at REAL,
+    posted_at REAL,
+    tweet_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_status_id ON drafts(status, id);
+"""
+
+# pending: waiting for approval, approved: ready to post, posting: claimed by a run
+STATUSES = ('pending', 'approved', 'posting', 'posted', 'rejected', 'expired', 'failed')
+# Drafts still waiting to be posted
+OPEN_STATUSES = ('pending', 'approved', 'posting')
+MAX_POST_ATTEMPTS = 3
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+def batch_instructions(count):
+    """Appended to the rendered prompt: ask for `count` drafts in one response"""
+    return (
+        f"\n\nIMPORTANT: instead of one tweet, write {count} different tweets, each about a DIFFERENT "
+        f"topic from the data above (follow all rules for every tweet). Answer ONLY with a JSON array, "
+        f'no other text: [{{"topic": "<topic or cluster label>", "tweet": "<tweet text>"}}, ...]'
+    )
+
+def parse_drafts(text):
+    """
+    Drafts from a batch response (a JSON array of {topic, tweet} or of strings)
+    Raises Exception when the response holds no usable drafts.
+    Returns: list of (tweet, topic)
+    """
+    text = _FENCE_RE.sub('', (text or '').strip())
+    start, end = text.find('['), text.rfind(']')
+    try:
+        items = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise Exception("Gemini did not answer with a JSON list of drafts")
+
+    drafts = []
+    for item in items:
+        if isinstance(item, dict):
+            tweet, topic = item.get('tweet') or item.get('text'), item.get('topic')
+        else:
+            tweet, topic = item, None
+        if isinstance(tweet, str) and tweet.strip():
+            drafts.append((tweet.strip().strip('"').strip("'"), str(topic).strip() if topic else None))
+    if not drafts:
+        raise Exception("Gemini answered with an empty list of drafts")
+    return drafts
+
+class DraftQueue:
+    """
+    Persistent queue of generated tweets waiting to be posted, in SQLite
+
+    A batch run generates several drafts from one Membit snapshot; later
+    runs post them one at a time, oldest first, without calling Membit or
+    Gemini. Drafts wait as 'pending' until approved on the dashboard when
+    approval is required. A run claims a draft ('posting') before posting it,
+    so two runs never post the same draft, and drafts older than
+    `max_age_hours` expire since their trends are stale by then.
+    """
+
+    def __init__(self, db_file='data/drafts.db', max_age_hours=24):
+        self.db_file = Path(__file__).parent / db_file
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age_hours * 3600
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """One connection per thread (WAL lets the worker process write meanwhile)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def release_claimed(self):
+        """
+        Put drafts claimed by a run that died while posting back in the queue
+        Only the process that posts may call this (on start), it would
+        otherwise release a draft that is being posted right now.
+        """
+        with self._connect() as conn:
+            return conn.execute("UPDATE drafts SET status = 'approved' WHERE status = 'posting'").rowcount
+
+    def add(self, drafts, require_approval=False, membit_ref=None):
+        """
+        Queue (text, topic) drafts
+        Returns: ids of the new drafts
+        """
+        status = 'pending' if require_approval else 'approved'
+        now = time.time()
+        ids = []
+        with self._connect() as conn:
+            for text, topic in drafts:
+                cursor = conn.execute(
+                    'INSERT INTO drafts (created_at, text, topic, membit_ref, status) VALUES (?, ?, ?, ?, ?)',
+                    (now, text, topic, membit_ref, status)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def expire(self, now=None):
+        """Expire open drafts older than max_age, returns how many"""
+        cutoff = (time.time() if now is None else now) - self.max_age
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE drafts SET status = 'expired', decided_at = ? WHERE status IN ('pending', 'approved') AND created_at < ?",
+                (time.time(), cutoff)
+            )
+            return cursor.rowcount
+
+    def claim(self):
+        """
+        Claim the oldest approved draft for posting
+        Returns: the draft as a dict, or None when no draft is ready
+        """
+        self.expire()
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM drafts WHERE status = 'approved' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                # Another process may claim the same row first, then try the next one
+                cursor = conn.execute(
+                    "UPDATE drafts SET status = 'posting', attempts = attempts + 1 WHERE id = ? AND status = 'approved'",
+                    (row['id'],)
+                )
+                if cursor.rowcount:
+                    draft = dict(row)
+                    draft['attempts'] += 1
+                    return draft
+
+    def mark_posted(self, draft_id, tweet_id):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE drafts SET status = 'posted', posted_at = ?, tweet_id = ?, error = NULL WHERE id = ?",
+                (time.time(), tweet_id, draft_id)
+            )
+
+    def release(self, draft, error):
+        """Posting a claimed draft failed: back in the queue, or failed after MAX_POST_ATTEMPTS"""
+        status = 'failed' if draft['attempts'] >= MAX_POST_ATTEMPTS else 'approved'
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE drafts SET status = ?, error = ? WHERE id = ?',
+                (status, str(error)[:500], draft['id'])
+            )
+        return status
+
+    def approve(self, draft_id, text=None):
+        """Approve a pending draft, optionally with edited text; raises ValueError if it is not pending"""
+        with self._connect() as conn:
+            if text is not None and text.strip():
+                cursor = conn.execute(
+                    "UPDATE drafts SET status = 'approved', text = ?, decided_at = ? WHERE id = ? AND status = 'pending'",
+                    (text.strip(), time.time(), draft_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE drafts SET status = 'approved', decided_at = ? WHERE id = ? AND status = 'pending'",
+                    (time.time(), draft_id)
+                )
+            if not cursor.rowcount:
+                raise ValueError(f"Draft {draft_id} is not waiting for approval")
+
+    def reject(self, draft_id):
+        """Drop a pending or approved draft; raises ValueError if it cannot be rejected anymore"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE drafts SET status = 'rejected', decided_at = ? WHERE id = ? AND status IN ('pending', 'approved')",
+                (time.time(), draft_id)
+            )
+            if not cursor.rowcount:
+                raise ValueError(f"Draft {draft_id} cannot be rejected anymore")
+
+    def counts(self):
+        """Number of open drafts per status"""
+        counts = dict.fromkeys(OPEN_STATUSES, 0)
+        with self._connect() as conn:
+            for row in conn.execute(
+                f"SELECT status, COUNT(*) AS count FROM drafts WHERE status IN ({','.join('?' * len(OPEN_STATUSES))}) GROUP BY status",
+                OPEN_STATUSES
+            ):
+                counts[row['status']] = row['count']
+        return counts
+
+    def list(self, statuses=OPEN_STATUSES, limit=50):
+        """Drafts with one of `statuses`, oldest first"""
+        statuses = tuple(statuses)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM drafts WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY id LIMIT ?",
+                statuses + (max(1, min(limit, 200)),)
+            ).fetchall()
+        return [dict(row) for row in rows]
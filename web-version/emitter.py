@@ -0,0 +1,156 @@
+import copy
+import threading
+from collections import deque
+from functools import partial
+
+class SocketEmitter:
+    """
+    Coalesce Socket.IO traffic into batched frames
+
+    Log entries collected within a short window go out as one 'log_batch'
+    frame. Status changes go out as field-level 'status_delta' frames with a
+    version counter, so clients that miss a version can ask for a snapshot.
+    Pending logs are bounded; when a burst overflows the buffer the oldest
+    entries are dropped and the batch reports how many were lost.
+
+    Frames go to each connected client (connect()/disconnect()) and are
+    acknowledged by it. A client with `max_unacked` frames unacknowledged
+    gets nothing more until it catches up, then one full status snapshot
+    and the number of log lines it missed instead of the frames in between,
+    so a client that stops reading never builds up a send queue.
+    """
+
+    def __init__(self, socketio, window=0.1, max_pending=200, max_unacked=8):
+        self.socketio = socketio
+        self.window = window
+        self.max_unacked = max_unacked
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._wake = threading.Event()
+        self._logs = deque(maxlen=max_pending)
+        self._dropped = 0
+        self._status = None
+        self._sent_status = {}
+        self.version = 0
+        self._started = False
+
+    def _ensure_started(self):
+        if not self._started:
+            self._started = True
+            self.socketio.start_background_task(self._run)
+
+    def connect(self, sid):
+        """Start sending frames to a client (it got a snapshot and log history)"""
+        with self._lock:
+            self._clients[sid] = {'unacked': 0, 'dropped': 0, 'stale': False}
+
+    def disconnect(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def lagging(self):
+        """Number of clients that are not reading fast enough"""
+        with self._lock:
+            return sum(1 for client in self._clients.values() if client['unacked'] >= self.max_unacked)
+
+    def _acked(self, sid, *args):
+        """A client acknowledged a frame"""
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None or not client['unacked']:
+                return
+            client['unacked'] -= 1
+            caught_up = client['unacked'] < self.max_unacked and (client['stale'] or client['dropped'])
+        if caught_up:
+            self._wake.set()
+
+    def log(self, entry):
+        """Queue a log entry for the next batch"""
+        with self._lock:
+            if len(self._logs) == self._logs.maxlen:
+                self._dropped += 1
+            self._logs.append(entry)
+            self._ensure_started()
+        self._wake.set()
+
+    def status(self, bot_status):
+        """Queue a status update, only changed fields are sent"""
+        with self._lock:
+            self._status = bot_status
+            self._ensure_started()
+        self._wake.set()
+
+    def snapshot(self, bot_status):
+        """Full status with version for newly connected or resyncing clients"""
+        with self._lock:
+            payload = copy.deepcopy(bot_status)
+            payload['version'] = self.version
+            return payload
+
+    def _sent_snapshot(self):
+        """Status as of the last delta, for a client that missed some"""
+        payload = copy.deepcopy(self._sent_status)
+        payload['version'] = self.version
+        return payload
+
+    def pending(self):
+        """Number of log entries waiting to be sent"""
+        return len(self._logs)
+
+    def _run(self):
+        """Background flush loop"""
+        while True:
+            self._wake.wait()
+            self.socketio.sleep(self.window)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def flush(self):
+        """Send pending logs and status delta to every client that keeps up"""
+        with self._lock:
+            logs = list(self._logs)
+            self._logs.clear()
+            dropped, self._dropped = self._dropped, 0
+
+            delta = None
+            if self._status is not None:
+                changes = {
+                    key: copy.deepcopy(value) for key, value in self._status.items()
+                    if key not in self._sent_status or self._sent_status[key] != value
+                }
+                removed = [key for key in self._sent_status if key not in self._status]
+                self._status = None
+                if changes or removed:
+                    self.version += 1
+                    self._sent_status.update(changes)
+                    for key in removed:
+                        del self._sent_status[key]
+                    delta = {'version': self.version, 'changes': changes, 'removed': removed}
+
+            frames = []
+            snapshot = None
+            for sid, client in self._clients.items():
+                if client['unacked'] >= self.max_unacked:
+                    # Slow client: only remember what it has to catch up on
+                    client['dropped'] += len(logs) + dropped
+                    client['stale'] = client['stale'] or delta is not None
+                    continue
+                if logs or dropped or client['dropped']:
+                    frames.append((sid, 'log_batch', {'logs': logs, 'dropped': dropped + client['dropped']}))
+                    client['dropped'] = 0
+                    client['unacked'] += 1
+                if client['stale']:
+                    if snapshot is None:
+                        snapshot = self._sent_snapshot()
+                    frames.append((sid, 'status_update', snapshot))
+                    client['stale'] = False
+                    client['unacked'] += 1
+                elif delta:
+                    frames.append((sid, 'status_delta', delta))
+                    client['unacked'] += 1
+
+        for sid, event, data in frames:
+            self.socketio.emit(event, data, to=sid, callback=partial(self._acked, sid))
@@ -1,32 +1,35 @@
 // Service Worker for PWA
-const CACHE_NAME = 'twitter-bot-v1';
-const urlsToCache = [
-  '/',
-  '/index.html',
-  '/manifest.json',
-  '/icon-192.png',
-  '/icon-512.png'
-];
+// BUILD_VERSION and PRECACHE are filled in by `npm run build` (see vite.config.js).
+// Every build gets a new cache name: the new worker precaches the new files
+// and deletes caches of older builds when it activates.
+const BUILD_VERSION = '__BUILD_VERSION__';
+const PRECACHE = '__PRECACHE__';
 
-// Install event
+// Unbuilt (Vite dev server): no caching, always use the network
+const DEV = BUILD_VERSION.startsWith('__');
+const CACHE_NAME = `twitter-bot-${BUILD_VERSION}`;
+
+// Never cached: live data and the realtime connection
+const NETWORK_ONLY = ['/api/', '/socket.io/', '/metrics'];
+
+// Install event - precache the app shell and all built assets
 self.addEventListener('install', (event) => {
-  console.log('[SW] Installing...');
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('[SW] Caching app shell');
-        return cache.addAll(urlsToCache);
-      })
-      .catch((error) => {
-        console.error('[SW] Cache failed:', error);
-      })
-  );
+  console.log('[SW] Installing build', BUILD_VERSION);
+  if (!DEV) {
+    event.waitUntil(
+      caches.open(CACHE_NAME)
+        .then((cache) => cache.addAll(PRECACHE))
+        .catch((error) => {
+          console.error('[SW] Precache failed:', error);
+        })
+    );
+  }
   self.skipWaiting();
 });
 
-// Activate event
+// Activate event - drop caches of older builds
 self.addEventListener('activate', (event) => {
-  console.log('[SW] Activating...');
+  console.log('[SW] Activating build', BUILD_VERSION);
   event.waitUntil(
     caches.keys().then((cacheNames) => {
       return Promise.all(
@@ -42,29 +45,35 @@ self.addEventListener('activate', (event) => {
   self.clients.claim();
 });
 
-// Fetch event - Network first, fallback to cache
+// Fetch event - cache first for the built app, network only for live data
 self.addEventListener('fetch', (event) => {
-  // Skip cross-origin requests
-  if (!event.request.url.startsWith(self.location.origin)) {
+  const url = new URL(event.request.url);
+
+  // Skip cross-origin requests, non-GET requests and the dev server
+  if (DEV || url.origin !== self.location.origin || event.request.method !== 'GET') {
+    return;
+  }
+  if (NETWORK_ONLY.some((prefix) => url.pathname.startsWith(prefix))) {
     return;
   }
 
+  // Client-side routes (/login, /setup, ...) all load the cached app shell
+  const request = event.request.mode === 'navigate' ? '/' : event.request;
+
   event.respondWith(
-    fetch(event.request)
-      .then((response) => {
-        // Don't cache API calls
-        if (event.request.url.includes('/api/') || event.request.url.includes('/socket.io/')) {
-          return response;
+    caches.open(CACHE_NAME).then((cache) =>
+      cache.match(request).then((cached) => {
+        if (cached) {
+          return cached;
         }
-
-        const responseClone = response.clone();
-        caches.open(CACHE_NAME).then((cache) => {
-          cache.put(event.request, responseClone);
+        return fetch(event.request).then((response) => {
+          // Cache anything else from this build that was not precached
+          if (response.ok && response.type === 'basic') {
+            cache.put(request, response.clone());
+          }
+          return response;
         });
-        return response;
-      })
-      .catch(() => {
-        return caches.match(event.request);
       })
+    )
   );
 });
@@ -0,0 +1,73 @@
+import { useState, useEffect } from 'react'
+import { BarChart3 } from 'lucide-react'
+import './ActivityChart.css'
+
+const RANGES = {
+  '24h': { resolution: 'hour', limit: 24 },
+  '7d': { resolution: 'hour', limit: 168, points: 28 },
+  '90d': { resolution: 'day', limit: 90 }
+}
+
+function ActivityChart({ refreshKey }) {
+  const [range, setRange] = useState('24h')
+  const [data, setData] = useState(null)
+
+  useEffect(() => {
+    const { resolution, limit, points } = RANGES[range]
+    const params = new URLSearchParams({ resolution, limit, series: 'successes,errors,retries' })
+    if (points) params.set('points', points)
+    fetch(`/api/timeseries?${params}`, { credentials: 'include' })
+      .then(res => res.ok ? res.json() : null)
+      .then(result => setData(result))
+      .catch(() => {})
+  }, [range, refreshKey])
+
+  const successes = data?.series.successes?.values || []
+  const errors = data?.series.errors?.values || []
+  const length = Math.max(successes.length, errors.length)
+  const peak = Math.max(1, ...successes.map((value, i) => value + (errors[i] || 0)))
+
+  const bucketLabel = (i) => {
+    const start = new Date((data.start + i * data.step) * 1000)
+    return data.step >= 86400 ? start.toLocaleDateString() : start.toLocaleString()
+  }
+
+  return (
+    <div className="card activity-chart">
+      <h2>
+        <BarChart3 size={20} />
+        Activity
+        <span className="chart-ranges">
+          {Object.keys(RANGES).map(key => (
+            <button
+              key={key}
+              className={`chart-range ${range === key ? 'active' : ''}`}
+              onClick={() => setRange(key)}
+            >
+              {key}
+            </button>
+          ))}
+        </span>
+      </h2>
+      <div className="chart-bars">
+        {Array.from({ length }, (_, i) => (
+          <div
+            key={i}
+            className="chart-column"
+            title={`${bucketLabel(i)}: ${successes[i] || 0} tweets, ${errors[i] || 0} errors`}
+          >
+            <div className="chart-bar error" style={{ height: `${((errors[i] || 0) / peak) * 100}%` }} />
+            <div className="chart-bar success" style={{ height: `${((successes[i] || 0) / peak) * 100}%` }} />
+          </div>
+        ))}
+      </div>
+      <div className="chart-legend">
+        <span className="legend-item success">Tweets</span>
+        <span className="legend-item error">Errors</span>
+        <span className="legend-note">Since server start</span>
+      </div>
+    </div>
+  )
+}
+
+export default ActivityChart
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { io } from 'socket.io-client'
 import { 
@@ -16,6 +16,9 @@ import ControlPanel from './ControlPanel'
 import StatsGrid from './StatsGrid'
 import ConfigDisplay from './ConfigDisplay'
 import LastTweet from './LastTweet'
+import DraftQueue from './DraftQueue'
+import RunTrace from './RunTrace'
+import ActivityChart from './ActivityChart'
 import SettingsModal from './SettingsModal'
 import GuideModal from './GuideModal'
 import TerminalButton from './TerminalButton'
@@ -52,16 +55,32 @@ function Dashboard() {
   const [isTerminalMinimized, setIsTerminalMinimized] = useState(false)
   const [showProfile, setShowProfile] = useState(false)
   const [showDonation, setShowDonation] = useState(false)
+  const [history, setHistory] = useState(null)
+  const statusVersion = useRef(0)
+  const lastLogId = useRef(0)
 
   useEffect(() => {
-    // Check auth status
-    fetch('/api/auth/status', { credentials: 'include' })
-      .then(res => res.json())
-      .then(data => {
-        if (!data.logged_in) {
+    // Username, status, config and log history in one request
+    fetch('/api/bootstrap', { credentials: 'include' })
+      .then(res => {
+        if (res.status === 401) {
           navigate('/login')
-        } else {
-          setUsername(data.username)
+          return null
+        }
+        return res.json()
+      })
+      .then(data => {
+        if (!data) return
+        setUsername(data.username)
+        setConfig(data.config)
+        if ((data.status.version ?? 0) >= statusVersion.current) {
+          statusVersion.current = data.status.version ?? 0
+          setBotStatus(data.status)
+        }
+        const logs = data.logs.filter(log => log.id > lastLogId.current)
+        if (logs.length > 0) {
+          lastLogId.current = logs[logs.length - 1].id
+          setLogs(prev => [...prev, ...logs].slice(-100))
         }
       })
       .catch(() => navigate('/login'))
@@ -73,12 +92,40 @@ function Dashboard() {
       console.log('Connected to server')
     })
 
-    newSocket.on('status_update', (status) => {
+    // Full status snapshot (on connect or after a resync request)
+    newSocket.on('status_update', (status, ack) => {
+      // Acknowledge every batched frame, the server holds back frames for clients that fall behind
+      if (ack) ack()
+      statusVersion.current = status.version ?? 0
       setBotStatus(status)
     })
 
-    newSocket.on('log', (log) => {
-      setLogs(prev => [...prev.slice(-99), log])
+    // Field-level status changes, resync if a version was missed
+    newSocket.on('status_delta', (delta, ack) => {
+      if (ack) ack()
+      if (delta.version <= statusVersion.current) return
+      if (delta.version !== statusVersion.current + 1) {
+        newSocket.emit('request_status')
+        return
+      }
+      statusVersion.current = delta.version
+      setBotStatus(prev => {
+        const next = { ...prev, ...delta.changes }
+        delta.removed.forEach(key => delete next[key])
+        return next
+      })
+    })
+
+    newSocket.on('log_batch', (batch, ack) => {
+      if (ack) ack()
+      // Connect-time history overlaps with the bootstrap logs, keep new entries only
+      const fresh = batch.logs.filter(log => log.id > lastLogId.current)
+      if (fresh.length > 0) lastLogId.current = fresh[fresh.length - 1].id
+      const skipped = batch.dropped
+        ? [{ level: 'warning', message: `${batch.dropped} log lines skipped (see /api/logs)`, timestamp: '' }]
+        : []
+      if (fresh.length === 0 && skipped.length === 0) return
+      setLogs(prev => [...prev, ...skipped, ...fresh].slice(-100))
     })
 
     newSocket.on('error', (error) => {
@@ -89,22 +136,19 @@ function Dashboard() {
 
     setSocket(newSocket)
 
-    // Fetch initial config
-    fetch('/api/config', { credentials: 'include' })
-      .then(res => {
-        if (res.status === 401) {
-          navigate('/login')
-          return null
-        }
-        return res.json()
-      })
-      .then(data => {
-        if (data) setConfig(data)
-      })
-
     return () => newSocket.close()
   }, [navigate])
 
+  // Refresh history aggregates after every run
+  useEffect(() => {
+    fetch('/api/history/stats?days=7', { credentials: 'include' })
+      .then(res => res.ok ? res.json() : null)
+      .then(data => {
+        if (data) setHistory(data.summary)
+      })
+      .catch(() => {})
+  }, [botStatus.last_trace])
+
   const handleStartBot = () => {
     if (socket) {
       socket.emit('start_bot')
@@ -176,11 +220,19 @@ function Dashboard() {
           totalTweets={botStatus.success_count + botStatus.error_count}
           successCount={botStatus.success_count}
           errorCount={botStatus.error_count}
+          quota={botStatus.quota}
+          history={history}
         />
 
+        <ActivityChart refreshKey={botStatus.last_trace} />
+
         <ConfigDisplay config={config} />
 
         <LastTweet tweet={botStatus.last_tweet} />
+
+        <DraftQueue refreshKey={botStatus.draft_updates} />
+
+        <RunTrace lastTraceId={botStatus.last_trace} />
       </main>
 
       <DonationButton onClick={() => setShowDonation(!showDonation)} />
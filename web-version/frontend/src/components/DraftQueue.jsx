@@ -0,0 +1,83 @@
+import { useState, useEffect } from 'react'
+import { ListChecks, Check, X } from 'lucide-react'
+import './DraftQueue.css'
+
+function DraftQueue({ refreshKey }) {
+  const [drafts, setDrafts] = useState([])
+  const [edits, setEdits] = useState({})
+  const [error, setError] = useState('')
+
+  const load = () => {
+    fetch('/api/drafts', { credentials: 'include' })
+      .then(res => res.ok ? res.json() : null)
+      .then(data => {
+        if (data) setDrafts(data.drafts)
+      })
+      .catch(() => {})
+  }
+
+  // Refresh whenever a run queued or posted drafts
+  useEffect(load, [refreshKey])
+
+  const decide = async (draft, action) => {
+    setError('')
+    const body = action === 'approve' && edits[draft.id] !== undefined ? { text: edits[draft.id] } : {}
+    const res = await fetch(`/api/drafts/${draft.id}/${action}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      body: JSON.stringify(body)
+    })
+    const data = await res.json().catch(() => ({}))
+    if (!data.success) setError(data.error || `Failed to ${action} draft`)
+    load()
+  }
+
+  if (drafts.length === 0) return null
+
+  return (
+    <div className="card draft-queue">
+      <h2>
+        <ListChecks size={20} />
+        Draft Queue
+      </h2>
+      {error && <p className="draft-error">{error}</p>}
+      <div className="draft-list">
+        {drafts.map(draft => (
+          <div key={draft.id} className={`draft-item ${draft.status}`}>
+            <div className="draft-header">
+              <span className="draft-status">{draft.status}</span>
+              <span className="draft-topic">{draft.topic || 'No topic'}</span>
+              <span className="draft-time">{new Date(draft.created_at * 1000).toLocaleString()}</span>
+            </div>
+            {draft.status === 'pending' ? (
+              <textarea
+                rows="3"
+                value={edits[draft.id] ?? draft.text}
+                onChange={e => setEdits({ ...edits, [draft.id]: e.target.value })}
+              />
+            ) : (
+              <p>{draft.text}</p>
+            )}
+            {draft.status !== 'posting' && (
+              <div className="draft-actions">
+                {draft.status === 'pending' && (
+                  <button className="btn btn-primary btn-sm" onClick={() => decide(draft, 'approve')}>
+                    <Check size={16} />
+                    Approve
+                  </button>
+                )}
+                <button className="btn btn-secondary btn-sm" onClick={() => decide(draft, 'reject')}>
+                  <X size={16} />
+                  Reject
+                </button>
+              </div>
+            )}
+          </div>
+        ))}
+      </div>
+    </div>
+  )
+}
+
+export default DraftQueue
@@ -1,27 +1,101 @@
-import { Twitter, ExternalLink } from 'lucide-react'
+import { useState, useEffect } from 'react'
+import { Twitter, ExternalLink, ChevronLeft, ChevronRight } from 'lucide-react'
 import './LastTweet.css'
 
+const PAGE_SIZE = 10
+
+function toTweet(run) {
+  return {
+    text: run.tweet_text,
+    id: run.tweet_id,
+    url: `https://twitter.com/i/web/status/${run.tweet_id}`,
+    timestamp: new Date(run.started_at * 1000).toLocaleString()
+  }
+}
+
 function LastTweet({ tweet }) {
+  // Older tweets from run history, loaded a page at a time (newest first)
+  const [history, setHistory] = useState([])
+  const [nextBefore, setNextBefore] = useState(null)
+  const [index, setIndex] = useState(0)
+  const [loading, setLoading] = useState(false)
+
+  // A new tweet was posted, go back to it and drop the loaded pages
+  useEffect(() => {
+    setHistory([])
+    setNextBefore(null)
+    setIndex(0)
+  }, [tweet?.id])
+
+  const loadPage = async (before) => {
+    setLoading(true)
+    try {
+      const params = new URLSearchParams({ tweets: '1', limit: PAGE_SIZE })
+      if (before) params.set('before', before)
+      const res = await fetch(`/api/history?${params}`, { credentials: 'include' })
+      if (!res.ok) return []
+      const data = await res.json()
+      const runs = data.runs.filter(run => run.tweet_id !== tweet?.id)
+      setHistory(prev => [...prev, ...runs])
+      setNextBefore(data.next_before)
+      return runs
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  const showOlder = async () => {
+    if (index < history.length) {
+      setIndex(index + 1)
+      return
+    }
+    const cursor = history.length === 0 ? null : nextBefore
+    if (history.length > 0 && !cursor) return
+    const runs = await loadPage(cursor)
+    if (runs.length > 0) setIndex(index + 1)
+  }
+
+  const current = index === 0 ? tweet : toTweet(history[index - 1])
+  const hasOlder = index < history.length || (history.length === 0 ? !!tweet : !!nextBefore)
+
   return (
     <div className="card last-tweet">
       <h2>
         <Twitter size={20} />
-        Last Tweet
+        {index === 0 ? 'Last Tweet' : `Previous Tweet (${index} back)`}
       </h2>
-      {tweet ? (
+      {current ? (
         <div className="tweet-content">
-          <p>{tweet.text}</p>
+          <p>{current.text}</p>
           <div className="tweet-meta">
-            <span className="tweet-time">{tweet.timestamp}</span>
-            <a 
-              href={tweet.url} 
-              target="_blank" 
-              rel="noopener noreferrer"
-              className="btn btn-primary btn-sm"
-            >
-              <ExternalLink size={16} />
-              View on Twitter
-            </a>
+            <span className="tweet-time">{current.timestamp}</span>
+            <div className="tweet-actions">
+              <button
+                className="btn btn-secondary btn-sm"
+                onClick={() => setIndex(index - 1)}
+                disabled={index === 0}
+                title="Newer tweet"
+              >
+                <ChevronLeft size={16} />
+              </button>
+              <button
+                className="btn btn-secondary btn-sm"
+                onClick={showOlder}
+                disabled={!hasOlder || loading}
+                title="Older tweet"
+              >
+                <ChevronRight size={16} />
+              </button>
+              <a 
+                href={current.url} 
+                target="_blank" 
+                rel="noopener noreferrer"
+                className="btn btn-primary btn-sm"
+              >
+                <ExternalLink size={16} />
+                View on Twitter
+              </a>
+            </div>
           </div>
         </div>
       ) : (
@@ -31,8 +31,9 @@ function LoginPage() {
       return
     }
 
-    if (totpCode.length !== 6) {
-      setError('Code must be 6 digits')
+    // 6-digit authenticator code, or a backup code (XXXX-YYYYYYYY, older codes: 8 characters)
+    if (!/^(\d{6}|[0-9A-F]{4}-[0-9A-F]{8}|[0-9A-F]{8})$/.test(totpCode)) {
+      setError('Enter the 6-digit code or a backup code')
       return
     }
 
@@ -116,14 +117,13 @@ function LoginPage() {
             <input
               type="text"
               value={totpCode}
-              onChange={(e) => setTotpCode(e.target.value.replace(/\D/g, ''))}
+              onChange={(e) => setTotpCode(e.target.value.toUpperCase().replace(/[^0-9A-F-]/g, ''))}
               placeholder="000000"
-              maxLength="6"
-              pattern="[0-9]{6}"
+              maxLength="13"
               required
               className="code-input"
             />
-            <small>6-digit code from authenticator app</small>
+            <small>6-digit code from authenticator app, or a backup code</small>
           </div>
 
           <button type="submit" className="btn btn-primary btn-center" disabled={loading}>
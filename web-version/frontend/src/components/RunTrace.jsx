@@ -0,0 +1,82 @@
+import { useState, useEffect } from 'react'
+import { Activity } from 'lucide-react'
+import './RunTrace.css'
+
+function RunTrace({ lastTraceId }) {
+  const [traces, setTraces] = useState([])
+  const [selectedId, setSelectedId] = useState(null)
+  const [trace, setTrace] = useState(null)
+
+  // Refresh the run list whenever a new run starts or finishes
+  useEffect(() => {
+    fetch('/api/traces?limit=20', { credentials: 'include' })
+      .then(res => res.ok ? res.json() : null)
+      .then(data => {
+        if (!data) return
+        setTraces(data.traces)
+        if (data.traces.length > 0) setSelectedId(data.traces[0].id)
+      })
+      .catch(() => {})
+  }, [lastTraceId])
+
+  useEffect(() => {
+    if (!selectedId) return
+    fetch(`/api/traces/${selectedId}`, { credentials: 'include' })
+      .then(res => res.ok ? res.json() : null)
+      .then(data => setTrace(data))
+      .catch(() => {})
+  }, [selectedId])
+
+  const total = trace ? Math.max(trace.duration_ms, 1) : 1
+
+  const formatAttributes = (attributes) =>
+    Object.entries(attributes).map(([key, value]) => `${key}: ${value}`).join(', ')
+
+  return (
+    <div className="card run-trace">
+      <h2>
+        <Activity size={20} />
+        Run Timeline
+      </h2>
+      {traces.length === 0 ? (
+        <p className="empty-message">No runs recorded yet.</p>
+      ) : (
+        <>
+          <div className="trace-header">
+            <select value={selectedId || ''} onChange={(e) => setSelectedId(e.target.value)}>
+              {traces.map(t => (
+                <option key={t.id} value={t.id}>
+                  {new Date(t.started_at * 1000).toLocaleString()} - {t.outcome} ({(t.duration_ms / 1000).toFixed(1)}s)
+                </option>
+              ))}
+            </select>
+            {trace && <span className="trace-id">run {trace.id}</span>}
+          </div>
+          {trace && (
+            <div className="waterfall">
+              {trace.spans.map((span, idx) => (
+                <div key={idx} className="waterfall-row" title={formatAttributes(span.attributes)}>
+                  <span className="waterfall-name" style={{ paddingLeft: `${span.depth}rem` }}>
+                    {span.name}
+                  </span>
+                  <div className="waterfall-track">
+                    <div
+                      className={`waterfall-bar ${span.outcome}`}
+                      style={{
+                        left: `${(span.start_ms / total) * 100}%`,
+                        width: `${Math.max((span.duration_ms / total) * 100, 0.5)}%`
+                      }}
+                    />
+                  </div>
+                  <span className="waterfall-duration">{(span.duration_ms / 1000).toFixed(2)}s</span>
+                </div>
+              ))}
+            </div>
+          )}
+        </>
+      )}
+    </div>
+  )
+}
+
+export default RunTrace
@@ -5,6 +5,8 @@ import './SettingsModal.css'
 function SettingsModal({ config, onClose, onSave }) {
   const [activeTab, setActiveTab] = useState('api')
   const [showPasswords, setShowPasswords] = useState({})
+  const [templates, setTemplates] = useState([])
+  const [saveError, setSaveError] = useState('')
   const [formData, setFormData] = useState({
     membit_key: '',
     gemini_key: '',
@@ -15,6 +17,7 @@ function SettingsModal({ config, onClose, onSave }) {
     schedule_hours: config.schedule_hours,
     max_retries: config.max_retries,
     max_tweet_length: config.max_tweet_length,
+    prompt_name: config.prompt_name || 'default',
     prompt_template: config.prompt_template,
     enable_image: config.enable_image || false,
     image_style: config.image_style || 'digital art',
@@ -22,7 +25,11 @@ function SettingsModal({ config, onClose, onSave }) {
     image_height: config.image_height || 675,
     membit_use_trending: true,  // Always true (required, cannot be changed)
     membit_use_cluster_info: config.membit_use_cluster_info === true,  // Default false, only true if explicitly set
-    membit_use_posts: config.membit_use_posts === true  // Default false, only true if explicitly set
+    membit_use_posts: config.membit_use_posts === true,  // Default false, only true if explicitly set
+    membit_queries: config.membit_queries || 'Web3',
+    membit_prompt_mode: config.membit_prompt_mode || 'full',
+    draft_batch_size: config.draft_batch_size || 1,
+    draft_require_approval: config.draft_require_approval === true
   })
 
   useEffect(() => {
@@ -32,58 +39,92 @@ function SettingsModal({ config, onClose, onSave }) {
       .then(data => {
         setFormData(prev => ({ ...prev, ...data }))
       })
+
+    // Fetch saved prompt templates
+    fetch('/api/prompts')
+      .then(res => res.json())
+      .then(data => setTemplates(data.templates || []))
+      .catch(() => {})
   }, [])
 
+  const selectTemplate = (name) => {
+    const template = templates.find(t => t.name === name)
+    if (template) {
+      setFormData(prev => ({ ...prev, prompt_name: template.name, prompt_template: template.source }))
+    }
+  }
+
+  // POST JSON, returns the error message if the server rejected it
+  const post = async (url, body) => {
+    const res = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    })
+    const result = await res.json().catch(() => ({}))
+    return result.success ? null : (result.error || `Request failed (${res.status})`)
+  }
+
   const togglePassword = (field) => {
     setShowPasswords(prev => ({ ...prev, [field]: !prev[field] }))
   }
 
   const handleSave = async () => {
+    setSaveError('')
     try {
       // Save API keys
-      await fetch('/api/keys', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          membit_key: formData.membit_key,
-          gemini_key: formData.gemini_key,
-          twitter_key: formData.twitter_key,
-          twitter_secret: formData.twitter_secret,
-          twitter_token: formData.twitter_token,
-          twitter_access_secret: formData.twitter_access_secret
-        })
+      let error = await post('/api/keys', {
+        membit_key: formData.membit_key,
+        gemini_key: formData.gemini_key,
+        twitter_key: formData.twitter_key,
+        twitter_secret: formData.twitter_secret,
+        twitter_token: formData.twitter_token,
+        twitter_access_secret: formData.twitter_access_secret
       })
+      if (error) {
+        setSaveError(error)
+        setActiveTab('api')
+        return
+      }
 
       // Save config
-      await fetch('/api/config', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          schedule_hours: formData.schedule_hours,
-          max_retries: formData.max_retries,
-          max_tweet_length: formData.max_tweet_length,
-          enable_image: formData.enable_image,
-          image_style: formData.image_style,
-          image_width: formData.image_width,
-          image_height: formData.image_height,
-          membit_use_trending: formData.membit_use_trending,
-          membit_use_cluster_info: formData.membit_use_cluster_info,
-          membit_use_posts: formData.membit_use_posts
-        })
+      error = await post('/api/config', {
+        schedule_hours: formData.schedule_hours,
+        max_retries: formData.max_retries,
+        max_tweet_length: formData.max_tweet_length,
+        enable_image: formData.enable_image,
+        image_style: formData.image_style,
+        image_width: formData.image_width,
+        image_height: formData.image_height,
+        membit_use_trending: formData.membit_use_trending,
+        membit_use_cluster_info: formData.membit_use_cluster_info,
+        membit_use_posts: formData.membit_use_posts,
+        membit_queries: formData.membit_queries,
+        membit_prompt_mode: formData.membit_prompt_mode,
+        draft_batch_size: formData.draft_batch_size,
+        draft_require_approval: formData.draft_require_approval
       })
+      if (error) {
+        setSaveError(error)
+        setActiveTab('config')
+        return
+      }
 
-      // Save prompt
-      await fetch('/api/prompt', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          prompt_template: formData.prompt_template
-        })
+      // Save prompt (validated by the server, rejected templates are not saved)
+      error = await post('/api/prompt', {
+        name: formData.prompt_name,
+        prompt_template: formData.prompt_template
       })
+      if (error) {
+        setSaveError(error)
+        setActiveTab('prompt')
+        return
+      }
 
       onSave(formData)
     } catch (error) {
       console.error('Failed to save settings:', error)
+      setSaveError('Failed to save settings')
     }
   }
 
@@ -272,6 +313,32 @@ function SettingsModal({ config, onClose, onSave }) {
                 <small>Maximum tweet length in characters (recommended: 250)</small>
               </div>
 
+              <div className="form-group">
+                <label>Drafts per Batch</label>
+                <input
+                  type="number"
+                  min="1"
+                  max="20"
+                  value={formData.draft_batch_size}
+                  onChange={e => setFormData({ ...formData, draft_batch_size: parseInt(e.target.value) })}
+                />
+                <small>1 = generate a tweet every run. More than 1 generates that many drafts in one Gemini call; later runs post them from the queue.</small>
+              </div>
+
+              {formData.draft_batch_size > 1 && (
+                <div className="form-group">
+                  <label className="checkbox-label">
+                    <input
+                      type="checkbox"
+                      checked={formData.draft_require_approval}
+                      onChange={e => setFormData({ ...formData, draft_require_approval: e.target.checked })}
+                    />
+                    <span>Require Approval</span>
+                  </label>
+                  <small>Drafts are only posted after you approve them on the dashboard</small>
+                </div>
+              )}
+
               <div className="form-group">
                 <label className="checkbox-label">
                   <input
@@ -368,6 +435,29 @@ function SettingsModal({ config, onClose, onSave }) {
                   </small>
                 </div>
 
+                <div className="form-group" style={{marginTop: '1rem'}}>
+                  <label>Search Queries</label>
+                  <input
+                    type="text"
+                    value={formData.membit_queries}
+                    onChange={e => setFormData({ ...formData, membit_queries: e.target.value })}
+                    placeholder="Web3, DeFi:0.8, L2:0.8, AI crypto:0.7"
+                  />
+                  <small>Comma separated, optional weight after a colon. Queries are fetched in parallel, duplicates are merged and the best ranked topics go into the prompt.</small>
+                </div>
+
+                <div className="form-group">
+                  <label>Trending Data in Prompt</label>
+                  <select
+                    value={formData.membit_prompt_mode}
+                    onChange={e => setFormData({ ...formData, membit_prompt_mode: e.target.value })}
+                  >
+                    <option value="full">Full snapshot</option>
+                    <option value="delta">Changes since last run</option>
+                  </select>
+                  <small>Changes since last run sends only new and rising topics plus a short baseline: a shorter prompt, focused on what is new.</small>
+                </div>
+
                 {(formData.membit_use_cluster_info || formData.membit_use_posts) && (
                   <div style={{marginTop: '1rem', padding: '0.75rem', background: 'rgba(59, 130, 246, 0.1)', border: '1px solid rgba(59, 130, 246, 0.3)', borderRadius: '0.5rem'}}>
                     <small style={{color: 'var(--accent-blue)'}}>
@@ -381,6 +471,33 @@ function SettingsModal({ config, onClose, onSave }) {
 
           {activeTab === 'prompt' && (
             <div className="tab-content">
+              <div className="form-group">
+                <label>Template</label>
+                <div className="template-row">
+                  {templates.length > 1 && (
+                    <select
+                      value={templates.some(t => t.name === formData.prompt_name) ? formData.prompt_name : ''}
+                      onChange={e => selectTemplate(e.target.value)}
+                    >
+                      <option value="" disabled>New template</option>
+                      {templates.map(t => (
+                        <option key={t.name} value={t.name}>
+                          {t.name} (v{t.version}){t.active ? ' - active' : ''}
+                        </option>
+                      ))}
+                    </select>
+                  )}
+                  <input
+                    type="text"
+                    value={formData.prompt_name}
+                    onChange={e => setFormData({ ...formData, prompt_name: e.target.value })}
+                    placeholder="Template name"
+                    maxLength={40}
+                  />
+                </div>
+                <small>Saving adds a new version and makes this template active. Use a new name to keep the current one.</small>
+              </div>
+
               <div className="form-group">
                 <label>Tweet Prompt Template</label>
                 <textarea
@@ -390,11 +507,12 @@ function SettingsModal({ config, onClose, onSave }) {
                   placeholder="Enter your prompt template..."
                 />
                 <div className="prompt-help">
-                  <p><strong>Required variables:</strong></p>
+                  <p><strong>Variables:</strong></p>
                   <ul>
-                    <li><code>{'{trending_data}'}</code> - Trend data from Membit</li>
-                    <li><code>{'{max_tweet_length}'}</code> - Maximum tweet length</li>
+                    <li><code>{'{trending_data}'}</code> - Trend data from Membit (required)</li>
+                    <li><code>{'{max_tweet_length}'}</code> - Maximum tweet length (recommended)</li>
                   </ul>
+                  <p>Other <code>{'{...}'}</code> fields are rejected when saving. Write <code>{'{{'}</code> and <code>{'}}'}</code> for literal braces.</p>
                   
                   <p><strong>Tips for creating good prompts:</strong></p>
                   <ul className="prompt-tips">
@@ -411,6 +529,7 @@ function SettingsModal({ config, onClose, onSave }) {
         </div>
 
         <div className="modal-footer">
+          {saveError && <div className="save-error">{saveError}</div>}
           <button className="btn btn-secondary" onClick={onClose}>
             Cancel
           </button>
@@ -1,7 +1,7 @@
-import { CheckCircle2, XCircle, Hash } from 'lucide-react'
+import { CheckCircle2, XCircle, Hash, Gauge, TrendingUp } from 'lucide-react'
 import './StatsGrid.css'
 
-function StatsGrid({ totalTweets, successCount, errorCount }) {
+function StatsGrid({ totalTweets, successCount, errorCount, quota, history }) {
   return (
     <div className="stats-grid">
       <div className="stat-card success">
@@ -33,6 +33,34 @@ function StatsGrid({ totalTweets, successCount, errorCount }) {
           <p>Total Tweets</p>
         </div>
       </div>
+
+      {history && history.runs > 0 && (
+        <div className="stat-card history">
+          <div className="stat-icon">
+            <TrendingUp size={32} />
+          </div>
+          <div className="stat-content">
+            <h3>{Math.round(history.success_rate * 100)}%</h3>
+            <p>Success Rate (7d) · p95 {(history.p95_ms / 1000).toFixed(1)}s/run</p>
+          </div>
+        </div>
+      )}
+
+      {quota && (
+        <div className="stat-card quota">
+          <div className="stat-icon">
+            <Gauge size={32} />
+          </div>
+          <div className="stat-content">
+            <h3>{quota.posts_left_24h}/{quota.daily_post_limit}</h3>
+            <p>
+              {quota.blocked_until
+                ? `Rate limited until ${new Date(quota.blocked_until * 1000).toLocaleTimeString()}`
+                : `Posts Left (24h) · ${quota.posts_left_30d} this month`}
+            </p>
+          </div>
+        </div>
+      )}
     </div>
   )
 }
@@ -1,9 +1,63 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import { createHash } from 'node:crypto'
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs'
+import { join, relative, sep } from 'node:path'
+import { brotliCompressSync, gzipSync, constants } from 'node:zlib'
+
+const COMPRESSIBLE = /\.(js|css|html|svg|json|txt|webmanifest)$/
+
+function listFiles(dir) {
+  return readdirSync(dir).flatMap(name => {
+    const path = join(dir, name)
+    return statSync(path).isDirectory() ? listFiles(path) : [path]
+  })
+}
+
+// After the build: stamp the service worker with a build version and the
+// list of files to precache, then write .br/.gz next to every text asset
+// so Flask can serve them without compressing on each request.
+function precompressAndStampServiceWorker() {
+  let outDir
+  return {
+    name: 'precompress-and-stamp-sw',
+    apply: 'build',
+    configResolved(config) {
+      outDir = config.build.outDir
+    },
+    closeBundle() {
+      const files = listFiles(outDir)
+        .map(path => relative(outDir, path).split(sep).join('/'))
+        .filter(path => !/\.(br|gz)$/.test(path) && path !== 'sw.js')
+
+      const hash = createHash('sha256')
+      for (const file of files.sort()) {
+        hash.update(file).update(readFileSync(join(outDir, file)))
+      }
+      const version = hash.digest('hex').slice(0, 12)
+
+      const swPath = join(outDir, 'sw.js')
+      const precache = ['/', ...files.filter(file => file !== 'index.html').map(file => `/${file}`)]
+      writeFileSync(swPath, readFileSync(swPath, 'utf-8')
+        .replace("'__BUILD_VERSION__'", JSON.stringify(version))
+        .replace("'__PRECACHE__'", JSON.stringify(precache)))
+
+      for (const file of listFiles(outDir)) {
+        if (!COMPRESSIBLE.test(file)) continue
+        const data = readFileSync(file)
+        if (data.length < 512) continue
+        writeFileSync(`${file}.gz`, gzipSync(data, { level: 9 }))
+        writeFileSync(`${file}.br`, brotliCompressSync(data, {
+          params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY }
+        }))
+      }
+    }
+  }
+}
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompressAndStampServiceWorker()],
   server: {
     host: '0.0.0.0', // Expose to network
     port: 5173,
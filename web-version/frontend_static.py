@@ -0,0 +1,71 @@
+import re
+import mimetypes
+from pathlib import Path
+from flask import abort, jsonify, request, send_file
+
+DIST_DIR = Path(__file__).parent / 'frontend' / 'dist'
+
+# Vite output names carry a content hash (index-B3x9_kQz.js), safe to cache forever
+FINGERPRINTED = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8,}\.\w+$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Precompressed variants written by the Vite build, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def _accepted_encodings():
+    accepted = request.headers.get('Accept-Encoding', '')
+    return [(encoding, suffix) for encoding, suffix in ENCODINGS if encoding in accepted]
+
+def send_asset(relative_path):
+    """
+    Send a file from the frontend build
+    Picks the .br/.gz variant the client accepts, fingerprinted files get
+    immutable caching, everything else is revalidated with its ETag.
+    """
+    path = (DIST_DIR / relative_path).resolve()
+    if DIST_DIR.resolve() not in path.parents or not path.is_file():
+        abort(404)
+
+    mimetype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    immutable = bool(FINGERPRINTED.match(relative_path))
+
+    served, encoding = path, None
+    for candidate_encoding, suffix in _accepted_encodings():
+        candidate = path.with_name(path.name + suffix)
+        if candidate.is_file():
+            served, encoding = candidate, candidate_encoding
+            break
+
+    response = send_file(
+        served,
+        mimetype=mimetype,
+        conditional=True,
+        etag=True,
+        max_age=31536000 if immutable else None
+    )
+    response.headers['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def register(app):
+    """Serve the built dashboard (frontend/dist) from Flask"""
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def frontend(path):
+        if path.startswith(('api/', 'socket.io/')):
+            abort(404)
+        if not (DIST_DIR / 'index.html').is_file():
+            return jsonify({
+                'error': 'Frontend not built. Run "npm run build" in web-version/frontend, or use the Vite dev server.'
+            }), 404
+        if path and (DIST_DIR / path).is_file():
+            return send_asset(path)
+        if path.startswith('assets/'):
+            abort(404)
+        # Client-side routes (/login, /setup, ...) all load the app shell
+        return send_asset('index.html')
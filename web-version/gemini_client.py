@@ -15,11 +15,21 @@ class GeminiClient:
         genai.configure(api_key=api_key)
         # Use Gemini 2.5 Flash - stable version released June 2025
         self.model = genai.GenerativeModel('models/gemini-2.5-flash')
+        self.last_usage = {}
+    
+    def _record_usage(self, response):
+        """Keep token counts of the last response (for run traces)"""
+        usage = getattr(response, 'usage_metadata', None)
+        self.last_usage = {
+            'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+            'output_tokens': getattr(usage, 'candidates_token_count', None)
+        } if usage else {}
     
     def generate_content(self, prompt):
         """Generate content using Gemini"""
         try:
             response = self.model.generate_content(prompt)
+            self._record_usage(response)
             return response.text.strip()
         except Exception as e:
             raise Exception(f"Failed to generate content with Gemini: {str(e)}")
@@ -48,6 +58,7 @@ Prompt: "golden bitcoin coin, upward arrow, financial growth, modern minimal"
 Now create the prompt (ONLY the prompt, no explanation):"""
             
             response = self.model.generate_content(prompt)
+            self._record_usage(response)
             image_prompt = response.text.strip().strip('"').strip("'")
             
             # Limit to 80 chars
@@ -0,0 +1,196 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT,
+    started_at REAL NOT NULL,
+    duration_ms REAL,
+    outcome TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    tweet_id TEXT,
+    tweet_text TEXT,
+    media INTEGER NOT NULL DEFAULT 0,
+    membit_ref TEXT,
+    stages TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_outcome_started_at ON runs(outcome, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_tweets ON runs(id) WHERE tweet_id IS NOT NULL;
+"""
+
+# Runs that posted a tweet
+POSTED_OUTCOMES = ('success', 'recovered')
+
+class RunHistory:
+    """
+    Persistent history of pipeline runs in SQLite
+
+    One row per run with attempts, tweet, media, stage timings (ms per stage),
+    a reference to the Membit data it used and the last error. Aggregates are
+    computed in SQL, history pages use keyset pagination on the row id so a
+    page costs the same no matter how far back it is.
+    """
+
+    def __init__(self, db_file='data/history.db'):
+        self.db_file = Path(__file__).parent / db_file
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """One connection per thread (WAL lets the worker process write meanwhile)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def record(self, trace_record):
+        """
+        Store a finished run from its trace (tracing.Trace.to_dict())
+        Tweet and Membit data come from the trace attributes: tweet_id,
+        tweet_text, media, membit_ref
+        """
+        stages = {}
+        attempts = errors = 0
+        error = None
+        for name, parent, start_ms, duration_ms, outcome, attributes in trace_record['spans']:
+            if name == 'attempt':
+                attempts += 1
+                if outcome == 'error':
+                    errors += 1
+                    error = attributes.get('error', error)
+            else:
+                stages[name] = round(stages.get(name, 0) + duration_ms, 1)
+
+        attributes = trace_record.get('attributes', {})
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO runs (trace_id, started_at, duration_ms, outcome, attempts, errors,
+                                     tweet_id, tweet_text, media, membit_ref, stages, error)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    trace_record['id'], trace_record['started_at'], trace_record['duration_ms'],
+                    trace_record['outcome'], attempts, errors,
+                    attributes.get('tweet_id'), attributes.get('tweet_text'), attributes.get('media', 0),
+                    attributes.get('membit_ref'), json.dumps(stages, separators=(',', ':')), error
+                )
+            )
+
+    def record_recovered(self, tweet_id, text):
+        """Store a tweet found on the timeline from an unfinished earlier run"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (started_at, outcome, tweet_id, tweet_text) VALUES (?, 'recovered', ?, ?)",
+                (time.time(), tweet_id, text)
+            )
+
+    def _row(self, row):
+        run = dict(row)
+        run['stages'] = json.loads(run['stages']) if run['stages'] else {}
+        return run
+
+    def page(self, before=None, limit=20, tweets_only=False, outcome=None):
+        """
+        Newest runs first, older than row id `before`
+        Returns: (runs, next_before) - pass next_before to get the following page
+        """
+        limit = max(1, min(int(limit), 200))
+        clauses, params = [], []
+        if before is not None:
+            clauses.append('id < ?')
+            params.append(before)
+        if tweets_only:
+            clauses.append('tweet_id IS NOT NULL')
+        if outcome:
+            clauses.append('outcome = ?')
+            params.append(outcome)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        rows = self._connect().execute(
+            f'SELECT * FROM runs {where} ORDER BY id DESC LIMIT ?', params + [limit + 1]
+        ).fetchall()
+        runs = [self._row(row) for row in rows[:limit]]
+        next_before = runs[-1]['id'] if len(rows) > limit else None
+        return runs, next_before
+
+    def daily_stats(self, days=30):
+        """Per-day run counts, success rate and p95 run latency (skipped runs excluded)"""
+        since = time.time() - days * 86400
+        rows = self._connect().execute(
+            """
+            WITH ranked AS (
+                SELECT date(started_at, 'unixepoch', 'localtime') AS day,
+                       outcome,
+                       duration_ms,
+                       ROW_NUMBER() OVER (PARTITION BY date(started_at, 'unixepoch', 'localtime')
+                                          ORDER BY duration_ms) AS rn,
+                       COUNT(*) OVER (PARTITION BY date(started_at, 'unixepoch', 'localtime')) AS n
+                FROM runs
+                WHERE started_at >= ? AND outcome NOT IN ('skipped', 'recovered')
+            )
+            SELECT day,
+                   COUNT(*) AS runs,
+                   SUM(outcome = 'success') AS successes,
+                   ROUND(1.0 * SUM(outcome = 'success') / COUNT(*), 4) AS success_rate,
+                   MIN(CASE WHEN rn >= (n * 95 + 99) / 100 THEN duration_ms END) AS p95_ms,
+                   ROUND(AVG(duration_ms), 1) AS avg_ms
+            FROM ranked
+            GROUP BY day
+            ORDER BY day DESC
+            """,
+            (since,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self, days=7):
+        """Run count, success rate and p95 run latency over the last `days`"""
+        since = time.time() - days * 86400
+        row = self._connect().execute(
+            """
+            WITH ranked AS (
+                SELECT outcome, duration_ms,
+                       ROW_NUMBER() OVER (ORDER BY duration_ms) AS rn,
+                       COUNT(*) OVER () AS n
+                FROM runs
+                WHERE started_at >= ? AND outcome NOT IN ('skipped', 'recovered')
+            )
+            SELECT COUNT(*) AS runs,
+                   COALESCE(SUM(outcome = 'success'), 0) AS successes,
+                   ROUND(1.0 * SUM(outcome = 'success') / COUNT(*), 4) AS success_rate,
+                   MIN(CASE WHEN rn >= (n * 95 + 99) / 100 THEN duration_ms END) AS p95_ms
+            FROM ranked
+            """,
+            (since,)
+        ).fetchone()
+        return dict(row)
+
+    def totals(self):
+        """Lifetime counters (restores dashboard counters after a restart)"""
+        row = self._connect().execute(
+            f"""
+            SELECT COALESCE(SUM(outcome IN {POSTED_OUTCOMES}), 0) AS tweets,
+                   COALESCE(SUM(errors), 0) AS errors
+            FROM runs
+            """
+        ).fetchone()
+        return dict(row)
+
+    def last(self, condition):
+        """Newest run matching a fixed condition ('tweet' or 'error')"""
+        where = 'tweet_id IS NOT NULL' if condition == 'tweet' else 'error IS NOT NULL'
+        row = self._connect().execute(
+            f'SELECT * FROM runs WHERE {where} ORDER BY id DESC LIMIT 1'
+        ).fetchone()
+        return self._row(row) if row else None
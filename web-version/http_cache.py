@@ -0,0 +1,133 @@
+import gzip
+import json
+import uuid
+import threading
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Smaller bodies are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+# Part of every ETag, so tags from before a restart never match
+BOOT_ID = uuid.uuid4().hex[:8]
+
+def _encode(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+def pick_encoding():
+    """Best encoding the client accepts: br (when brotli is installed), gzip or None"""
+    accepted = request.headers.get('Accept-Encoding', '')
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def etag_matches(etag):
+    """Whether If-None-Match contains the current ETag"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip() for tag in header.split(',')]
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+class CachedJson:
+    """
+    JSON body rebuilt only when its version changes
+
+    version() returns any hashable value describing the state behind the
+    body (a counter, a tuple of counters...). The serialized body, its ETag
+    and compressed variants are kept until the version changes, so polling
+    a resource that did not change costs a version check and, with
+    If-None-Match, an empty 304.
+    """
+
+    def __init__(self, name, build, version):
+        self.name = name
+        self.build = build
+        self.version = version
+        self._lock = threading.Lock()
+        self._entry = None
+        self._serial = 0
+
+    def _current(self):
+        version = self.version()
+        entry = self._entry
+        if entry is not None and entry['version'] == version:
+            return entry
+        with self._lock:
+            if self._entry is None or self._entry['version'] != version:
+                body = json.dumps(self.build(), separators=(',', ':')).encode('utf-8')
+                self._serial += 1
+                self._entry = {
+                    'version': version,
+                    'body': body,
+                    'etag': f'"{self.name}-{BOOT_ID}-{self._serial}"',
+                    'encoded': {}
+                }
+            return self._entry
+
+    def data(self):
+        """Current payload as Python data (for combined responses)"""
+        return json.loads(self._current()['body'])
+
+    def etag(self):
+        return self._current()['etag']
+
+    def response(self):
+        """304 when the client has the current version, else the (compressed) body"""
+        entry = self._current()
+        if etag_matches(entry['etag']):
+            return not_modified(entry['etag'])
+
+        body = entry['body']
+        encoding = pick_encoding() if len(body) >= MIN_COMPRESS_BYTES else None
+        if encoding:
+            encoded = entry['encoded'].get(encoding)
+            if encoded is None:
+                encoded = entry['encoded'][encoding] = _encode(body, encoding)
+            body = encoded
+
+        response = Response(body, mimetype='application/json')
+        response.headers['ETag'] = entry['etag']
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+def compress_response(response):
+    """
+    after_request hook: compress JSON/text bodies the client accepts
+    Skips responses that are already encoded, streamed or too small.
+    """
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(('application/json', 'text/'))):
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+    encoding = pick_encoding()
+    if not encoding:
+        return response
+
+    response.set_data(_encode(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    vary = response.headers.get('Vary')
+    response.headers['Vary'] = f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'
+    return response
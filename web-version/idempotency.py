@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import time
+import html
+import hashlib
+import threading
+import unicodedata
+from pathlib import Path
+from twitter_client import UncertainPostError, DuplicateTweetError, TimelineUnavailableError
+
+RECORD_TTL = 7 * 24 * 3600  # Forget attempts after a week
+RECONCILE_DELAY = 3  # Seconds to wait for the timeline to catch up
+
+_URL_RE = re.compile(r'https?://\S+')
+_TRAILING_URLS_RE = re.compile(r'(?:\s*<url>)+$')
+_SPACE_RE = re.compile(r'\s+')
+
+def normalize_text(text):
+    """Normalize tweet text for comparison (Twitter rewrites URLs and escapes HTML)"""
+    text = unicodedata.normalize('NFC', html.unescape(text or ''))
+    text = _URL_RE.sub('<url>', text)
+    return _SPACE_RE.sub(' ', text).strip().casefold()
+
+def timeline_text(text):
+    """Normalized text without trailing links (Twitter appends a t.co link for attached media)"""
+    return _TRAILING_URLS_RE.sub('', normalize_text(text)).strip()
+
+def draft_key(text):
+    """Stable idempotency key for a draft"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()[:16]
+
+class PostAttemptStore:
+    """
+    Persistent record of post attempts keyed by draft
+
+    Every attempt is written (and fsynced) before Twitter is called, so an
+    attempt that timed out or was interrupted by a crash can be reconciled
+    against the timeline instead of being posted twice.
+    """
+
+    def __init__(self, store_file='data/post_attempts.json'):
+        self.store_path = Path(__file__).parent / store_file
+        self._lock = threading.Lock()
+        self.records = self._load_records()
+
+    def _load_records(self):
+        """Load attempt records from file"""
+        if self.store_path.exists():
+            try:
+                with open(self.store_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save_records(self):
+        """Save attempt records durably (temp file, fsync, rename)"""
+        cutoff = time.time() - RECORD_TTL
+        self.records = {k: r for k, r in self.records.items() if r.get('updated_at', 0) > cutoff}
+
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.store_path)
+
+    def _mark(self, key, state, **fields):
+        """Update record state and persist it"""
+        with self._lock:
+            record = self.records.setdefault(key, {'attempted_at': time.time()})
+            record.update(fields)
+            # Only a state change counts for RECORD_TTL, a record stuck 'uncertain' must still expire
+            if record.get('state') != state:
+                record['updated_at'] = time.time()
+            record['state'] = state
+            self._save_records()
+            return dict(record)
+
+    def get(self, key):
+        """Get attempt record for key"""
+        with self._lock:
+            record = self.records.get(key)
+            return dict(record) if record else None
+
+    def pending(self):
+        """Attempts whose outcome is unknown (timeout or crash mid-post)"""
+        with self._lock:
+            return [
+                (key, dict(record)) for key, record in self.records.items()
+                if record.get('state') in ('pending', 'uncertain')
+            ]
+
+    def _find_on_timeline(self, twitter, text):
+        """Look for the draft in recent timeline posts, returns tweet id or None"""
+        wanted = timeline_text(text)
+        for tweet in twitter.get_recent_tweets(max_results=10):
+            if timeline_text(tweet['text']) == wanted:
+                return tweet['id']
+        return None
+
+    def reconcile(self, twitter, key, text):
+        """
+        Resolve an attempt with unknown outcome
+        Returns: tweet id if it was posted, None if it was not
+        Raises: UncertainPostError if the timeline cannot be read, the attempt
+        stays 'uncertain' and is never posted again (Free tier API access
+        cannot read the timeline at all)
+        """
+        try:
+            tweet_id = self._find_on_timeline(twitter, text)
+        except TimelineUnavailableError as e:
+            self._mark(key, 'uncertain', text=text)
+            raise UncertainPostError(f"Cannot verify previous post attempt without timeline access, not re-posting: {str(e)}")
+        except Exception as e:
+            self._mark(key, 'uncertain', text=text)
+            raise UncertainPostError(f"Cannot verify previous post attempt, not re-posting: {str(e)}")
+
+        if tweet_id:
+            self._mark(key, 'posted', text=text, tweet_id=tweet_id)
+        else:
+            self._mark(key, 'failed', text=text)
+        return tweet_id
+
+    def reconcile_pending(self, twitter):
+        """
+        Reconcile attempts left pending by a crash or restart
+        Returns: list of {'id', 'text'} for attempts that turned out to be posted
+        """
+        recovered = []
+        for key, record in self.pending():
+            try:
+                tweet_id = self.reconcile(twitter, key, record.get('text', ''))
+            except UncertainPostError:
+                continue
+            if tweet_id:
+                recovered.append({'id': tweet_id, 'text': record.get('text', '')})
+        return recovered
+
+    def post_once(self, twitter, text, media_ids=None):
+        """
+        Post a draft at most once across retries and restarts
+        Returns: {'id', 'text', 'deduplicated', 'reconciled'}
+        - deduplicated: draft was already posted earlier, nothing was sent
+        - reconciled: outcome was unknown and the post was found on the timeline
+        """
+        key = draft_key(text)
+        record = self.get(key)
+
+        if record and record.get('state') == 'posted':
+            return {'id': record['tweet_id'], 'text': text, 'deduplicated': True, 'reconciled': False}
+
+        if record and record.get('state') in ('pending', 'uncertain'):
+            tweet_id = self.reconcile(twitter, key, text)
+            if tweet_id:
+                return {'id': tweet_id, 'text': text, 'deduplicated': False, 'reconciled': True}
+
+        # Record the attempt before calling Twitter
+        self._mark(key, 'pending', text=text)
+
+        try:
+            result = twitter.post_tweet(text, media_ids=media_ids)
+        except (UncertainPostError, DuplicateTweetError):
+            # Twitter may have accepted the post, check before trying again
+            time.sleep(RECONCILE_DELAY)
+            tweet_id = self.reconcile(twitter, key, text)
+            if tweet_id:
+                return {'id': tweet_id, 'text': text, 'deduplicated': False, 'reconciled': True}
+
+            # Confirmed not posted, safe to post the same draft once more
+            self._mark(key, 'pending', text=text)
+            try:
+                result = twitter.post_tweet(text, media_ids=media_ids)
+            except UncertainPostError:
+                self._mark(key, 'uncertain', text=text)
+                raise
+            except Exception:
+                self._mark(key, 'failed', text=text)
+                raise
+        except Exception:
+            self._mark(key, 'failed', text=text)
+            raise
+
+        self._mark(key, 'posted', text=text, tweet_id=result['id'])
+        return {'id': result['id'], 'text': text, 'deduplicated': False, 'reconciled': False}
@@ -10,6 +10,8 @@ class ImageGenerator:
         self.base_url = "https://image.pollinations.ai/prompt"
         self.temp_dir = Path(__file__).parent / 'temp'
         self.temp_dir.mkdir(exist_ok=True)
+        self.last_status = None
+        self.last_size = None
     
     def generate_image(self, prompt, width=1200, height=675, style="digital art"):
         """
@@ -42,6 +44,8 @@ class ImageGenerator:
             
             # Download image
             response = requests.get(url, params=params, timeout=30)
+            self.last_status = response.status_code
+            self.last_size = len(response.content)
             response.raise_for_status()
             
             # Save to temp file
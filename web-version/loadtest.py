@@ -0,0 +1,147 @@
+"""
+Dashboard load test
+
+Opens an increasing number of concurrent Socket.IO dashboard connections
+and measures, at every step:
+- HTTP latency of GET /api/status (the dashboard's polling endpoint)
+- Socket round trip: 'request_status' -> 'status_update'
+
+The highest step whose p95 latencies stay within the target is reported as
+the number of concurrent dashboards the server sustains.
+
+Usage:
+    python loadtest.py --username admin --password secret --totp 123456
+    python loadtest.py --cookie <session cookie> --steps 50,100,200,400 --target-ms 250
+
+Requires: pip install "python-socketio[client]" websocket-client
+"""
+import argparse
+import statistics
+import threading
+import time
+import requests
+import socketio
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+def login(base_url, username, password, totp):
+    """Login and return the session cookie"""
+    session = requests.Session()
+    response = session.post(f'{base_url}/api/auth/login', json={
+        'username': username,
+        'password': password,
+        'totp_code': totp
+    })
+    response.raise_for_status()
+    return session.cookies.get('session')
+
+class DashboardClient:
+    """One simulated dashboard connection"""
+
+    def __init__(self, base_url, cookie):
+        self.base_url = base_url
+        self.cookie = cookie
+        self.sio = socketio.Client(reconnection=False)
+        self.snapshot = threading.Event()
+        self.sio.on('status_update', lambda data: self.snapshot.set())
+
+    def connect(self):
+        self.sio.connect(self.base_url, headers={'Cookie': f'session={self.cookie}'}, transports=['websocket'])
+
+    def round_trip(self, timeout=10):
+        """Time request_status -> status_update in ms"""
+        self.snapshot.clear()
+        start = time.perf_counter()
+        self.sio.emit('request_status')
+        if not self.snapshot.wait(timeout):
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+def run_step(base_url, cookie, clients, target, samples):
+    """Grow the pool of connections to `target` and measure latency"""
+    while len(clients) < target:
+        client = DashboardClient(base_url, cookie)
+        client.connect()
+        clients.append(client)
+    time.sleep(1)  # Let connect-time traffic settle
+
+    http_session = requests.Session()
+    http_session.cookies.set('session', cookie)
+    http_latency, socket_latency, failures = [], [], 0
+
+    for i in range(samples):
+        start = time.perf_counter()
+        try:
+            http_session.get(f'{base_url}/api/status', timeout=10).raise_for_status()
+            http_latency.append((time.perf_counter() - start) * 1000)
+        except requests.RequestException:
+            failures += 1
+
+        rtt = clients[i % len(clients)].round_trip()
+        if rtt is None:
+            failures += 1
+        else:
+            socket_latency.append(rtt)
+
+    return http_latency, socket_latency, failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Dashboard load test')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--totp', help='Current 2FA code')
+    parser.add_argument('--cookie', help='Existing session cookie instead of login')
+    parser.add_argument('--steps', default='25,50,100,200,400', help='Concurrent connections per step')
+    parser.add_argument('--samples', type=int, default=100, help='Requests measured per step')
+    parser.add_argument('--target-ms', type=float, default=250, help='p95 latency target')
+    args = parser.parse_args()
+
+    cookie = args.cookie or login(args.url, args.username, args.password, args.totp)
+    steps = [int(step) for step in args.steps.split(',')]
+
+    print('=' * 78)
+    print(f'Dashboard load test: {args.url}  (p95 target {args.target_ms:.0f} ms)')
+    print('=' * 78)
+    print(f'{"conns":>6} {"http p50":>9} {"http p95":>9} {"http p99":>9} {"sock p50":>9} {"sock p95":>9} {"fail":>5}  status')
+
+    clients = []
+    sustained = 0
+    try:
+        for target in steps:
+            try:
+                http_lat, sock_lat, failures = run_step(args.url, cookie, clients, target, args.samples)
+            except Exception as e:
+                print(f'{target:>6} connection failed: {e}')
+                break
+
+            http_p95 = percentile(http_lat, 95)
+            sock_p95 = percentile(sock_lat, 95)
+            ok = failures == 0 and http_p95 <= args.target_ms and sock_p95 <= args.target_ms
+            print(f'{target:>6} {statistics.median(http_lat) if http_lat else float("nan"):>9.1f} {http_p95:>9.1f} '
+                  f'{percentile(http_lat, 99):>9.1f} {statistics.median(sock_lat) if sock_lat else float("nan"):>9.1f} '
+                  f'{sock_p95:>9.1f} {failures:>5}  {"OK" if ok else "OVER TARGET"}')
+            if not ok:
+                break
+            sustained = target
+    finally:
+        for client in clients:
+            client.close()
+
+    print('=' * 78)
+    print(f'Sustained {sustained} concurrent dashboard connections within p95 <= {args.target_ms:.0f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import json
+import time
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+
+LEVELS = ('info', 'success', 'warning', 'error')
+
+def format_entry(entry):
+    """Convert a compact (seq, ts, level, message) entry to the API/socket format"""
+    seq, ts, level, message = entry
+    return {
+        'id': seq,
+        'message': message,
+        'level': level,
+        'timestamp': datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+class _Segment:
+    """One log file with a byte-offset index (entry i has seq first_seq + i)"""
+
+    def __init__(self, path, first_seq):
+        self.path = path
+        self.first_seq = first_seq
+        self.offsets = array('q')
+        self.timestamps = array('d')
+        self.size = 0
+
+    @property
+    def last_seq(self):
+        return self.first_seq + len(self.offsets) - 1
+
+class LogStore:
+    """
+    Thread-safe log store
+
+    Recent entries live in a fixed-capacity ring buffer (no list copies on
+    overflow). Every entry is also appended to rotating JSONL segment files
+    with an in-memory byte-offset index, so older entries can be paged
+    through by cursor, level and time range.
+    """
+
+    def __init__(self, capacity=100, log_dir='data/logs', max_file_bytes=5 * 1024 * 1024, max_files=5):
+        self.capacity = capacity
+        self.log_dir = Path(__file__).parent / log_dir
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._ring = [None] * capacity
+        self._count = 0  # Total entries appended to the ring
+        self._segments = []
+        self._file = None
+        self._next_seq = 1
+        self._load_segments()
+
+    def _load_segments(self):
+        """Rebuild the offset index from existing segment files"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.log_dir.glob('*.log')):
+            try:
+                segment = _Segment(path, int(path.stem))
+            except ValueError:
+                continue
+            offset = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of the file
+                    segment.offsets.append(offset)
+                    segment.timestamps.append(record['ts'])
+                    offset += len(line)
+            segment.size = offset
+            self._segments.append(segment)
+
+        if self._segments and len(self._segments[-1].offsets):
+            self._next_seq = self._segments[-1].last_seq + 1
+
+        # Warm the ring buffer with the newest persisted entries
+        for entry in reversed(self._read_backwards(self._next_seq, self.capacity)):
+            self._push(entry)
+
+    def _open_segment(self, first_seq):
+        """Start a new segment file and drop the oldest beyond max_files"""
+        if self._file:
+            self._file.close()
+        segment = _Segment(self.log_dir / f'{first_seq:012d}.log', first_seq)
+        self._segments.append(segment)
+        self._file = open(segment.path, 'ab')
+
+        while len(self._segments) > self.max_files:
+            oldest = self._segments.pop(0)
+            try:
+                oldest.path.unlink()
+            except OSError:
+                pass
+
+    def _push(self, entry):
+        """Put entry into the ring buffer"""
+        self._ring[self._count % self.capacity] = entry
+        self._count += 1
+
+    def append(self, message, level='info'):
+        """Store a log entry, returns the compact entry"""
+        with self._lock:
+            entry = (self._next_seq, time.time(), level, message)
+            self._next_seq += 1
+            self._push(entry)
+
+            line = (json.dumps({'seq': entry[0], 'ts': entry[1], 'level': level, 'message': message}) + '\n').encode('utf-8')
+            segment = self._segments[-1] if self._segments else None
+            if self._file is None and segment is not None and segment.size + len(line) <= self.max_file_bytes:
+                # Continue the last segment after a restart, dropping any torn tail
+                self._file = open(segment.path, 'ab')
+                self._file.truncate(segment.size)
+            elif self._file is None or segment.size + len(line) > self.max_file_bytes:
+                self._open_segment(entry[0])
+                segment = self._segments[-1]
+
+            segment.offsets.append(segment.size)
+            segment.timestamps.append(entry[1])
+            self._file.write(line)
+            self._file.flush()
+            segment.size += len(line)
+            return entry
+
+    def recent(self, limit=None):
+        """Newest entries from the ring buffer, oldest first"""
+        with self._lock:
+            size = min(self._count, self.capacity)
+            if limit is not None:
+                size = min(size, limit)
+            start = self._count - size
+            return [self._ring[i % self.capacity] for i in range(start, self._count)]
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest entry (0 when empty)"""
+        return self._next_seq - 1
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def _read_range(self, segment, lo, hi):
+        """Read entries [lo, hi) of a segment using the offset index"""
+        if lo >= hi:
+            return []
+        start = segment.offsets[lo]
+        end = segment.offsets[hi] if hi < len(segment.offsets) else segment.size
+        with open(segment.path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        entries = []
+        for line in data.splitlines():
+            record = json.loads(line)
+            entries.append((record['seq'], record['ts'], record['level'], record['message']))
+        return entries
+
+    def _read_backwards(self, before, limit, level=None, since=None, until=None):
+        """Entries with seq < before, newest first, filtered"""
+        result = []
+        for segment in reversed(self._segments):
+            if not len(segment.offsets) or segment.first_seq >= before:
+                continue
+
+            hi = min(before - segment.first_seq, len(segment.offsets))
+            lo = 0
+            if since is not None:
+                lo = bisect_left(segment.timestamps, since)
+            if until is not None:
+                hi = min(hi, bisect_right(segment.timestamps, until))
+
+            # Read in blocks from the end so level filtering stays bounded
+            block = max(limit * 2, 64)
+            while hi > lo and len(result) < limit:
+                start = max(lo, hi - block)
+                for entry in reversed(self._read_range(segment, start, hi)):
+                    if level is None or entry[2] in level:
+                        result.append(entry)
+                        if len(result) >= limit:
+                            break
+                hi = start
+
+            if len(result) >= limit or (since is not None and lo > 0):
+                break
+        return result
+
+    def query(self, cursor=None, limit=100, level=None, since=None, until=None):
+        """
+        Page through logs, newest page first
+        - cursor: return entries older than this id (from previous next_cursor)
+        - level: set of levels to include
+        - since/until: epoch seconds
+        Returns: (entries oldest first, next_cursor or None)
+        """
+        limit = max(1, min(limit, 1000))
+
+        # Fast path: latest entries straight from the ring buffer
+        if cursor is None and level is None and since is None and until is None and limit <= self.capacity:
+            entries = self.recent(limit)
+        else:
+            with self._lock:
+                if self._file:
+                    self._file.flush()
+                before = cursor if cursor is not None else self._next_seq
+                entries = list(reversed(self._read_backwards(before, limit, level, since, until)))
+
+        next_cursor = entries[0][0] if len(entries) == limit else None
+        return entries, next_cursor
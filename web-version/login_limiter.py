@@ -0,0 +1,151 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+
+class _Window:
+    """Sliding window counter state for one key (O(1) memory)"""
+
+    __slots__ = ('start', 'previous', 'current', 'failures', 'locked_until')
+
+    def __init__(self, start):
+        self.start = start
+        self.previous = 0
+        self.current = 0
+        self.failures = 0
+        self.locked_until = 0.0
+
+class SlidingWindowLimiter:
+    """
+    Approximate sliding window: the previous fixed window's count is
+    weighted by how much of it still overlaps the sliding window, so each
+    key only stores two counters instead of a timestamp per attempt.
+
+    Repeated failures add a progressive lockout: after `free_failures`
+    failures in a row, each further failure locks the key for
+    base_delay * 2^n seconds (capped at max_delay). Keys are kept in LRU
+    order and the least recently seen are dropped beyond `max_keys`.
+    """
+
+    def __init__(self, limit, window, free_failures=3, base_delay=1, max_delay=300, max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.free_failures = free_failures
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_keys = max_keys
+        self._keys = OrderedDict()
+
+    def _state(self, key, now):
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _Window(now - now % self.window)
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+
+        # Roll fixed windows forward
+        elapsed = int((now - state.start) // self.window)
+        if elapsed >= 1:
+            state.previous = state.current if elapsed == 1 else 0
+            state.current = 0
+            state.start += elapsed * self.window
+        return state
+
+    def _estimate(self, state, now):
+        overlap = 1 - (now - state.start) / self.window
+        return state.previous * overlap + state.current
+
+    def retry_after(self, key, now):
+        """Seconds until `key` may try again (0 = allowed now)"""
+        state = self._state(key, now)
+        if state.locked_until > now:
+            return state.locked_until - now
+        if self._estimate(state, now) + 1 > self.limit:
+            # Wait until enough of the previous window has slid out
+            if state.current + 1 <= self.limit and state.previous:
+                needed = (self._estimate(state, now) + 1 - self.limit) / state.previous
+                return max(1.0, needed * self.window)
+            return state.start + self.window - now
+        return 0
+
+    def hit(self, key, now):
+        self._state(key, now).current += 1
+
+    def failure(self, key, now):
+        state = self._state(key, now)
+        state.failures += 1
+        extra = state.failures - self.free_failures
+        if extra > 0:
+            state.locked_until = now + min(self.max_delay, self.base_delay * 2 ** (extra - 1))
+
+    def success(self, key, now):
+        state = self._state(key, now)
+        state.failures = 0
+        state.locked_until = 0.0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def locked(self, now):
+        return sum(1 for state in self._keys.values() if state.locked_until > now)
+
+class LoginLimiter:
+    """
+    Throttle password checks per client IP and per username
+
+    check() runs before any bcrypt work and counts the attempt; a rejected
+    attempt costs a dict lookup. Call failure()/success() with the result.
+    """
+
+    def __init__(self, ip_limit=10, username_limit=20, window=300):
+        self._lock = threading.Lock()
+        self.by_ip = SlidingWindowLimiter(ip_limit, window)
+        self.by_username = SlidingWindowLimiter(username_limit, window)
+        self.allowed = 0
+        self.rejected = 0
+
+    def _keys(self, ip, username):
+        yield self.by_ip, ip or 'unknown'
+        if username:
+            yield self.by_username, username.lower()
+
+    def check(self, ip, username=None):
+        """
+        Count an attempt if allowed
+        Returns: (allowed, retry_after_seconds)
+        """
+        now = time.time()
+        with self._lock:
+            wait = max(limiter.retry_after(key, now) for limiter, key in self._keys(ip, username))
+            if wait > 0:
+                self.rejected += 1
+                return False, math.ceil(wait)
+            for limiter, key in self._keys(ip, username):
+                limiter.hit(key, now)
+            self.allowed += 1
+            return True, 0
+
+    def failure(self, ip, username=None):
+        now = time.time()
+        with self._lock:
+            for limiter, key in self._keys(ip, username):
+                limiter.failure(key, now)
+
+    def success(self, ip, username=None):
+        now = time.time()
+        with self._lock:
+            for limiter, key in self._keys(ip, username):
+                limiter.success(key, now)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                'allowed': self.allowed,
+                'rejected': self.rejected,
+                'tracked_ips': len(self.by_ip),
+                'tracked_usernames': len(self.by_username),
+                'locked_keys': self.by_ip.locked(now) + self.by_username.locked(now)
+            }
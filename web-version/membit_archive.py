@@ -0,0 +1,340 @@
+"""
+Membit response archive
+
+Every raw tools/call response is appended, gzip-compressed, to a daily
+segment file; each record is its own gzip member, so one can be read back
+without decompressing the rest of the segment. A fixed-width binary index
+(timestamp, tool, args hash, segment, offset, length) is appended next to
+the segments and memory-mapped for binary search by time. Segments older
+than `max_age_days`, and the oldest ones while the archive is over
+`max_mb`, are dropped when a new day's segment starts.
+
+Replay streams a time range back through the client's formatting and the
+prompt builder, to compare prompt templates or benchmark parsing on past
+data.
+
+Usage:
+    python membit_archive.py --start 2026-10-18 --end 2026-10-19
+    python membit_archive.py --start 2026-10-18T06:00 --tool clusters_search --raw
+    python membit_archive.py --start 2026-10-18 --prompt --template default
+"""
+import os
+import sys
+import json
+import gzip
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from atomic_file import file_lock
+from membit_client import MembitClient
+from membit_fanout import merge_ranked, format_entries, digest, parse_queries
+
+# Index record: timestamp, args hash, segment (YYYYMMDD), offset, length, tool code
+INDEX_RECORD = struct.Struct('<dQIQIB3x')
+# query_weights: the configured (query, weight) list, recorded once per run for replay
+TOOLS = ('clusters_search', 'clusters_info', 'posts_search', 'query_weights')
+
+# Calls further apart than this belong to different runs
+RUN_GAP_SECONDS = 300
+
+def args_hash(arguments):
+    digest_bytes = hashlib.sha1(json.dumps(arguments, sort_keys=True).encode('utf-8')).digest()
+    return int.from_bytes(digest_bytes[:8], 'big')
+
+def tool_code(tool):
+    return TOOLS.index(tool) + 1 if tool in TOOLS else 0
+
+def tool_name(code):
+    return TOOLS[code - 1] if 0 < code <= len(TOOLS) else 'unknown'
+
+def parse_time(value):
+    """Epoch seconds or an ISO date/time (local time) -> epoch seconds"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}', use epoch seconds or YYYY-MM-DD[THH:MM]")
+
+class MembitArchive:
+    """
+    Append-only archive of raw Membit tools/call responses
+
+    record() is called by MembitClient after every call (from several
+    fan-out threads at once); appends are serialized by a file lock, so the
+    index stays sorted by timestamp. Readers map the index read-only and
+    only ever look at whole records. Pruning rewrites the index without the
+    dropped segments' records by an atomic rename, so a reader keeps its
+    old mapping and skips records whose segment is gone.
+    """
+
+    def __init__(self, archive_dir='data/membit_archive', max_age_days=14, max_mb=500):
+        self.archive_dir = Path(__file__).parent / archive_dir
+        self.index_path = self.archive_dir / 'index.bin'
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_mb * 1024 * 1024
+        self._last_timestamp = 0.0
+        self._lock = threading.Lock()
+
+    def _segment_path(self, segment):
+        return self.archive_dir / f'{segment}.gz'
+
+    def record(self, tool, arguments, response):
+        """Append one tools/call response (parsed JSON-RPC message)"""
+        payload = json.dumps({'tool': tool, 'arguments': arguments, 'response': response}, ensure_ascii=False)
+        blob = gzip.compress(payload.encode('utf-8'))
+
+        with self._lock, file_lock(self.index_path):
+            # Timestamps never go backwards, the index is searched by them
+            timestamp = max(time.time(), self._last_timestamp)
+            self._last_timestamp = timestamp
+            segment = int(datetime.fromtimestamp(timestamp).strftime('%Y%m%d'))
+            segment_path = self._segment_path(segment)
+            segment_path.parent.mkdir(parents=True, exist_ok=True)
+            if not segment_path.exists():
+                self._prune(timestamp)
+
+            with open(segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(blob)
+            with open(self.index_path, 'ab') as f:
+                # A crash between the writes leaves unindexed bytes in the segment, never a bad index entry
+                f.write(INDEX_RECORD.pack(timestamp, args_hash(arguments), segment, offset, len(blob), tool_code(tool)))
+
+    def prune(self, now=None):
+        """Apply the retention limits now, returns the dropped segments"""
+        with self._lock, file_lock(self.index_path):
+            return self._prune(time.time() if now is None else now)
+
+    def _prune(self, now):
+        """Drop segments over max age / max size, oldest first (caller holds the locks)"""
+        if not self.archive_dir.exists():
+            return []
+        segments = sorted(
+            (int(path.stem), path.stat().st_size) for path in self.archive_dir.glob('*.gz') if path.stem.isdigit()
+        )
+        cutoff = int(datetime.fromtimestamp(now - self.max_age).strftime('%Y%m%d'))
+        total = sum(size for _, size in segments)
+        dropped = []
+        # The newest segment is the one being written, never drop it
+        for segment, size in segments[:-1]:
+            if segment >= cutoff and total <= self.max_bytes:
+                break
+            dropped.append(segment)
+            total -= size
+        if not dropped:
+            return []
+
+        # Segments follow the index order, so the dropped ones are a prefix of it
+        data = self.index_path.read_bytes() if self.index_path.exists() else b''
+        position = 0
+        while position + INDEX_RECORD.size <= len(data):
+            if INDEX_RECORD.unpack_from(data, position)[2] > dropped[-1]:
+                break
+            position += INDEX_RECORD.size
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data[position:])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+        for segment in dropped:
+            self._segment_path(segment).unlink(missing_ok=True)
+        return dropped
+
+    def entries(self, start=None, end=None, tool=None, arguments=None):
+        """
+        Index entries with start <= timestamp < end, oldest first
+        Returns: list of (timestamp, tool, args_hash, segment, offset, length)
+        """
+        if not self.index_path.exists() or self.index_path.stat().st_size < INDEX_RECORD.size:
+            return []
+        code = tool_code(tool) if tool else None
+        wanted_hash = args_hash(arguments) if arguments is not None else None
+
+        with open(self.index_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            count = len(index) // INDEX_RECORD.size  # A record being appended is not counted
+
+            def timestamp_at(position):
+                return struct.unpack_from('<d', index, position * INDEX_RECORD.size)[0]
+
+            def lower_bound(value):
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if timestamp_at(middle) < value:
+                        low = middle + 1
+                    else:
+                        high = middle
+                return low
+
+            first = lower_bound(start) if start is not None else 0
+            last = lower_bound(end) if end is not None else count
+            entries = []
+            for position in range(first, last):
+                timestamp, hash_value, segment, offset, length, entry_code = INDEX_RECORD.unpack_from(
+                    index, position * INDEX_RECORD.size
+                )
+                if code is not None and entry_code != code:
+                    continue
+                if wanted_hash is not None and hash_value != wanted_hash:
+                    continue
+                entries.append((timestamp, tool_name(entry_code), hash_value, segment, offset, length))
+            return entries
+
+    def read(self, entry):
+        """Archived call of one index entry: {timestamp, tool, arguments, response}"""
+        timestamp, _, _, segment, offset, length = entry
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            record = json.loads(gzip.decompress(f.read(length)).decode('utf-8'))
+        record['timestamp'] = timestamp
+        return record
+
+    def replay(self, start=None, end=None, tool=None):
+        """Archived calls in a time range, oldest first (read lazily)"""
+        for entry in self.entries(start, end, tool):
+            try:
+                yield self.read(entry)
+            except FileNotFoundError:
+                continue  # Segment dropped by retention meanwhile
+
+    def stats(self):
+        size = self.index_path.stat().st_size if self.index_path.exists() else 0
+        segments = sorted(self.archive_dir.glob('*.gz')) if self.archive_dir.exists() else []
+        return {
+            'records': size // INDEX_RECORD.size,
+            'segments': len(segments),
+            'bytes': sum(path.stat().st_size for path in segments)
+        }
+
+def group_runs(records, gap=RUN_GAP_SECONDS):
+    """Split time-ordered archived calls into runs (calls less than `gap` seconds apart)"""
+    run = []
+    for record in records:
+        if run and record['timestamp'] - run[-1]['timestamp'] > gap:
+            yield run
+            run = []
+        run.append(record)
+    if run:
+        yield run
+
+def response_text(record):
+    """Text MembitClient returned for an archived call"""
+    if record['tool'] == 'query_weights':
+        return ', '.join(f'{query}:{weight:g}' for query, weight in record['arguments'].get('queries', []))
+    result = (record.get('response') or {}).get('result')
+    if not result:
+        return {'clusters_info': 'No cluster info available', 'posts_search': 'No posts found'}.get(
+            record['tool'], 'No trending data available'
+        )
+    return MembitClient._format_trending_data(result)
+
+def build_trending_data(run, top_clusters=10, top_posts=5, weights=None):
+    """
+    Membit part of the prompt for one archived run, laid out as the pipeline builds it
+    Queries are weighted as the run recorded them; weights ({query: weight},
+    lowercase keys) covers runs archived without their weights, other
+    queries weigh 1.0.
+    """
+    weights = dict(weights or {})
+    for record in run:
+        if record['tool'] == 'query_weights':
+            weights = {query.lower(): weight for query, weight in record['arguments'].get('queries', [])}
+
+    searches = {'clusters_search': [], 'posts_search': []}
+    details = []
+    for record in run:
+        arguments = record.get('arguments') or {}
+        if record['tool'] in searches:
+            query = arguments.get('q', '')
+            searches[record['tool']].append((query, weights.get(query.lower(), 1.0), response_text(record), None))
+        elif record['tool'] == 'clusters_info':
+            summary = digest(arguments.get('label', ''), response_text(record))
+            if summary:
+                details.append(summary)
+
+    parts = []
+    clusters = merge_ranked(searches['clusters_search'], 'cluster', top_clusters)
+    if clusters:
+        parts.append(f"TRENDING TOPICS:\n{format_entries(clusters)}")
+    if details:
+        parts.append("\nDETAILED CONTEXT:\n" + "\n\n".join(details))
+    posts = merge_ranked(searches['posts_search'], 'post', top_posts)
+    if posts:
+        parts.append(f"\nCOMMUNITY POSTS:\n{format_entries(posts)}")
+    return "\n\n".join(parts)
+
+def replay_runs(archive, start=None, end=None, template=None, max_tweet_length=250, top_clusters=10, top_posts=5,
+                weights=None):
+    """
+    Rebuild the prompt input of every archived run in a time range
+    template: compiled PromptTemplate to render the prompt with (optional)
+    weights: query weights for runs archived without them
+    Yields: {started_at, calls, tools, trending_data[, prompt]} per run
+    """
+    for run in group_runs(archive.replay(start, end)):
+        trending_data = build_trending_data(run, top_clusters, top_posts, weights)
+        result = {
+            'started_at': run[0]['timestamp'],
+            'calls': len(run),
+            'tools': sorted({record['tool'] for record in run if record['tool'] != 'query_weights'}),
+            'trending_data': trending_data
+        }
+        if template is not None and trending_data:
+            result['prompt'] = template.render(trending_data=trending_data, max_tweet_length=max_tweet_length)
+        yield result
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay archived Membit responses')
+    parser.add_argument('--start', help='Epoch seconds or YYYY-MM-DD[THH:MM] (default: everything)')
+    parser.add_argument('--end', help='Exclusive end, same format (default: now)')
+    parser.add_argument('--tool', choices=TOOLS, help='Only this tool (with --raw)')
+    parser.add_argument('--raw', action='store_true', help='Print every call formatted as the client returns it')
+    parser.add_argument('--prompt', action='store_true', help='Render the full prompt of every run')
+    parser.add_argument('--template', help='Prompt template name (default: the active one)')
+    parser.add_argument('--max-tweet-length', type=int, default=int(os.getenv('MAX_TWEET_LENGTH', 250)))
+    args = parser.parse_args()
+
+    archive = MembitArchive()
+    start, end = parse_time(args.start), parse_time(args.end)
+
+    if args.raw:
+        for record in archive.replay(start, end, args.tool):
+            print(json.dumps({
+                'timestamp': record['timestamp'],
+                'tool': record['tool'],
+                'arguments': record['arguments'],
+                'text': response_text(record)
+            }, ensure_ascii=False))
+        return
+
+    template = None
+    if args.prompt:
+        from prompt_templates import PromptTemplateStore, compile_template
+        store = PromptTemplateStore()
+        if args.template:
+            versions = store.state['templates'].get(args.template)
+            if not versions:
+                sys.exit(f"Unknown prompt template '{args.template}'")
+            template = compile_template(versions[-1]['source'])
+        else:
+            template = compile_template(store.active_source())
+
+    # For runs archived before query weights were recorded
+    weights = {query.lower(): weight for query, weight in parse_queries(os.getenv('MEMBIT_QUERIES', 'Web3'))}
+    for run in replay_runs(archive, start, end, template, args.max_tweet_length, weights=weights):
+        print(json.dumps(run, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,38 @@
 import requests
 import json
+import threading
 
 class MembitClient:
     """Client for Membit MCP API"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, archive=None):
         self.api_key = api_key
+        # Optional MembitArchive receiving every raw tools/call response
+        self.archive = archive
         self.endpoint = "https://mcp.membit.ai/mcp"
         self.headers = {
             "X-Membit-Api-Key": api_key,
             "Content-Type": "application/json",
             "Accept": "application/json, text/event-stream"
         }
+        # One pooled session: queries fetched concurrently reuse connections
+        self.session = requests.Session()
+        self._local = threading.local()
+    
+    @property
+    def last_status(self):
+        """HTTP status of the last call made by this thread"""
+        return getattr(self._local, 'status', None)
+    
+    @last_status.setter
+    def last_status(self, status):
+        self._local.status = status
     
     def list_tools(self):
         """List available tools from Membit MCP"""
         try:
-            response = requests.post(
+            self.last_status = None
+            response = self.session.post(
                 self.endpoint,
                 headers=self.headers,
                 json={
@@ -27,6 +43,7 @@ class MembitClient:
                 timeout=30,
                 stream=True
             )
+            self.last_status = response.status_code
             response.raise_for_status()
             
             # Parse SSE response
@@ -54,7 +71,8 @@ class MembitClient:
         """Get trending topics from Membit using clusters_search"""
         try:
             # Use clusters_search tool (recommended for trending discussions)
-            response = requests.post(
+            self.last_status = None
+            response = self.session.post(
                 self.endpoint,
                 headers=self.headers,
                 json={
@@ -72,9 +90,10 @@ class MembitClient:
                 timeout=30,
                 stream=True
             )
-            
+            self.last_status = response.status_code
             response.raise_for_status()
             data = self._parse_sse_response(response)
+            self._archive("clusters_search", {"q": query, "limit": limit}, data)
             
             # Format the trending data
             if data.get('result'):
@@ -87,7 +106,8 @@ class MembitClient:
     
     def _call_trending_api(self):
         """Fallback method to call trending API directly"""
-        response = requests.post(
+        self.last_status = None
+        response = self.session.post(
             self.endpoint,
             headers=self.headers,
             json={
@@ -102,8 +122,10 @@ class MembitClient:
             timeout=30,
             stream=True
         )
+        self.last_status = response.status_code
         response.raise_for_status()
         data = self._parse_sse_response(response)
+        self._archive("get_trending", {}, data)
         
         if data.get('result'):
             return self._format_trending_data(data['result'])
@@ -113,7 +135,8 @@ class MembitClient:
     def get_cluster_info(self, label, limit=10):
         """Get detailed information about a specific cluster"""
         try:
-            response = requests.post(
+            self.last_status = None
+            response = self.session.post(
                 self.endpoint,
                 headers=self.headers,
                 json={
@@ -131,9 +154,10 @@ class MembitClient:
                 timeout=30,
                 stream=True
             )
-            
+            self.last_status = response.status_code
             response.raise_for_status()
             data = self._parse_sse_response(response)
+            self._archive("clusters_info", {"label": label, "limit": limit}, data)
             
             if data.get('result'):
                 return self._format_trending_data(data['result'])
@@ -146,7 +170,8 @@ class MembitClient:
     def search_posts(self, query, limit=10):
         """Search for specific posts"""
         try:
-            response = requests.post(
+            self.last_status = None
+            response = self.session.post(
                 self.endpoint,
                 headers=self.headers,
                 json={
@@ -164,9 +189,10 @@ class MembitClient:
                 timeout=30,
                 stream=True
             )
-            
+            self.last_status = response.status_code
             response.raise_for_status()
             data = self._parse_sse_response(response)
+            self._archive("posts_search", {"q": query, "limit": limit}, data)
             
             if data.get('result'):
                 return self._format_trending_data(data['result'])
@@ -176,7 +202,21 @@ class MembitClient:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to search posts: {str(e)}")
     
-    def _format_trending_data(self, data):
+    def archive_queries(self, queries):
+        """Record the run's (query, weight) list, replay ranks the archived results with it"""
+        self._archive("query_weights", {"queries": [[query, weight] for query, weight in queries]}, None)
+    
+    def _archive(self, tool, arguments, data):
+        """Keep a raw response in the archive, a failing archive never fails the call"""
+        if self.archive is None:
+            return
+        try:
+            self.archive.record(tool, arguments, data)
+        except Exception as e:
+            print(f"Failed to archive Membit response: {e}")
+    
+    @staticmethod
+    def _format_trending_data(data):
         """Format trending data for better readability"""
         # Handle different response formats
         if isinstance(data, dict):
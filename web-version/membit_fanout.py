@@ -0,0 +1,229 @@
+import re
+import json
+import math
+import time
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Label or id that identifies one entry in a Membit text response
+LABEL_RE = re.compile(r'label\s*[=:]\s*"([^"]+)"')
+POST_ID_RE = re.compile(r'\b(?:post_id|id)\s*[=:]\s*"?([A-Za-z0-9_-]{4,})"?')
+POST_URL_RE = re.compile(r'/status(?:es)?/(\d+)')
+NUMBERED_RE = re.compile(r'^\s*\d+[.)]\s', re.MULTILINE)
+LEADING_NUMBER_RE = re.compile(r'^\d+[.)]\s+')
+
+# Engagement numbers, an overall score is preferred over the sum of counts
+SCORE_RE = re.compile(r'\b(engagement_score|engagement|score)\s*"?\s*[=:]\s*"?(\d+(?:\.\d+)?)')
+COUNT_RE = re.compile(r'\b(likes?|like_count|retweets?|retweet_count|reposts?|replies|reply_count|quotes?|quote_count)\s*"?\s*[=:]\s*"?(\d+)')
+ISO_TIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?')
+EPOCH_RE = re.compile(r'\b(?:timestamp|created_at|updated_at|time)\s*"?\s*[=:]\s*"?(1\d{9})(?:\.\d+)?\b')
+
+# What MembitClient returns when a tool found nothing
+EMPTY_RESPONSES = ('No trending data available', 'No cluster info available', 'No posts found')
+
+RECENCY_HALF_LIFE_HOURS = 12
+UNKNOWN_RECENCY = 0.75  # Entries without a timestamp rank like ~5 hour old ones
+
+@lru_cache(maxsize=16)
+def parse_queries(text):
+    """
+    "Web3, DeFi:0.8, AI x crypto:0.7" -> (('Web3', 1.0), ('DeFi', 0.8), ('AI x crypto', 0.7))
+    Weight defaults to 1, duplicate queries are dropped.
+    """
+    queries = {}
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        query, weight = part, 1.0
+        if ':' in part:
+            head, tail = part.rsplit(':', 1)
+            try:
+                query, weight = head.strip(), float(tail)
+            except ValueError:
+                query, weight = part, 1.0
+        if not query:
+            raise ValueError(f"Empty query in '{part}'")
+        if not 0 < weight <= 10:
+            raise ValueError(f"Query weight must be between 0 and 10, got '{part}'")
+        queries.setdefault(query.lower(), (query, weight))
+    if not queries:
+        raise ValueError("At least one Membit query is required")
+    return tuple(queries.values())
+
+def normalize_queries(text):
+    """Validate a query list and return it in canonical form (stored in settings)"""
+    return ', '.join(query if weight == 1 else f'{query}:{weight:g}' for query, weight in parse_queries(text))
+
+def _json_entries(text):
+    """Entries of a JSON response (top-level list or the first list of objects in it)"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), None)
+    if not isinstance(data, list):
+        return None
+    return [json.dumps(item, ensure_ascii=False) if not isinstance(item, str) else item for item in data]
+
+def split_entries(text, kind):
+    """
+    Split one Membit response into entries (one cluster or post each)
+    JSON lists, then one entry per label=/id= line, then numbered lists; a
+    response that cannot be split stays one entry.
+    """
+    text = (text or '').strip()
+    if not text:
+        return []
+    entries = _json_entries(text)
+    if entries is not None:
+        return entries
+
+    key_re = LABEL_RE if kind == 'cluster' else POST_ID_RE
+    starts = sorted({text.rfind('\n', 0, match.start()) + 1 for match in key_re.finditer(text)})
+    if len(starts) < 2:
+        starts = [match.start() for match in NUMBERED_RE.finditer(text)]
+    if len(starts) < 2:
+        return [text]
+
+    # Text before the first entry is a heading ("Trending Topics:"), dropped
+    entries = []
+    for begin, end in zip(starts, starts[1:] + [len(text)]):
+        entry = LEADING_NUMBER_RE.sub('', text[begin:end].strip(), count=1)
+        if entry:
+            entries.append(entry)
+    return entries or [text]
+
+def entry_key(entry, kind):
+    """Dedupe key: cluster label, post id/URL, else the normalized text"""
+    if kind == 'cluster':
+        match = LABEL_RE.search(entry) or re.search(r'"label"\s*:\s*"([^"]+)"', entry)
+        if match:
+            return 'label:' + ' '.join(match.group(1).lower().split())
+    else:
+        match = POST_URL_RE.search(entry) or POST_ID_RE.search(entry) or re.search(r'"(?:post_)?id"\s*:\s*"?([\w-]+)', entry)
+        if match:
+            return 'post:' + match.group(1)
+    normalized = ' '.join(entry.lower().split())
+    return 'text:' + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+def entry_label(entry):
+    match = LABEL_RE.search(entry) or re.search(r'"label"\s*:\s*"([^"]+)"', entry)
+    return match.group(1) if match else None
+
+def engagement(entry):
+    scores = [float(value) for _, value in SCORE_RE.findall(entry)]
+    if scores:
+        return max(scores)
+    return float(sum(int(value) for _, value in COUNT_RE.findall(entry)))
+
+def entry_time(entry):
+    """Newest timestamp mentioned in the entry (epoch seconds) or None"""
+    times = []
+    for value in ISO_TIME_RE.findall(entry):
+        try:
+            times.append(datetime.fromisoformat(value.replace('Z', '+00:00').replace(' ', 'T')).timestamp())
+        except ValueError:
+            continue
+    times.extend(float(value) for value in EPOCH_RE.findall(entry))
+    return max(times) if times else None
+
+def score_entry(weight, rank, engagement_value, timestamp, now):
+    """Query weight x engagement x recency x position in the query's own results"""
+    if timestamp is None:
+        recency = UNKNOWN_RECENCY
+    else:
+        age_hours = max(0.0, now - timestamp) / 3600
+        recency = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+    return weight * (1 + math.log1p(engagement_value)) * recency / (1 + 0.1 * rank)
+
+def fan_out(fetch, queries, max_workers=4, timeout=None):
+    """
+    Call fetch(query) for every query, at most `max_workers` at a time
+    Returns one (query, weight, text, error) per query in query order;
+    queries still running after `timeout` seconds get a TimeoutError.
+    """
+    if not queries:
+        return []
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries))), thread_name_prefix='membit')
+    try:
+        futures = [pool.submit(fetch, query) for query, _ in queries]
+        wait(futures, timeout=timeout)
+        results = []
+        for (query, weight), future in zip(queries, futures):
+            if not future.done():
+                future.cancel()
+                results.append((query, weight, None, TimeoutError(f"'{query}' did not finish in {timeout:g}s")))
+            elif future.exception() is not None:
+                results.append((query, weight, None, future.exception()))
+            else:
+                results.append((query, weight, future.result(), None))
+        return results
+    finally:
+        pool.shutdown(wait=False)
+
+def merge_ranked(results, kind, top_n, now=None):
+    """
+    Merge the responses of several queries into the top_n entries
+    Entries found by several queries are kept once and their query weights
+    add up, so topics trending across the query set rank higher.
+    Returns: list of {key, label, text, score, queries} best first
+    """
+    now = time.time() if now is None else now
+    merged = {}
+    for query, weight, text, error in results:
+        if error is not None or not text or text.strip() in EMPTY_RESPONSES:
+            continue
+        for rank, entry in enumerate(split_entries(text, kind)):
+            key = entry_key(entry, kind)
+            item = merged.get(key)
+            if item is None:
+                item = merged[key] = {
+                    'key': key,
+                    'label': entry_label(entry) if kind == 'cluster' else None,
+                    'text': entry,
+                    'engagement': engagement(entry),
+                    'timestamp': entry_time(entry),
+                    'rank': rank,
+                    'weight': 0.0,
+                    'queries': []
+                }
+            item['weight'] += weight
+            item['rank'] = min(item['rank'], rank)
+            if query not in item['queries']:
+                item['queries'].append(query)
+
+    for item in merged.values():
+        item['score'] = score_entry(item['weight'], item['rank'], item['engagement'], item['timestamp'], now)
+    ranked = sorted(merged.values(), key=lambda item: item['score'], reverse=True)
+    return ranked[:top_n]
+
+def format_entries(items):
+    """Prompt text for ranked entries (original Membit text, best first)"""
+    return '\n\n'.join(f"{idx}. {item['text']}" for idx, item in enumerate(items, 1))
+
+def digest(label, text, max_entries=4, max_chars=600):
+    """
+    Compact summary of one clusters_info response for the prompt
+    The most engaged entries, whitespace collapsed and clipped, under a
+    heading with the cluster label; at most `max_chars` characters.
+    """
+    entries = split_entries(text, 'post')
+    if not entries or (text or '').strip() in EMPTY_RESPONSES:
+        return None
+    ranked = sorted(enumerate(entries), key=lambda pair: (-engagement(pair[1]), pair[0]))[:max_entries]
+    lines = [f'[{label}]']
+    used = len(lines[0])
+    budget = max(80, (max_chars - used) // len(ranked))
+    for _, entry in sorted(ranked):
+        line = ' '.join(entry.split())
+        if len(line) > budget:
+            line = line[:budget - 3].rstrip() + '...'
+        if used + len(line) + 3 > max_chars:
+            break
+        lines.append(f'- {line}')
+        used += len(line) + 3
+    return '\n'.join(lines)
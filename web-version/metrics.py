@@ -0,0 +1,212 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Stage latency buckets in seconds (Membit/Gemini/Twitter calls take 0.1s - 60s)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base class: one lock per metric, values keyed by label tuple"""
+
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _emit(self, value, labels):
+        """Record locally, or hand to the forward hook (worker process)"""
+        forward = self.registry.forward
+        if forward is not None:
+            forward(self.name, value, labels)
+        else:
+            self.record(value, labels)
+            self.registry.notify(self.name, value, labels)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self._emit(amount, labels)
+
+    def record(self, amount, labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, registry, name, documentation, labelnames=(), function=None):
+        super().__init__(registry, name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        self._emit(value, labels)
+
+    def record(self, value, labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """Read the value from function() at scrape time"""
+        self.function = function
+
+    def render(self):
+        if self.function is not None:
+            try:
+                return [f'{self.name} {_format_value(self.function())}']
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        self._emit(value, labels)
+
+    def record(self, value, labels):
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound if bound == float('inf') else float(bound)) + '"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+class Registry:
+    """Collection of metrics rendered in Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.forward = None
+        self.listeners = []
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def add_listener(self, listener):
+        """Call listener(name, value, labels) for every recorded value"""
+        self.listeners.append(listener)
+
+    def notify(self, name, value, labels):
+        for listener in self.listeners:
+            try:
+                listener(name, value, labels)
+            except Exception:
+                pass
+
+    def apply(self, name, value, labels):
+        """Record a value forwarded from another process"""
+        metric = self.metrics.get(name)
+        if metric is not None:
+            metric.record(value, labels)
+            self.notify(name, value, labels)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# Pipeline metrics
+STAGE_SECONDS = Histogram(
+    REGISTRY, 'bot_stage_duration_seconds',
+    'Duration of pipeline stages (Membit per tool, Gemini, Pollinations, Twitter)',
+    labelnames=('stage', 'outcome')
+)
+RUNS = Counter(REGISTRY, 'bot_runs_total', 'Pipeline runs by outcome', labelnames=('outcome',))
+RETRIES = Counter(REGISTRY, 'bot_retries_total', 'Pipeline retries and regenerations', labelnames=('reason',))
+CACHE_HITS = Counter(REGISTRY, 'bot_cache_hits_total', 'Work served from a local cache or store', labelnames=('cache',))
+BREAKER_TRIPS = Counter(REGISTRY, 'bot_breaker_trips_total', 'Runs or calls short-circuited by a guard', labelnames=('breaker',))
+DRAFTS = Counter(REGISTRY, 'bot_drafts_total', 'Batch mode drafts by event (queued, posted, approved, rejected, failed)', labelnames=('event',))
+
+# Auth metrics
+LOGIN_ATTEMPTS = Counter(REGISTRY, 'bot_login_attempts_total', 'Password checks by result (rejected = throttled before bcrypt, busy = too many bcrypt calls waiting)', labelnames=('route', 'result'))
+
+# Server gauges (values read at scrape time)
+LOG_QUEUE_DEPTH = Gauge(REGISTRY, 'bot_log_queue_depth', 'Log entries waiting to be sent to dashboards')
+LOG_BUFFER_SIZE = Gauge(REGISTRY, 'bot_log_buffer_entries', 'Log entries held in the in-memory ring buffer')
+SOCKET_LAGGING_CLIENTS = Gauge(REGISTRY, 'bot_socket_lagging_clients', 'Dashboards not reading frames fast enough (frames skipped until they catch up)')
+BOT_RUNNING = Gauge(REGISTRY, 'bot_running', 'Whether the scheduler is running (1) or stopped (0)')
+LOGIN_TRACKED_KEYS = Gauge(REGISTRY, 'bot_login_tracked_keys', 'Client IPs and usernames tracked by the login limiter')
+LOGIN_LOCKED_KEYS = Gauge(REGISTRY, 'bot_login_locked_keys', 'Client IPs and usernames currently locked out after repeated failures')
+
+@contextmanager
+def stage_timer(stage):
+    """Time a pipeline stage, labelled with success/error outcome"""
+    start = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, outcome=outcome)
@@ -0,0 +1,146 @@
+import re
+import json
+import time
+import zlib
+import threading
+from pathlib import Path
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows, candidates from ~0.5 similarity
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_URL_RE = re.compile(r'https?://\S+')
+_NON_WORD_RE = re.compile(r'[^\w#@ ]+')
+_SPACE_RE = re.compile(r'\s+')
+
+# Fixed seed so signatures stay valid across restarts
+_rng = np.random.default_rng(20251019)
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+def _normalize(text):
+    """Lowercase, drop URLs and punctuation, collapse whitespace"""
+    text = _URL_RE.sub(' ', text.lower())
+    text = _NON_WORD_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+def minhash_signature(text):
+    """MinHash signature (NUM_PERM uint32) over character shingles"""
+    text = _normalize(text)
+    if len(text) < SHINGLE_SIZE:
+        text = text.ljust(SHINGLE_SIZE)
+
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode('utf-8')) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+    # Multiply-shift hashing, one row per permutation (uint64 wraps around)
+    permuted = (hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+class TweetHistory:
+    """
+    Persistent history of posted tweets with MinHash/LSH near-duplicate lookup
+
+    Signatures are split into bands, every band is a bucket key, so a
+    candidate is only compared with tweets sharing at least one bucket.
+    """
+
+    def __init__(self, history_file='data/tweet_history.jsonl', max_entries=5000, threshold=0.6):
+        self.history_path = Path(__file__).parent / history_file
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.entries = []
+        self.signatures = []
+        self.buckets = {}
+        self._load_history()
+
+    def _load_history(self):
+        """Load history from file and rebuild the index"""
+        if not self.history_path.exists():
+            return
+
+        entries = []
+        with open(self.history_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+
+        for entry in entries[-self.max_entries:]:
+            self._index(entry, minhash_signature(entry['text']))
+
+        if len(entries) > self.max_entries:
+            self._compact()
+
+    def _band_keys(self, signature):
+        """Bucket key for every band"""
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def _index(self, entry, signature):
+        """Add entry to the in-memory index"""
+        idx = len(self.entries)
+        self.entries.append(entry)
+        self.signatures.append(signature)
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(idx)
+
+    def _compact(self):
+        """Rewrite history file with only the most recent entries"""
+        entries = self.entries[-self.max_entries:]
+        self.entries, self.signatures, self.buckets = [], [], {}
+        for entry in entries:
+            self._index(entry, minhash_signature(entry['text']))
+
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.history_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry) + '\n')
+        tmp_path.replace(self.history_path)
+
+    def add(self, text, tweet_id=None):
+        """Add a posted tweet to the history"""
+        entry = {'text': text, 'id': tweet_id, 'timestamp': time.time()}
+        signature = minhash_signature(text)
+        with self._lock:
+            self._index(entry, signature)
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            if len(self.entries) > self.max_entries * 1.2:
+                self._compact()
+
+    def find_similar(self, text, threshold=None):
+        """
+        Find the most similar past tweet
+        Returns: {'text', 'id', 'timestamp', 'similarity'} or None if below threshold
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash_signature(text)
+
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self.buckets.get(key, ()))
+            if not candidates:
+                return None
+
+            candidates = list(candidates)
+            matrix = np.stack([self.signatures[i] for i in candidates])
+            similarities = (matrix == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            similarity = float(similarities[best])
+            if similarity < threshold:
+                return None
+
+            match = dict(self.entries[candidates[best]])
+            match['similarity'] = similarity
+            return match
@@ -0,0 +1,811 @@
+"""
+Tweet pipeline: Membit -> Gemini -> (image) -> Twitter, and its scheduler
+
+Imported by app.py (pipeline in the web process) or by pipeline_worker.py
+(PIPELINE_WORKER=1), never both: in worker mode the web process only
+imports bot_state. Nothing here knows about Flask or Socket.IO: the
+importing process sets `emit_log` and `emitter` to send logs and status to
+dashboards, directly or over the worker's event queue. State other
+processes need lives in on-disk stores (traces, run history, drafts) or is
+forwarded (logs, status, metrics).
+"""
+import os
+import re
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from server_mode import run_blocking
+from membit_client import MembitClient
+from gemini_client import GeminiClient
+from twitter_client import TwitterClient, RateLimitError, UncertainPostError
+from image_generator import ImageGenerator
+from prompt_templates import TemplateError, compile_template
+from membit_fanout import parse_queries, fan_out, merge_ranked, format_entries, digest
+from trend_delta import TrendSnapshots, format_delta
+from draft_queue import batch_instructions, parse_drafts
+from quota_ledger import QuotaLedger
+from tweet_length import weighted_length, MAX_WEIGHTED_LENGTH
+from idempotency import PostAttemptStore
+from near_duplicate import TweetHistory, minhash_signature
+from topic_selector import TopicSelector
+import metrics
+import tracing
+from metrics import stage_timer
+from bot_state import (
+    settings, draft_queue, membit_archive, trace_store, run_history,
+    bot_status, bot_config, format_duration
+)
+
+# Set by the importing process: status sink with status()/snapshot()
+emitter = None
+
+def emit_log(message, level='info'):
+    """Log sink, replaced by the importing process"""
+    print(f'[{level}] {message}')
+
+# Suppress Gemini warnings
+os.environ['GRPC_VERBOSITY'] = 'ERROR'
+os.environ['GLOG_minloglevel'] = '2'
+
+# Initialize Twitter posting quota ledger (free tier: 50/day, 1500/month)
+quota_ledger = QuotaLedger(
+    daily_post_limit=int(os.getenv('TWITTER_DAILY_POST_LIMIT', 50)),
+    monthly_post_limit=int(os.getenv('TWITTER_MONTHLY_POST_LIMIT', 1500)),
+    daily_media_limit=int(os.getenv('TWITTER_DAILY_MEDIA_LIMIT', 50)),
+    burst=int(os.getenv('TWITTER_POST_BURST', 3))
+)
+
+# Initialize post attempt store (prevents double posts on timeout/restart)
+post_attempts = PostAttemptStore()
+
+# Initialize posted tweet history (near-duplicate detection)
+tweet_history = TweetHistory(threshold=float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0.6)))
+
+# Initialize topic selector (prefers clusters not covered recently)
+topic_selector = TopicSelector()
+
+# Previous trending snapshot (what changed since the last run)
+trend_snapshots = TrendSnapshots()
+
+# A run that died while posting left its draft claimed, the next run may retry it
+draft_queue.release_claimed()
+
+bot_status['quota'] = quota_ledger.headroom()
+
+# Membit queries run concurrently; a query slower than this is left out of the run
+MEMBIT_FANOUT_TIMEOUT = 35
+
+# API clients, built once and rebuilt only after API keys change
+API_KEY_SETTINGS = {
+    'membit_api_key', 'gemini_api_key',
+    'twitter_api_key', 'twitter_api_secret', 'twitter_access_token', 'twitter_access_secret'
+}
+api_clients = None
+api_clients_lock = threading.Lock()
+
+def get_api_clients():
+    """Membit, Gemini and Twitter clients for the current API keys"""
+    global api_clients
+    with api_clients_lock:
+        if api_clients is None:
+            current = settings.current
+            if not current.gemini_api_key:
+                raise Exception("GEMINI_API_KEY not found in settings")
+            api_clients = (
+                MembitClient(current.membit_api_key, archive=membit_archive),
+                GeminiClient(current.gemini_api_key),
+                TwitterClient(
+                    api_key=current.twitter_api_key,
+                    api_secret=current.twitter_api_secret,
+                    access_token=current.twitter_access_token,
+                    access_secret=current.twitter_access_secret
+                )
+            )
+        return api_clients
+
+def on_settings_changed(current, changed):
+    """Settings listener: drop clients built with old API keys, wake the scheduler"""
+    global api_clients
+    if changed & API_KEY_SETTINGS:
+        with api_clients_lock:
+            api_clients = None
+    if 'schedule_hours' in changed:
+        # Re-plan the next run now instead of after the old interval
+        scheduler_wakeup.set()
+
+settings.add_listener(on_settings_changed)
+
+scheduler_thread = None
+stop_scheduler = False
+scheduler_generation = 0
+
+# Set to wake a sleeping scheduler early (bot stopped, schedule changed)
+scheduler_wakeup = threading.Event()
+
+@contextmanager
+def stage(name, **attributes):
+    """Time a pipeline stage for /metrics and the current run trace"""
+    with stage_timer(name), tracing.span(name, **attributes) as span:
+        yield span
+
+def membit_fan_out(membit, call, stage_name, arg, values, limit, max_workers, timeout=None):
+    """
+    Call one Membit tool for every (value, weight) in `values` concurrently
+    Every call is timed as its own stage, traced under one parent span.
+    Returns: fan_out results, one (value, weight, text, error) per value
+    """
+    trace = tracing.current_trace()
+    parent = tracing.begin_span(f'{stage_name}_fanout', calls=len(values))
+    spans = {}
+    spans_lock = threading.Lock()
+    abandoned = False
+    
+    def fetch(value):
+        attributes = {arg: value}
+        with spans_lock:
+            if abandoned:
+                # Started after the deadline, its result would be dropped anyway
+                raise TimeoutError(f"'{value}' started after the deadline")
+            span = trace.begin_child(parent, stage_name, **attributes) if trace else tracing.Span(None, stage_name, None, attributes)
+            spans[value] = span
+        try:
+            with stage_timer(stage_name):
+                text = call(limit=limit, **attributes)
+        except Exception as e:
+            span.set(error=str(e)[:200], http_status=membit.last_status)
+            span.close('error')
+            raise
+        span.set(response_chars=len(text), http_status=membit.last_status)
+        span.close()
+        return text
+    
+    results = fan_out(fetch, values, max_workers=max_workers, timeout=timeout or MEMBIT_FANOUT_TIMEOUT)
+    # Calls still running are abandoned: end their spans now, the trace is saved before they return
+    with spans_lock:
+        abandoned = True
+        for value, _, _, error in results:
+            if isinstance(error, TimeoutError) and value in spans:
+                spans[value].set(error=str(error)[:200])
+                spans[value].close('timed_out')
+    failed = sum(1 for result in results if result[3] is not None)
+    parent.set(failed=failed)
+    parent.close('error' if results and failed == len(results) else None)
+    return results
+
+def fetch_ranked(membit, call, stage_name, kind, queries, limit, top_n, max_workers):
+    """
+    Run one Membit search tool for every query concurrently, merge and rank the results
+    Returns: (top_n ranked entries, {query: error} for queries that failed)
+    """
+    results = membit_fan_out(membit, call, stage_name, 'query', queries, limit, max_workers)
+    errors = {query: error for query, _, _, error in results if error is not None}
+    return merge_ranked(results, kind, top_n), errors
+
+def collect_membit_data(membit, config):
+    """
+    Fetch the enabled Membit sources and build the trending data for the prompt
+    Returns: (trending_data, cluster_label) where cluster_label is the topic picked for this tweet
+    """
+    # Get data from Membit based on user settings
+    emit_log('Fetching data from Membit...', 'info')
+    
+    membit_data_parts = []
+    cluster_label = None
+    cluster_candidates = []
+    # A snapshot from an earlier attempt must not be committed with this attempt's data
+    trend_snapshots.discard()
+    
+    # 1. Trending Topics (clusters_search) - Always enabled, every configured query
+    queries = parse_queries(config.membit_queries)
+    membit.archive_queries(queries)
+    if True:  # Always fetch trending topics (required)
+        emit_log(f"→ Getting trending topics ({', '.join(query for query, _ in queries)})...", 'info')
+        try:
+            clusters, errors = fetch_ranked(
+                membit, membit.get_trending_topics, 'membit_clusters_search', 'cluster', queries,
+                limit=10, top_n=config.membit_top_clusters, max_workers=config.membit_concurrency
+            )
+            for query, error in errors.items():
+                emit_log(f'⚠️ Failed to get trending topics for "{query}": {error}', 'warning')
+            if clusters:
+                trending = format_entries(clusters)
+                trending_part = f"TRENDING TOPICS:\n{trending}"
+                # A partial result would show the failed queries' topics as dropped
+                if not errors:
+                    with stage('trend_delta') as span:
+                        delta, age_hours = trend_snapshots.compare(clusters)
+                        if delta is not None:
+                            span.set(**{name: len(entries) for name, entries in delta.items()})
+                    if delta is not None:
+                        emit_log(
+                            f"Since last run: {len(delta['new'])} new, {len(delta['rising'])} rising, "
+                            f"{len(delta['dropped'])} dropped topics", 'info'
+                        )
+                        if config.membit_prompt_mode == 'delta' and (delta['new'] or delta['rising']):
+                            full_chars = len(trending_part)
+                            trending_part = format_delta(delta, age_hours)
+                            emit_log(f'Prompt uses the trend delta ({len(trending_part)} instead of {full_chars} chars)', 'info')
+                membit_data_parts.append(trending_part)
+                emit_log(f'Got {len(clusters)} trending topics', 'success')
+    
+                # Pick the cluster least similar to recently covered topics for deep dive
+                # Format: label="Cluster Name Here"
+                labels = [item['label'] for item in clusters if item['label']]
+                if not labels:
+                    labels = list(dict.fromkeys(re.findall(r'label="([^"]+)"', trending)))
+                if labels:
+                    cluster_label, scores = topic_selector.select(labels)
+                    # Deep dive candidates: most novel first, ties keep trending order
+                    cluster_candidates = sorted(labels, key=lambda label: -scores[label])
+                    emit_log(f'Found {len(labels)} cluster labels, selected: {cluster_label}', 'info')
+        except Exception as e:
+            emit_log(f'⚠️ Failed to get trending topics: {str(e)}', 'warning')
+    
+    # 2. Cluster Details (clusters_info) for the top K candidates, concurrently under a deadline
+    if bot_config.get('membit_use_cluster_info', False):
+        emit_log('Getting cluster details...', 'info')
+        try:
+            if cluster_candidates:
+                top = cluster_candidates[:config.membit_deep_dive_k]
+                results = membit_fan_out(
+                    membit, membit.get_cluster_info, 'membit_clusters_info', 'label',
+                    [(label, 1.0) for label in top], limit=10,
+                    max_workers=config.membit_concurrency, timeout=config.membit_deep_dive_timeout
+                )
+                digests = []
+                for label, _, info, error in results:
+                    if error is not None:
+                        emit_log(f'⚠️ No details for "{label}": {error}', 'warning')
+                        continue
+                    summary = digest(label, info)
+                    if summary:
+                        digests.append(summary)
+                if digests:
+                    membit_data_parts.append("\nDETAILED CONTEXT:\n" + "\n\n".join(digests))
+                    emit_log(f'Got details for {len(digests)}/{len(top)} clusters: {", ".join(top)}', 'success')
+            else:
+                emit_log('⚠️ No cluster label found, skipping deep dive', 'warning')
+                emit_log('💡 Tip: Enable Trending Topics to get cluster labels', 'info')
+        except Exception as e:
+            emit_log(f'⚠️ Failed to get cluster details: {str(e)}', 'warning')
+    
+    # 3. Posts Search (posts_search)
+    if bot_config.get('membit_use_posts', False):
+        emit_log('Getting community posts...', 'info')
+        try:
+            posts, errors = fetch_ranked(
+                membit, membit.search_posts, 'membit_posts_search', 'post', queries,
+                limit=5, top_n=config.membit_top_posts, max_workers=config.membit_concurrency
+            )
+            for query, error in errors.items():
+                emit_log(f'⚠️ Failed to get posts for "{query}": {error}', 'warning')
+            if posts:
+                membit_data_parts.append(f"\nCOMMUNITY POSTS:\n{format_entries(posts)}")
+                emit_log(f'Got {len(posts)} community posts', 'success')
+        except Exception as e:
+            emit_log(f'⚠️ Failed to get posts: {str(e)}', 'warning')
+    
+    # Combine all data
+    if membit_data_parts:
+        trending_data = "\n\n".join(membit_data_parts)
+    else:
+        # Trending failed (should not happen often)
+        emit_log('⚠️ Failed to fetch Membit data. Using fallback.', 'warning')
+        trending_data = "Web3 and cryptocurrency trending topics"
+    
+    return trending_data, cluster_label
+    
+class NearDuplicateError(Exception):
+    """Raised when every regeneration stays too similar to a past tweet"""
+
+def generate_tweet(gemini, template, prompt_name, trending_data, max_tweet_length, max_retries):
+    """Generate one tweet, regenerating while it is too similar to a past tweet"""
+    emit_log('Generating tweet with Gemini AI...', 'info')
+    
+    # Fill the precompiled template (no parsing per run)
+    prompt = template.render(
+        trending_data=trending_data,
+        max_tweet_length=max_tweet_length
+    )
+    
+    emit_log(f"Using prompt '{prompt_name}' (template: {len(template.source)} chars, formatted: {len(prompt)} chars)", 'info')
+    
+    # Regenerate (without refetching Membit) while too similar to a past tweet
+    tweet_text = None
+    generation_prompt = prompt
+    for _ in range(max_retries):
+        with stage('gemini_tweet') as span:
+            candidate = run_blocking(gemini.generate_content, generation_prompt)
+            span.set(prompt_chars=len(generation_prompt), output_chars=len(candidate), **gemini.last_usage)
+        candidate = candidate.strip().strip('"').strip("'")
+        
+        similar = tweet_history.find_similar(candidate)
+        if not similar:
+            tweet_text = candidate
+            break
+        
+        posted_at = datetime.fromtimestamp(similar['timestamp']).strftime('%Y-%m-%d %H:%M')
+        emit_log(f'Tweet too similar ({similar["similarity"]:.0%}) to tweet from {posted_at}, regenerating...', 'warning')
+        metrics.RETRIES.inc(reason='near_duplicate')
+        generation_prompt = f"{prompt}\n\nDo NOT repeat this recent tweet, pick a different angle or topic:\n{similar['text']}"
+    
+    if tweet_text is None:
+        raise NearDuplicateError("Could not generate a tweet different enough from recent tweets")
+    return tweet_text
+
+def generate_drafts(gemini, template, trending_data, config, ref):
+    """
+    Generate a batch of drafts from one Membit snapshot in a single Gemini call and queue them
+    Drafts that are too long, or too similar to a past tweet or to another
+    draft of the batch, are dropped.
+    Returns: number of queued drafts
+    """
+    count = config.draft_batch_size
+    prompt = template.render(
+        trending_data=trending_data,
+        max_tweet_length=config.max_tweet_length
+    ) + batch_instructions(count)
+    
+    emit_log(f'Generating {count} drafts with Gemini AI in one call...', 'info')
+    with stage('gemini_batch', drafts=count) as span:
+        response = run_blocking(gemini.generate_content, prompt)
+        span.set(prompt_chars=len(prompt), output_chars=len(response), **gemini.last_usage)
+    
+    drafts = []
+    signatures = []
+    for text, topic in parse_drafts(response)[:count]:
+        length = weighted_length(text)
+        if length > MAX_WEIGHTED_LENGTH:
+            emit_log(f'Dropping draft, too long ({length} chars): {text}', 'warning')
+            continue
+        if tweet_history.find_similar(text):
+            emit_log(f'Dropping draft, too similar to a past tweet: {text}', 'warning')
+            continue
+        signature = minhash_signature(text)
+        if any((signature == other).mean() >= tweet_history.threshold for other in signatures):
+            emit_log(f'Dropping draft, too similar to another draft: {text}', 'warning')
+            continue
+        signatures.append(signature)
+        drafts.append((text, topic))
+    
+    if not drafts:
+        raise Exception("None of the generated drafts could be used")
+    draft_queue.add(drafts, require_approval=config.draft_require_approval, membit_ref=ref)
+    metrics.DRAFTS.inc(len(drafts), event='queued')
+    bot_status['draft_updates'] += 1
+    emit_log(f'Queued {len(drafts)}/{count} drafts', 'success')
+    return len(drafts)
+
+def next_draft(membit, gemini, template, config, trace):
+    """
+    Claim the oldest queued draft, generating a new batch when none is queued
+    Returns: the claimed draft, or None while drafts wait for approval
+    """
+    draft = draft_queue.claim()
+    if draft is None:
+        waiting = draft_queue.counts()['pending']
+        if not waiting:
+            membit_started = time.time()
+            trending_data, _ = collect_membit_data(membit, config)
+            trace.attributes['membit_ref'] = membit_ref(membit_started)
+            generate_drafts(gemini, template, trending_data, config, trace.attributes['membit_ref'])
+            trend_snapshots.commit()
+            draft = draft_queue.claim()
+            waiting = draft_queue.counts()['pending']
+        if draft is None:
+            emit_log(f'{waiting} drafts waiting for approval on the dashboard, nothing to post yet', 'info')
+            return None
+    
+    trace.attributes['membit_ref'] = draft['membit_ref']
+    emit_log(f"Posting queued draft #{draft['id']} (topic: {draft['topic'] or 'unknown'})", 'info')
+    return draft
+
+def membit_ref(started):
+    """
+    Archive window of the Membit calls made since `started` (stored in run history)
+    A query string for /api/membit/archive and /api/membit/archive/replay
+    that lists or replays exactly those calls; None while the archive is off.
+    """
+    if membit_archive is None:
+        return None
+    return f'start={int(started)}&end={int(time.time()) + 1}'
+
+def finish_run(outcome):
+    """Record the outcome of the current run"""
+    metrics.RUNS.inc(outcome=outcome)
+    trace = tracing.current_trace()
+    if trace:
+        trace.finish(outcome)
+
+def create_and_post_tweet():
+    """
+    Main function to create and post tweet, traced as one run
+    Returns: seconds until posting quota is available if the run was skipped, else None
+    """
+    trace = None
+    try:
+        with trace_store.run() as trace:
+            bot_status['last_trace'] = trace.trace_id
+            emitter.status(bot_status)
+            return run_pipeline(trace)
+    finally:
+        if trace is not None:
+            try:
+                run_history.record(trace.to_dict())
+            except Exception as e:
+                emit_log(f'⚠️ Failed to save run history: {str(e)}', 'warning')
+
+def run_pipeline(trace):
+    """Fetch Membit data, generate and post one tweet"""
+    config = settings.current
+    max_retries = config.max_retries
+    max_tweet_length = config.max_tweet_length
+    
+    # Check posting quota before spending any Membit/Gemini/Pollinations calls
+    allowed, retry_after, reason = quota_ledger.check()
+    if not allowed:
+        emit_log(f'⏸️ Skipping run: {reason}. Posting available again in {format_duration(retry_after)}', 'warning')
+        metrics.BREAKER_TRIPS.inc(breaker='twitter_quota')
+        finish_run('skipped')
+        bot_status['quota'] = quota_ledger.headroom()
+        emitter.status(bot_status)
+        return retry_after
+    
+    # Prompt template is checked before any Membit/Gemini calls (compiled once per template)
+    prompt_name = bot_config.get('prompt_name', 'default')
+    try:
+        template = compile_template(bot_config.get('prompt_template', ''))
+    except TemplateError as e:
+        error_msg = f"Prompt template '{prompt_name}' is invalid: {e}. Please fix it in Settings."
+        emit_log(f'❌ {error_msg}', 'error')
+        span = tracing.begin_span('prompt_template')
+        span.set(error=error_msg[:200])
+        span.close('error')
+        bot_status['error_count'] += 1
+        bot_status['last_error'] = {
+            'message': error_msg,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        finish_run('failed')
+        emitter.status(bot_status)
+        return
+    for warning in template.warnings:
+        emit_log(f'Warning: {warning}. Gemini may generate long tweets.', 'warning')
+    
+    emit_log(f'Starting tweet generation (run {trace.trace_id})...', 'info')
+    
+    attempt_span = None
+    for attempt in range(max_retries):
+        if attempt_span:
+            attempt_span.close('retry')
+        attempt_span = tracing.begin_span('attempt', number=attempt + 1)
+        draft = None
+        
+        # Check if bot was stopped
+        if stop_scheduler:
+            emit_log('Bot stopped, cancelling tweet generation', 'warning')
+            return
+        
+        try:
+            if attempt > 0:
+                emit_log(f'Retry attempt {attempt + 1}/{max_retries}', 'warning')
+                metrics.RETRIES.inc(reason='attempt')
+            
+            # Initialize clients (reused until API keys change)
+            emit_log('Initializing clients...', 'info')
+            membit, gemini, twitter = get_api_clients()
+            
+            # Check if bot was stopped
+            if stop_scheduler:
+                emit_log('Bot stopped, cancelling tweet generation', 'warning')
+                return
+            
+            # Resolve posts left unfinished by a crash or restart
+            if post_attempts.pending():
+                emit_log('Checking timeline for unfinished post attempts...', 'info')
+                with stage('reconcile'):
+                    recovered_posts = post_attempts.reconcile_pending(twitter)
+                for recovered in recovered_posts:
+                    quota_ledger.record_post()
+                    tweet_history.add(recovered['text'], recovered['id'])
+                    run_history.record_recovered(recovered['id'], recovered['text'])
+                    bot_status['total_tweets'] += 1
+                    bot_status['success_count'] += 1
+                    bot_status['last_tweet'] = {
+                        'text': recovered['text'],
+                        'id': recovered['id'],
+                        'url': f"https://twitter.com/i/web/status/{recovered['id']}",
+                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    }
+                    emit_log(f'Found tweet from an unfinished attempt on timeline. ID: {recovered["id"]}', 'success')
+                if recovered_posts:
+                    emitter.status(bot_status)
+            
+            if config.draft_batch_size > 1:
+                # Batch mode: post from the draft queue, Membit and Gemini are only called to refill it
+                draft = next_draft(membit, gemini, template, config, trace)
+                if draft is None:
+                    finish_run('queued')
+                    emitter.status(bot_status)
+                    return
+                # Length was checked when the draft was generated or edited
+                tweet_text, cluster_label = draft['text'], draft['topic']
+                tweet_length = weighted_length(tweet_text)
+            else:
+                membit_started = time.time()
+                trending_data, cluster_label = collect_membit_data(membit, config)
+                trace.attributes['membit_ref'] = membit_ref(membit_started)
+                
+                # Check if bot was stopped
+                if stop_scheduler:
+                    emit_log('Bot stopped, cancelling tweet generation', 'warning')
+                    return
+                
+                tweet_text = generate_tweet(gemini, template, prompt_name, trending_data, max_tweet_length, max_retries)
+                
+                # Validate length (weighted the way Twitter counts it)
+                tweet_length = weighted_length(tweet_text)
+                if tweet_length > MAX_WEIGHTED_LENGTH:
+                    if attempt == max_retries - 1:
+                        # Handled like any failed attempt: last_error, status, run ends as failed
+                        raise Exception(f'Tweet too long ({tweet_length} chars) after {max_retries} attempts')
+                    emit_log(f'Tweet too long ({tweet_length} chars), regenerating...', 'warning')
+                    metrics.RETRIES.inc(reason='too_long')
+                    continue
+                
+                emit_log(f'Generated tweet ({tweet_length} chars): {tweet_text}', 'success')
+            
+            # Check if bot was stopped before posting
+            if stop_scheduler:
+                emit_log('Bot stopped, cancelling tweet posting', 'warning')
+                if draft:
+                    draft_queue.release(draft, 'Bot stopped before posting')
+                return
+            
+            # Generate and upload image if enabled
+            media_ids = None
+            media_allowed, _, media_reason = quota_ledger.check(with_media=True)
+            if bot_config.get('enable_image', False) and not media_allowed:
+                emit_log(f'{media_reason}, posting text-only tweet', 'warning')
+                metrics.BREAKER_TRIPS.inc(breaker='media_quota')
+            elif bot_config.get('enable_image', False):
+                try:
+                    emit_log('Generating image with AI...', 'info')
+                    
+                    # Generate image prompt from tweet
+                    with stage('gemini_image_prompt') as span:
+                        image_prompt = run_blocking(gemini.generate_image_prompt, tweet_text)
+                        span.set(**gemini.last_usage)
+                    emit_log(f'Image prompt: {image_prompt}', 'info')
+                    
+                    # Generate image
+                    image_gen = ImageGenerator()
+                    with stage('pollinations') as span:
+                        image_path = image_gen.generate_image(
+                            prompt=image_prompt,
+                            width=bot_config.get('image_width', 1200),
+                            height=bot_config.get('image_height', 675),
+                            style=bot_config.get('image_style', 'digital art')
+                        )
+                        span.set(image_bytes=image_gen.last_size, http_status=image_gen.last_status)
+                    emit_log(f'Image generated: {image_path}', 'success')
+                    
+                    # Upload to Twitter
+                    emit_log('Uploading image to Twitter...', 'info')
+                    with stage('media_upload', image_bytes=image_gen.last_size):
+                        media_id = twitter.upload_media(image_path)
+                    media_ids = [media_id]
+                    quota_ledger.record_media()
+                    emit_log('Image uploaded successfully', 'success')
+                    
+                    # Cleanup
+                    image_gen.cleanup()
+                    
+                except RateLimitError as media_error:
+                    # A media 429 only blocks uploads, the tweet itself can still go out
+                    quota_ledger.block_media_until(media_error.reset_at)
+                    metrics.BREAKER_TRIPS.inc(breaker='twitter_media_429')
+                    image_gen.cleanup()
+                    emit_log(f'Media upload rate limited: {str(media_error)}', 'warning')
+                    emit_log('Continuing with text-only tweet...', 'info')
+                    media_ids = None
+                    
+                except Exception as img_error:
+                    emit_log(f'Failed to generate/upload image: {str(img_error)}', 'warning')
+                    emit_log('Continuing with text-only tweet...', 'info')
+                    media_ids = None
+            
+            # Post tweet
+            if media_ids:
+                emit_log('Posting tweet with image to Twitter...', 'info')
+            else:
+                emit_log('Posting tweet to Twitter...', 'info')
+            with stage('tweet_post', weighted_length=tweet_length, media=len(media_ids or [])) as span:
+                result = post_attempts.post_once(twitter, tweet_text, media_ids=media_ids)
+                span.set(deduplicated=result['deduplicated'], reconciled=result['reconciled'])
+            if result['deduplicated']:
+                emit_log('This tweet was already posted, not posting it again', 'warning')
+                metrics.CACHE_HITS.inc(cache='post_attempts')
+            else:
+                quota_ledger.record_post()
+            if result['reconciled']:
+                emit_log('Post timed out but was found on timeline, not posting again', 'info')
+            if not result['deduplicated']:
+                trace.attributes.update(tweet_id=result.get('id'), tweet_text=tweet_text, media=len(media_ids or []))
+                tweet_history.add(tweet_text, result.get('id'))
+                topic_selector.record(cluster_label, tweet_text)
+            if draft:
+                draft_queue.mark_posted(draft['id'], result.get('id'))
+                metrics.DRAFTS.inc(event='posted')
+                bot_status['draft_updates'] += 1
+            else:
+                # The next run's delta is measured from the data this tweet used
+                trend_snapshots.commit()
+            
+            # Update status
+            bot_status['last_run'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if not result['deduplicated']:
+                bot_status['total_tweets'] += 1
+                bot_status['success_count'] += 1
+            bot_status['last_tweet'] = {
+                'text': tweet_text,
+                'id': result.get('id'),
+                'url': f"https://twitter.com/i/web/status/{result.get('id')}",
+                'timestamp': bot_status['last_run']
+            }
+            bot_status['quota'] = quota_ledger.headroom()
+            
+            emit_log(f'Tweet posted successfully! ID: {result.get("id")}', 'success')
+            finish_run('deduplicated' if result['deduplicated'] else 'success')
+            emitter.status(bot_status)
+            return
+            
+        except RateLimitError as e:
+            # Retrying a 429 only makes it worse, block posting until the window resets
+            attempt_span.close('error')
+            if draft:
+                draft_queue.release(draft, e)
+            quota_ledger.block_until(e.reset_at)
+            emit_log(f'Error: {str(e)}', 'error')
+            metrics.BREAKER_TRIPS.inc(breaker='twitter_429')
+            finish_run('rate_limited')
+            bot_status['error_count'] += 1
+            bot_status['last_error'] = {
+                'message': str(e),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            bot_status['quota'] = quota_ledger.headroom()
+            emitter.status(bot_status)
+            return max(1, int(e.reset_at - time.time()))
+            
+        except NearDuplicateError as e:
+            # Regeneration already ran on this Membit data, another Membit round would mostly repeat it
+            attempt_span.set(error=str(e)[:200])
+            attempt_span.close('error')
+            emit_log(f'Error: {str(e)}', 'error')
+            emit_log('Skipping this run, the next run starts from fresh Membit data.', 'warning')
+            finish_run('duplicate')
+            bot_status['error_count'] += 1
+            bot_status['last_error'] = {
+                'message': str(e),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            emitter.status(bot_status)
+            return
+            
+        except UncertainPostError as e:
+            # Retrying would post a new draft while this one may be live
+            attempt_span.close('error')
+            if draft:
+                # Posting it again first checks the timeline for this text
+                draft_queue.release(draft, e)
+            emit_log(f'Error: {str(e)}', 'error')
+            emit_log('Not retrying to avoid a double post. It will be checked on the next run.', 'warning')
+            finish_run('uncertain')
+            bot_status['error_count'] += 1
+            bot_status['last_error'] = {
+                'message': str(e),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            emitter.status(bot_status)
+            return
+            
+        except Exception as e:
+            error_msg = str(e)
+            emit_log(f'Error: {error_msg}', 'error')
+            if draft and draft_queue.release(draft, e) == 'failed':
+                emit_log(f"Draft #{draft['id']} failed {draft['attempts']} times, dropped from the queue", 'warning')
+                metrics.DRAFTS.inc(event='failed')
+            attempt_span.set(error=error_msg[:200])
+            attempt_span.close('error')
+            bot_status['error_count'] += 1
+            bot_status['last_error'] = {
+                'message': error_msg,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            emitter.status(bot_status)
+            
+            if attempt < max_retries - 1:
+                emit_log('Retrying in 5 seconds...', 'warning')
+                # Sleep in small intervals to allow stopping
+                for _ in range(5):
+                    if stop_scheduler:
+                        emit_log('Bot stopped during retry wait', 'warning')
+                        return
+                    time.sleep(1)
+            else:
+                emit_log('Max retries reached. Giving up.', 'error')
+                finish_run('failed')
+                return
+
+def set_next_run(next_run_time):
+    """Publish the next planned run to dashboards"""
+    bot_status['next_run'] = datetime.fromtimestamp(next_run_time).strftime('%Y-%m-%d %H:%M:%S')
+    emitter.status(bot_status)
+
+def scheduler_loop(generation):
+    """Scheduler loop for auto-posting"""
+    
+    def stopped():
+        # A newer scheduler thread replaces this one after a quick stop/start
+        return stop_scheduler or generation != scheduler_generation
+    
+    while not stopped():
+        retry_after = create_and_post_tweet()
+        
+        if stopped():
+            break
+        
+        # Calculate next run (reschedule to when quota frees up if the run was skipped)
+        last_run_end = time.time()
+        schedule_hours = settings.current.schedule_hours
+        wait_seconds = retry_after if retry_after else schedule_hours * 3600
+        next_run_time = last_run_end + wait_seconds
+        set_next_run(next_run_time)
+        
+        if retry_after:
+            emit_log(f'Run rescheduled in {format_duration(wait_seconds)} (posting quota)', 'info')
+        else:
+            emit_log(f'Next run in {schedule_hours} hours', 'info')
+        
+        # Sleep until the next run; stop and settings changes wake us early
+        while not stopped():
+            remaining = next_run_time - time.time()
+            if remaining <= 0:
+                break
+            scheduler_wakeup.wait(remaining)
+            scheduler_wakeup.clear()
+            
+            # Re-plan from the end of the last run when the interval changed
+            # (a quota wait is kept, posting is not possible before it ends)
+            if not retry_after and settings.current.schedule_hours != schedule_hours and not stopped():
+                schedule_hours = settings.current.schedule_hours
+                next_run_time = last_run_end + schedule_hours * 3600
+                set_next_run(next_run_time)
+                emit_log(f'Schedule changed to every {schedule_hours} hours, next run in {format_duration(max(0, next_run_time - time.time()))}', 'info')
+
+def start_scheduler():
+    """Start the scheduler thread"""
+    global scheduler_thread, stop_scheduler, scheduler_generation
+    
+    bot_status['running'] = True
+    stop_scheduler = False
+    scheduler_generation += 1
+    
+    scheduler_thread = threading.Thread(target=scheduler_loop, args=(scheduler_generation,), daemon=True)
+    scheduler_thread.start()
+    
+    emitter.status(bot_status)
+
+def stop_bot_scheduler():
+    """Signal the scheduler thread (and any running pipeline) to stop"""
+    global stop_scheduler
+    
+    stop_scheduler = True
+    scheduler_wakeup.set()
+    bot_status['running'] = False
+    bot_status['next_run'] = None
+    
+    emitter.status(bot_status)
+
@@ -0,0 +1,210 @@
+import os
+import sys
+import copy
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from server_mode import run_blocking
+
+class QueueEmitter:
+    """Emitter used inside the worker process, forwards status to the web process"""
+
+    def __init__(self, events):
+        self.events = events
+
+    def log(self, entry):
+        self.events.put(('log', entry['message'], entry['level']))
+
+    def status(self, bot_status):
+        self.events.put(('status', copy.deepcopy(bot_status)))
+
+    def snapshot(self, bot_status):
+        return copy.deepcopy(bot_status)
+
+    def pending(self):
+        return 0
+
+@contextmanager
+def _spawn_main():
+    """
+    Make this module __main__ while a worker is spawned
+    A spawned child first re-runs the parent's __main__ (app.py: Flask,
+    Socket.IO, auth...) as __mp_main__. This module has no import-time
+    side effects, so the child only builds what `pipeline` needs.
+    """
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = sys.modules[__name__]
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+# Draft queue methods the web process may call through the worker
+DRAFT_ACTIONS = ('approve', 'reject')
+
+def _worker_main(commands, events):
+    """Entry point of the worker process: run the pipeline, obey commands"""
+    import pipeline as bot
+    import metrics
+
+    # Logs, status and metrics go to the web process instead of local sockets/log files
+    def emit_log(message, level='info'):
+        events.put(('log', message, level))
+
+    def forward_metric(name, value, labels):
+        events.put(('metric', name, value, labels))
+
+    bot.emit_log = emit_log
+    bot.emitter = QueueEmitter(events)
+    metrics.REGISTRY.forward = forward_metric
+    # The web process shows the pipeline's status (quota, restored counters) from the start
+    bot.emitter.status(bot.bot_status)
+    events.put(('ready', os.getpid()))
+
+    while True:
+        command, payload = commands.get()
+        request_id = payload.pop('request_id', None)
+        result = None
+        try:
+            if command == 'draft':
+                # Only this process changes drafts, a run may be posting one
+                if payload['action'] not in DRAFT_ACTIONS:
+                    raise ValueError(f"Unknown draft action '{payload['action']}'")
+                getattr(bot.draft_queue, payload['action'])(payload['draft_id'], **payload.get('options', {}))
+                result = bot.draft_queue.counts()
+            elif command == 'config':
+                bot.bot_config.update(payload.get('bot_config', {}))
+                bot.settings.apply(payload.get('settings', {}))
+            elif command == 'start':
+                bot.start_scheduler()
+            elif command == 'stop':
+                bot.stop_bot_scheduler()
+            elif command == 'run_once':
+                threading.Thread(target=bot.create_and_post_tweet, daemon=True).start()
+            elif command == 'shutdown':
+                bot.stop_bot_scheduler()
+                break
+        except Exception as e:
+            if request_id is None:
+                emit_log(f'Worker failed to handle {command}: {str(e)}', 'error')
+            else:
+                events.put(('reply', request_id, None, e if isinstance(e, ValueError) else Exception(str(e))))
+            continue
+        if request_id is not None:
+            events.put(('reply', request_id, result, None))
+
+class PipelineWorker:
+    """
+    Run the scheduler and tweet pipeline in a separate process
+
+    The web process sends commands (start, stop, run_once, config, draft)
+    over one queue and receives events (logs, status, replies) over
+    another. Gemini/gRPC,
+    image handling and blocking HTTP then never compete with dashboard
+    requests for the GIL, and a crashed pipeline is restarted without
+    taking the UI down.
+    """
+
+    def __init__(self, on_event, start_task=None):
+        self.on_event = on_event
+        self.start_task = start_task or (lambda target: threading.Thread(target=target, daemon=True).start())
+        self.ctx = multiprocessing.get_context('spawn')
+        self.commands = None
+        self.events = None
+        self.process = None
+        self._stopping = False
+        self._request_ids = itertools.count(1)
+        self._replies = {}
+
+    def start(self):
+        """Start the worker process and the event relay"""
+        # Spawned children inherit the environment: the worker never serves
+        # HTTP, so plain threads are enough
+        os.environ['ASYNC_MODE'] = 'threading'
+        os.environ['PIPELINE_WORKER'] = '0'
+
+        self.commands = self.ctx.Queue()
+        self.events = self.ctx.Queue()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(self.commands, self.events),
+            name='pipeline-worker',
+            daemon=True
+        )
+        with _spawn_main():
+            self.process.start()
+        self.start_task(self._relay)
+
+    def send(self, command, **payload):
+        """Send a command to the worker"""
+        self.commands.put((command, payload))
+
+    def request(self, command, timeout=10, **payload):
+        """
+        Send a command and wait for the worker's answer
+        Raises the worker's error (ValueError stays a ValueError).
+        Returns: the command's result
+        """
+        request_id = next(self._request_ids)
+        reply = self._replies[request_id] = {'done': threading.Event()}
+        try:
+            self.send(command, request_id=request_id, **payload)
+            if not reply['done'].wait(timeout):
+                raise Exception('Pipeline worker did not answer, try again')
+        finally:
+            self._replies.pop(request_id, None)
+        if reply['error'] is not None:
+            raise reply['error']
+        return reply['result']
+
+    def _resolve(self, request_id, result, error):
+        reply = self._replies.get(request_id)
+        if reply is not None:
+            reply.update(result=result, error=error)
+            reply['done'].set()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def shutdown(self):
+        """Stop the worker process"""
+        self._stopping = True
+        if self.is_alive():
+            self.send('shutdown')
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+    def _next_event(self):
+        try:
+            return self.events.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    def _relay(self):
+        """Forward worker events to the web process, restart the worker if it dies"""
+        process = self.process
+        while not self._stopping:
+            event = run_blocking(self._next_event)
+            if event is not None:
+                if event[0] == 'reply':
+                    self._resolve(*event[1:])
+                    continue
+                try:
+                    self.on_event(event)
+                except Exception:
+                    pass
+                continue
+
+            if not process.is_alive():
+                exitcode = process.exitcode
+                if self._stopping:
+                    return
+                self.on_event(('crashed', exitcode))
+                # Back off a little so a worker that dies on startup does not spin
+                run_blocking(time.sleep, 5)
+                self.start()
+                return
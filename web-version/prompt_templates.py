@@ -0,0 +1,232 @@
+import re
+import json
+import time
+import string
+import threading
+from functools import lru_cache
+from pathlib import Path
+from atomic_file import atomic_write, file_lock
+
+# Variables a prompt template may use
+VARIABLES = {
+    'trending_data': 'Trend data from Membit',
+    'max_tweet_length': 'Maximum tweet length'
+}
+# Without these the template cannot work
+REQUIRED = ('trending_data',)
+# Without these it works, but results may be worse
+RECOMMENDED = ('max_tweet_length',)
+
+NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,40}$')
+MAX_VERSIONS = 20
+
+DEFAULT_TEMPLATE = """Anda adalah seorang social media manager yang ahli di bidang Web3 dan cryptocurrency. 
+
+Analisis data trending dari Membit berikut:
+{trending_data}
+
+Tugas Anda:
+1. Pilih SATU topik paling menarik dan relevan dari data di atas
+2. Prioritaskan topik yang sedang trending atau memiliki pergerakan signifikan
+3. Buat tweet informatif dan engaging dalam Bahasa Inggris
+
+Aturan PENTING:
+- Tweet MAKSIMAL {max_tweet_length} karakter (termasuk spasi dan hashtag)
+- Singkat, padat, dan menarik
+- Fokus pada insight atau fakta menarik
+- Gunakan tone profesional tapi tetap casual
+- Akhiri dengan 1-2 hashtag relevan (contoh: #Web3, #Crypto, #DeFi, #NFT, #Oracle, #Layer2, dll sesuai topik)
+- Jawab HANYA dengan tweet final, tanpa penjelasan atau pengantar apapun"""
+
+class TemplateError(ValueError):
+    """Prompt template cannot be used (syntax error, unknown or missing variable)"""
+    pass
+
+class PromptTemplate:
+    """
+    Prompt template parsed once into literal text and placeholder slots
+
+    Parsing uses str.format syntax ({name}, {{ and }} for braces) and
+    rejects anything render() could not fill: unknown variables, positional
+    {} fields, attribute/index access, conversions and format specs.
+    render() only copies the parts list and fills the slots.
+    """
+
+    def __init__(self, source):
+        if not source or not source.strip():
+            raise TemplateError("Prompt template cannot be empty")
+        self.source = source
+        self.parts = []
+        self.slots = []
+
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateError(f"Invalid prompt template: {e} (use {{{{ and }}}} for literal braces)")
+
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                self.parts.append(literal)
+            if field is None:
+                continue
+            if field not in VARIABLES:
+                if field == '' or not field.isidentifier():
+                    raise TemplateError(f"Invalid placeholder '{{{field}}}', use a variable name like {{trending_data}}")
+                raise TemplateError(
+                    f"Unknown variable {{{field}}} in prompt template. "
+                    f"Available: {', '.join('{' + name + '}' for name in VARIABLES)}"
+                )
+            if format_spec or conversion:
+                raise TemplateError(f"Use a plain {{{field}}} placeholder, formatting options are not supported")
+            self.slots.append((len(self.parts), field))
+            self.parts.append(None)
+
+        self.variables = {field for _, field in self.slots}
+        missing = [name for name in REQUIRED if name not in self.variables]
+        if missing:
+            raise TemplateError(f"Prompt template must contain {', '.join('{' + name + '}' for name in missing)}")
+        self.warnings = [
+            f"Prompt template has no {{{name}}} variable ({VARIABLES[name].lower()})"
+            for name in RECOMMENDED if name not in self.variables
+        ]
+
+    def render(self, **values):
+        """Fill the placeholders (every variable the template uses must be given)"""
+        parts = self.parts[:]
+        for index, field in self.slots:
+            parts[index] = str(values[field])
+        return ''.join(parts)
+
+@lru_cache(maxsize=32)
+def compile_template(source):
+    """Parsed template for `source`, each distinct text is only parsed once"""
+    return PromptTemplate(source)
+
+class PromptTemplateStore:
+    """
+    Named prompt templates with version history
+
+    Every save is validated first and adds a version (the last MAX_VERSIONS
+    are kept), so a bad template is rejected when it is saved, not when a
+    run uses it. One template is active; activating an older version makes
+    it the newest one again. The file is written atomically under a lock.
+    """
+
+    def __init__(self, store_file='data/prompt_templates.json', legacy_file='prompt_template.txt'):
+        self.store_path = Path(__file__).parent / store_file
+        self.legacy_path = Path(__file__).parent / legacy_file
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        """Load templates, import the single prompt_template.txt of older versions"""
+        if self.store_path.exists():
+            try:
+                with open(self.store_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('templates'):
+                    return state
+            except (OSError, ValueError):
+                pass
+
+        source = DEFAULT_TEMPLATE
+        if self.legacy_path.exists():
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                source = f.read() or DEFAULT_TEMPLATE
+        return {
+            'active': 'default',
+            'templates': {'default': [{'version': 1, 'source': source, 'saved_at': time.time()}]}
+        }
+
+    def _save_state(self):
+        with file_lock(self.store_path):
+            atomic_write(self.store_path, json.dumps(self.state, indent=2, ensure_ascii=False))
+
+    def active_name(self):
+        return self.state['active']
+
+    def active_source(self, emit_log=None):
+        """
+        Source of the active template (falls back to the default if it no longer compiles)
+        The fallback is reported through `emit_log(message, level)` when given, printed otherwise.
+        """
+        with self._lock:
+            source = self.state['templates'][self.state['active']][-1]['source']
+        try:
+            compile_template(source)
+        except TemplateError as e:
+            message = f"Active prompt template '{self.state['active']}' is invalid ({e}), using the default"
+            if emit_log:
+                emit_log(message, 'warning')
+            else:
+                print(message)
+            return DEFAULT_TEMPLATE
+        return source
+
+    def save(self, name, source, activate=True):
+        """
+        Validate and store a new version of template `name`
+        Raises TemplateError when the template is invalid (nothing is saved).
+        Returns: (version, warnings)
+        """
+        if not NAME_RE.match(name or ''):
+            raise TemplateError("Template name must be 1-40 letters, digits, '-' or '_'")
+        template = compile_template(source)
+
+        with self._lock:
+            versions = self.state['templates'].setdefault(name, [])
+            if versions and versions[-1]['source'] == source:
+                version = versions[-1]['version']
+            else:
+                version = versions[-1]['version'] + 1 if versions else 1
+                versions.append({'version': version, 'source': source, 'saved_at': time.time()})
+                del versions[:-MAX_VERSIONS]
+            if activate:
+                self.state['active'] = name
+            self._save_state()
+        return version, template.warnings
+
+    def activate(self, name, version=None):
+        """Make template `name` active, optionally restoring one of its older versions"""
+        with self._lock:
+            versions = self.state['templates'].get(name)
+            if not versions:
+                raise TemplateError(f"Unknown prompt template '{name}'")
+            if version is not None:
+                match = [entry for entry in versions if entry['version'] == int(version)]
+                if not match:
+                    raise TemplateError(f"Prompt template '{name}' has no version {version}")
+                source = match[0]['source']
+            else:
+                source = versions[-1]['source']
+        if version is not None:
+            return self.save(name, source)[0]
+        with self._lock:
+            self.state['active'] = name
+            self._save_state()
+            return versions[-1]['version']
+
+    def delete(self, name):
+        with self._lock:
+            if name == self.state['active']:
+                raise TemplateError("The active prompt template cannot be deleted")
+            if self.state['templates'].pop(name, None) is None:
+                raise TemplateError(f"Unknown prompt template '{name}'")
+            self._save_state()
+
+    def summary(self):
+        """All templates with their versions (newest first, without sources except the latest)"""
+        with self._lock:
+            templates = []
+            for name, versions in self.state['templates'].items():
+                templates.append({
+                    'name': name,
+                    'active': name == self.state['active'],
+                    'version': versions[-1]['version'],
+                    'source': versions[-1]['source'],
+                    'versions': [
+                        {'version': entry['version'], 'saved_at': entry['saved_at']}
+                        for entry in reversed(versions)
+                    ]
+                })
+            return {'active': self.state['active'], 'templates': templates, 'variables': VARIABLES}
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+
+DAY_SECONDS = 24 * 3600
+MONTH_SECONDS = 30 * DAY_SECONDS
+
+class QuotaLedger:
+    """Persistent ledger of Twitter write usage (posts and media uploads)
+
+    Tracks every post and media upload in rolling 24h / 30d windows and
+    keeps a token bucket that refills at the daily post rate, so a run can
+    be refused before any Membit, Gemini or Pollinations work is done.
+    """
+
+    def __init__(self, ledger_file='data/quota_ledger.json', daily_post_limit=50,
+                 monthly_post_limit=1500, daily_media_limit=50, burst=3):
+        self.ledger_path = Path(__file__).parent / ledger_file
+        self.daily_post_limit = daily_post_limit
+        self.monthly_post_limit = monthly_post_limit
+        self.daily_media_limit = daily_media_limit
+        self.burst = max(1, burst)
+        self.refill_rate = daily_post_limit / DAY_SECONDS  # tokens per second
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        """Load ledger state from file"""
+        if self.ledger_path.exists():
+            try:
+                with open(self.ledger_path, 'r') as f:
+                    state = json.load(f)
+                state.setdefault('posts', [])
+                state.setdefault('media', [])
+                state.setdefault('tokens', float(self.burst))
+                state.setdefault('updated_at', time.time())
+                state.setdefault('blocked_until', 0)
+                state.setdefault('media_blocked_until', 0)
+                return state
+            except (OSError, ValueError):
+                pass
+        return {
+            'posts': [],
+            'media': [],
+            'tokens': float(self.burst),
+            'updated_at': time.time(),
+            'blocked_until': 0,
+            'media_blocked_until': 0
+        }
+
+    def _save_state(self):
+        """Save ledger state to file (write to temp file, then rename)"""
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.ledger_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.ledger_path)
+
+    def _refresh(self, now):
+        """Refill the token bucket and drop events outside the 30 day window"""
+        elapsed = max(0.0, now - self.state['updated_at'])
+        self.state['tokens'] = min(float(self.burst), self.state['tokens'] + elapsed * self.refill_rate)
+        self.state['updated_at'] = now
+
+        cutoff = now - MONTH_SECONDS
+        self.state['posts'] = [t for t in self.state['posts'] if t > cutoff]
+        self.state['media'] = [t for t in self.state['media'] if t > cutoff]
+
+    @staticmethod
+    def _window(events, now, seconds):
+        """Return events that fall inside the rolling window"""
+        cutoff = now - seconds
+        return [t for t in events if t > cutoff]
+
+    def check(self, with_media=False):
+        """
+        Check whether a run can post right now
+        Returns: (allowed, retry_after_seconds, reason)
+        """
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+
+            waits = []
+
+            if self.state['blocked_until'] > now:
+                waits.append((self.state['blocked_until'] - now, 'Twitter rate limit (429) still active'))
+
+            day_posts = self._window(self.state['posts'], now, DAY_SECONDS)
+            if len(day_posts) >= self.daily_post_limit:
+                # Wait until enough old posts leave the 24h window
+                oldest = day_posts[len(day_posts) - self.daily_post_limit]
+                waits.append((oldest + DAY_SECONDS - now, f'Daily post limit reached ({self.daily_post_limit}/24h)'))
+
+            month_posts = self.state['posts']
+            if len(month_posts) >= self.monthly_post_limit:
+                oldest = month_posts[len(month_posts) - self.monthly_post_limit]
+                waits.append((oldest + MONTH_SECONDS - now, f'Monthly post limit reached ({self.monthly_post_limit}/30d)'))
+
+            if with_media and self.state['media_blocked_until'] > now:
+                waits.append((self.state['media_blocked_until'] - now, 'Twitter media upload rate limit (429) still active'))
+
+            if with_media:
+                day_media = self._window(self.state['media'], now, DAY_SECONDS)
+                if len(day_media) >= self.daily_media_limit:
+                    oldest = day_media[len(day_media) - self.daily_media_limit]
+                    waits.append((oldest + DAY_SECONDS - now, f'Daily media upload limit reached ({self.daily_media_limit}/24h)'))
+
+            if self.state['tokens'] < 1:
+                waits.append(((1 - self.state['tokens']) / self.refill_rate, 'Posting too fast (token bucket empty)'))
+
+            if not waits:
+                return True, 0, None
+
+            retry_after, reason = max(waits)
+            return False, max(1, int(retry_after)), reason
+
+    def record_post(self):
+        """Record a successful post and consume one token"""
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            self.state['posts'].append(now)
+            self.state['tokens'] = max(0.0, self.state['tokens'] - 1)
+            self._save_state()
+
+    def record_media(self):
+        """Record a successful media upload"""
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            self.state['media'].append(now)
+            self._save_state()
+
+    def block_until(self, reset_timestamp):
+        """Block posting until the given epoch time (e.g. after a 429)"""
+        with self._lock:
+            self.state['blocked_until'] = max(self.state['blocked_until'], reset_timestamp)
+            self._save_state()
+
+    def block_media_until(self, reset_timestamp):
+        """Block media uploads only until the given epoch time (after a media 429)"""
+        with self._lock:
+            self.state['media_blocked_until'] = max(self.state['media_blocked_until'], reset_timestamp)
+            self._save_state()
+
+    def headroom(self):
+        """Remaining quota for the dashboard"""
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            day_posts = len(self._window(self.state['posts'], now, DAY_SECONDS))
+            day_media = len(self._window(self.state['media'], now, DAY_SECONDS))
+            blocked_until = self.state['blocked_until']
+            media_blocked_until = self.state['media_blocked_until']
+            return {
+                'posts_left_24h': max(0, self.daily_post_limit - day_posts),
+                'posts_left_30d': max(0, self.monthly_post_limit - len(self.state['posts'])),
+                'media_left_24h': max(0, self.daily_media_limit - day_media),
+                'daily_post_limit': self.daily_post_limit,
+                'monthly_post_limit': self.monthly_post_limit,
+                'tokens': round(self.state['tokens'], 2),
+                'blocked_until': blocked_until if blocked_until > now else None,
+                'media_blocked_until': media_blocked_until if media_blocked_until > now else None
+            }
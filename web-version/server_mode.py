@@ -0,0 +1,46 @@
+import os
+import threading
+
+# Server concurrency mode: threading (default), eventlet or gevent
+ASYNC_MODE = os.getenv('ASYNC_MODE', 'threading').strip().lower()
+
+if ASYNC_MODE not in ('threading', 'eventlet', 'gevent'):
+    raise ValueError(f"Invalid ASYNC_MODE '{ASYNC_MODE}' (use threading, eventlet or gevent)")
+
+def patch():
+    """
+    Monkey patch the standard library for green threads
+    Must run before anything else imports socket, ssl, threading or requests
+    """
+    if ASYNC_MODE == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif ASYNC_MODE == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+
+def run_blocking(func, *args, **kwargs):
+    """
+    Run a call that blocks outside Python sockets (gRPC, C extensions)
+    In green thread modes it runs on a real OS thread so the event loop and
+    every dashboard connection keep being served meanwhile.
+    """
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args, **kwargs)
+    if ASYNC_MODE == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(func, args, kwargs)
+    return func(*args, **kwargs)
+
+def native_threading():
+    """
+    threading module whose locks block real OS threads
+    Code reached through run_blocking runs on a worker OS thread, where an
+    eventlet-patched lock or Future cannot switch green threads and hangs.
+    gevent's patched locks work across native threads, so they are kept.
+    """
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import patcher
+        return patcher.original('threading')
+    return threading
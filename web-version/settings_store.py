@@ -0,0 +1,216 @@
+import os
+import re
+import threading
+from pathlib import Path
+from atomic_file import atomic_write, file_lock
+from membit_fanout import normalize_queries
+from trend_delta import prompt_mode
+
+ENV_LINE_RE = re.compile(r'^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=')
+
+def flag(value):
+    """Boolean setting: true/false, 1/0, yes/no, on/off"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'on'):
+        return True
+    if text in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"must be true or false, got '{value}'")
+
+class Setting:
+    """One typed setting backed by an environment variable"""
+
+    def __init__(self, env_key, cast=str, default='', minimum=None):
+        self.env_key = env_key
+        self.name = env_key.lower()
+        self.cast = cast
+        self.default = default
+        self.minimum = minimum
+
+    def parse(self, raw):
+        """Convert a raw (string) value, raise ValueError when it is invalid"""
+        if raw is None or (isinstance(raw, str) and raw.strip() == ''):
+            return self.default
+        try:
+            value = self.cast(raw.strip() if isinstance(raw, str) else raw)
+        except (TypeError, ValueError) as e:
+            if self.cast not in (int, float):
+                # Validating parsers explain what is wrong themselves
+                raise ValueError(f"{self.env_key}: {e}")
+            kind = 'a whole number' if self.cast is int else 'a number'
+            raise ValueError(f"{self.env_key} must be {kind}, got '{raw}'")
+        if self.minimum is not None and value < self.minimum:
+            raise ValueError(f"{self.env_key} must be at least {self.minimum}")
+        return value
+
+    def serialize(self, value):
+        return '' if value is None else str(value)
+
+SETTINGS = [
+    Setting('SCHEDULE_HOURS', int, 6, minimum=1),
+    Setting('MAX_RETRIES', int, 3, minimum=1),
+    Setting('MAX_TWEET_LENGTH', int, 250, minimum=1),
+    Setting('MEMBIT_API_KEY'),
+    Setting('GEMINI_API_KEY'),
+    Setting('TWITTER_API_KEY'),
+    Setting('TWITTER_API_SECRET'),
+    Setting('TWITTER_ACCESS_TOKEN'),
+    Setting('TWITTER_ACCESS_SECRET'),
+    Setting('METRICS_TOKEN'),
+    # Membit queries fetched every run ("Web3, DeFi:0.8"), merged and ranked
+    Setting('MEMBIT_QUERIES', normalize_queries, 'Web3'),
+    Setting('MEMBIT_CONCURRENCY', int, 4, minimum=1),
+    Setting('MEMBIT_TOP_CLUSTERS', int, 10, minimum=1),
+    Setting('MEMBIT_TOP_POSTS', int, 5, minimum=1),
+    # Deep dive (clusters_info): how many top clusters, and seconds to wait for them
+    Setting('MEMBIT_DEEP_DIVE_K', int, 3, minimum=1),
+    Setting('MEMBIT_DEEP_DIVE_TIMEOUT', int, 20, minimum=1),
+    # 'delta': prompt gets only what changed since the last run plus a short baseline
+    Setting('MEMBIT_PROMPT_MODE', prompt_mode, 'full'),
+    # Batch mode: drafts generated per Gemini call (1 = generate and post every run)
+    Setting('DRAFT_BATCH_SIZE', int, 1, minimum=1),
+    Setting('DRAFT_REQUIRE_APPROVAL', flag, False)
+]
+
+class Settings:
+    """Immutable snapshot of all settings, one attribute per setting (schedule_hours, ...)"""
+
+    def __init__(self, values):
+        object.__setattr__(self, '_values', dict(values))
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Settings are read-only, use SettingsStore.update()')
+
+    def get(self, key):
+        """Value by setting name or environment variable name"""
+        return self._values[key.lower()]
+
+    def to_dict(self):
+        return dict(self._values)
+
+class SettingsStore:
+    """
+    Typed settings kept in memory and persisted to .env
+
+    Readers use `store.current`, a snapshot that is swapped as a whole on
+    every change, so the pipeline never parses environment variables and
+    never sees half an update. update() validates every value first, then
+    rewrites .env under a file lock (other writers' lines are kept) with an
+    atomic rename, and notifies listeners with the names that changed.
+    """
+
+    def __init__(self, env_file='.env', settings=SETTINGS):
+        self.env_path = Path(__file__).parent / env_file
+        self.settings = {setting.name: setting for setting in settings}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.version = 0
+        self.current = Settings({
+            name: self._parse_env(setting)
+            for name, setting in self.settings.items()
+        })
+
+    @staticmethod
+    def _parse_env(setting):
+        """Value from the environment, the default (with a warning) when it is invalid"""
+        try:
+            return setting.parse(os.environ.get(setting.env_key))
+        except ValueError as e:
+            print(f'Warning: invalid setting in environment, using default {setting.default!r}: {e}')
+            return setting.default
+
+    def add_listener(self, callback):
+        """callback(settings, changed_names) after every change"""
+        self._listeners.append(callback)
+
+    def _validate(self, changes):
+        values = {}
+        for name, raw in changes.items():
+            setting = self.settings.get(name.lower())
+            if setting is None:
+                raise ValueError(f"Unknown setting '{name}'")
+            values[setting.name] = setting.parse(raw)
+        return values
+
+    def _swap(self, values):
+        """Install changed values, returns the names that changed"""
+        old = self.current.to_dict()
+        changed = {name for name, value in values.items() if old[name] != value}
+        if changed:
+            old.update(values)
+            self.current = Settings(old)
+            self.version += 1
+            for name in changed:
+                # Keep the environment in sync for code and processes that read it
+                setting = self.settings[name]
+                os.environ[setting.env_key] = setting.serialize(old[name])
+        return changed
+
+    def _notify(self, changed):
+        if not changed:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(self.current, changed)
+            except Exception as e:
+                print(f'Settings listener failed: {e}')
+
+    def update(self, **changes):
+        """
+        Validate, persist and apply settings (by name: schedule_hours=4, ...)
+        Raises ValueError without changing anything when a value is invalid.
+        Returns: set of setting names that changed
+        """
+        values = self._validate(changes)
+        with self._lock:
+            current = self.current.to_dict()
+            values = {name: value for name, value in values.items() if current[name] != value}
+            if values:
+                with file_lock(self.env_path):
+                    self._write_env(values)
+                changed = self._swap(values)
+            else:
+                changed = set()
+        self._notify(changed)
+        return changed
+
+    def apply(self, raw_values):
+        """Apply settings in memory only (worker process receiving the web process's settings)"""
+        values = self._validate(raw_values)
+        with self._lock:
+            changed = self._swap(values)
+        self._notify(changed)
+        return changed
+
+    def env_values(self):
+        """Current settings as {ENV_KEY: string} (sent to the worker process)"""
+        current = self.current
+        return {
+            setting.env_key: setting.serialize(getattr(current, name))
+            for name, setting in self.settings.items()
+        }
+
+    def _write_env(self, values):
+        """Rewrite .env with `values` replaced, every other line kept as it is"""
+        lines = []
+        if self.env_path.exists():
+            with open(self.env_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+
+        pending = {self.settings[name].env_key: self.settings[name].serialize(value) for name, value in values.items()}
+        for idx, line in enumerate(lines):
+            match = ENV_LINE_RE.match(line)
+            if match and match.group(1) in pending:
+                key = match.group(1)
+                lines[idx] = f'{key}={pending.pop(key)}'
+        lines.extend(f'{key}={value}' for key, value in pending.items())
+
+        atomic_write(self.env_path, '\n'.join(lines) + '\n', private=True)
@@ -0,0 +1,74 @@
+import os
+import sys
+import subprocess
+import textwrap
+import importlib.util
+from pathlib import Path
+import pytest
+
+WEB_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: monkey patching has to happen before anything else is imported
+LOGIN_SCRIPT = textwrap.dedent("""
+    import sys
+    import server_mode
+    server_mode.patch()
+    import pyotp
+    from auth_manager import AuthManager
+    from server_mode import run_blocking
+
+    auth = AuthManager(config_file=sys.argv[1])
+    success, _, totp_secret, backup_codes, error = run_blocking(auth.setup_auth, 'admin', 'correct horse')
+    assert success, error
+    assert auth.verify_setup(pyotp.TOTP(totp_secret).now()) == (True, None)
+
+    code = pyotp.TOTP(totp_secret).now()
+    assert run_blocking(auth.verify_login, 'admin', 'correct horse', code) == (True, None)
+    assert run_blocking(auth.verify_login, 'admin', 'wrong password', code)[0] is False
+    assert run_blocking(auth.verify_login, 'admin', 'correct horse', backup_codes[0]) == (True, None)
+    print('ok')
+""")
+
+def _missing(*modules):
+    return [name for name in modules if importlib.util.find_spec(name) is None]
+
+@pytest.mark.parametrize('mode, server_module', [
+    ('threading', None),
+    ('eventlet', 'eventlet'),
+    ('gevent', 'gevent')
+])
+def test_login_under_async_mode(tmp_path, mode, server_module):
+    missing = _missing('bcrypt', 'pyotp', 'qrcode', 'PIL', *([server_module] if server_module else []))
+    if missing:
+        pytest.skip(f"not installed: {', '.join(missing)}")
+
+    env = dict(os.environ, ASYNC_MODE=mode)
+    result = subprocess.run(
+        [sys.executable, '-c', LOGIN_SCRIPT, str(tmp_path / 'auth_config.json')],
+        cwd=WEB_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('ok')
+
+def test_busy_password_check_raises_instead_of_failing(tmp_path):
+    missing = _missing('bcrypt', 'pyotp', 'qrcode', 'PIL')
+    if missing:
+        pytest.skip(f"not installed: {', '.join(missing)}")
+    import pyotp
+    from auth_manager import AuthManager, BcryptLimiter, BusyError
+
+    auth = AuthManager(config_file=tmp_path / 'auth_config.json')
+    success, _, totp_secret, _, error = auth.setup_auth('admin', 'correct horse')
+    assert success, error
+    assert auth.verify_setup(pyotp.TOTP(totp_secret).now()) == (True, None)
+
+    auth.bcrypt = BcryptLimiter(workers=1, max_pending=0)
+    auth.bcrypt.slots.acquire()  # Another check is running
+    code = pyotp.TOTP(totp_secret).now()
+    with pytest.raises(BusyError):
+        auth.verify_login('admin', 'correct horse', code)
+    with pytest.raises(BusyError):
+        auth.change_password('correct horse', 'battery staple', code)
+
+    auth.bcrypt.slots.release()
+    assert auth.verify_login('admin', 'correct horse', code) == (True, None)
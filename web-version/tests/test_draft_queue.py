@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from draft_queue import MAX_POST_ATTEMPTS, DraftQueue, parse_drafts
+
+@pytest.fixture
+def queue(tmp_path):
+    return DraftQueue(db_file=tmp_path / 'drafts.db')
+
+def status(queue, draft_id, statuses=('pending', 'approved', 'posting', 'posted', 'rejected', 'expired', 'failed')):
+    return next(draft['status'] for draft in queue.list(statuses) if draft['id'] == draft_id)
+
+def test_parse_drafts_accepts_fenced_objects_and_strings():
+    text = '```json\n[{"topic": "ETF", "tweet": " \\"Inflows up\\" "}, "Plain tweet", {"topic": "x"}]\n```'
+    assert parse_drafts(text) == [('Inflows up', 'ETF'), ('Plain tweet', None)]
+    with pytest.raises(Exception, match='JSON list'):
+        parse_drafts('Here is a tweet')
+    with pytest.raises(Exception, match='empty list'):
+        parse_drafts('[]')
+
+def test_claims_oldest_approved_draft_once(queue):
+    first, second = queue.add([('one', 'a'), ('two', 'b')])
+    draft = queue.claim()
+    assert (draft['id'], draft['attempts']) == (first, 1)
+    assert status(queue, first) == 'posting'
+    assert queue.claim()['id'] == second
+    assert queue.claim() is None
+
+    queue.mark_posted(first, '123')
+    posted = queue.list(['posted'])
+    assert [(d['id'], d['tweet_id']) for d in posted] == [(first, '123')]
+
+def test_release_retries_until_max_attempts(queue):
+    draft_id, = queue.add([('one', None)])
+    for attempt in range(1, MAX_POST_ATTEMPTS + 1):
+        draft = queue.claim()
+        assert draft['attempts'] == attempt
+        expected = 'failed' if attempt == MAX_POST_ATTEMPTS else 'approved'
+        assert queue.release(draft, 'rate limited') == expected
+    assert queue.claim() is None
+    assert status(queue, draft_id) == 'failed'
+
+def test_approval_flow(queue):
+    draft_id, other_id = queue.add([('one', None), ('two', None)], require_approval=True)
+    assert queue.claim() is None
+    assert queue.counts() == {'pending': 2, 'approved': 0, 'posting': 0}
+
+    queue.approve(draft_id, text=' edited ')
+    assert queue.claim()['text'] == 'edited'
+    with pytest.raises(ValueError):
+        queue.approve(draft_id)
+    with pytest.raises(ValueError):
+        queue.reject(draft_id)
+
+    queue.reject(other_id)
+    assert status(queue, other_id) == 'rejected'
+
+def test_stale_drafts_expire(queue):
+    draft_id, = queue.add([('one', None)])
+    assert queue.expire(now=time.time() + 25 * 3600) == 1
+    assert status(queue, draft_id) == 'expired'
+    assert queue.claim() is None
+
+def test_only_release_claimed_returns_claimed_drafts(tmp_path):
+    queue = DraftQueue(db_file=tmp_path / 'drafts.db')
+    draft_id, = queue.add([('one', None)])
+    queue.claim()
+    # Opening the queue elsewhere (the web process) leaves the claim alone
+    reader = DraftQueue(db_file=tmp_path / 'drafts.db')
+    assert reader.counts()['posting'] == 1
+
+    assert reader.release_claimed() == 1
+    assert reader.claim()['id'] == draft_id
@@ -0,0 +1,99 @@
+from emitter import SocketEmitter
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.callbacks = []
+
+    def emit(self, event, data, to=None, callback=None):
+        self.emitted.append((event, data))
+        self.callbacks.append((to, callback))
+
+    def ack(self, sid):
+        """Client `sid` acknowledges every frame sent to it so far"""
+        pending = [callback for to, callback in self.callbacks if to == sid]
+        self.callbacks = [(to, callback) for to, callback in self.callbacks if to != sid]
+        for callback in pending:
+            callback()
+
+    def start_background_task(self, target):
+        pass
+
+    def sleep(self, seconds):
+        pass
+
+def test_flush_batches_logs_and_sends_status_delta():
+    socketio = FakeSocketIO()
+    emitter = SocketEmitter(socketio)
+    emitter.connect('a')
+    status = {'running': False, 'error_count': 0}
+    emitter.log({'message': 'one'})
+    emitter.log({'message': 'two'})
+    emitter.status(status)
+    emitter.flush()
+    assert socketio.emitted[0] == ('log_batch', {'logs': [{'message': 'one'}, {'message': 'two'}], 'dropped': 0})
+    assert socketio.emitted[1] == ('status_delta', {'version': 1, 'changes': status, 'removed': []})
+
+    status['running'] = True
+    emitter.status(status)
+    emitter.flush()
+    assert socketio.emitted[-1] == ('status_delta', {'version': 2, 'changes': {'running': True}, 'removed': []})
+
+def test_overflowing_log_buffer_reports_dropped_entries():
+    socketio = FakeSocketIO()
+    emitter = SocketEmitter(socketio, max_pending=2)
+    emitter.connect('a')
+    for idx in range(5):
+        emitter.log({'message': idx})
+    emitter.flush()
+    assert socketio.emitted == [('log_batch', {'logs': [{'message': 3}, {'message': 4}], 'dropped': 3})]
+
+def test_version_changes_only_with_status_content():
+    emitter = SocketEmitter(FakeSocketIO())
+    status = {'error_count': 0, 'last_error': None}
+    emitter.status(status)
+    emitter.flush()
+    assert emitter.snapshot(status)['version'] == 1
+
+    emitter.status(status)
+    emitter.flush()
+    assert emitter.version == 1
+
+    status['error_count'] += 1
+    emitter.status(status)
+    emitter.flush()
+    assert emitter.version == 2
+
+def test_slow_client_gets_a_catch_up_instead_of_every_frame():
+    socketio = FakeSocketIO()
+    emitter = SocketEmitter(socketio, max_unacked=2)
+    emitter.connect('fast')
+    emitter.connect('slow')
+    status = {'error_count': 0}
+    for idx in range(4):
+        status['error_count'] = idx
+        emitter.log({'message': idx})
+        emitter.status(status)
+        emitter.flush()
+        socketio.ack('fast')
+
+    sent_to = [to for to, _ in socketio.callbacks]
+    assert sent_to == ['slow', 'slow']
+    assert emitter.lagging() == 1
+    assert len(socketio.emitted) == 2 * 4 + 2
+
+    # Once it reads again it gets the latest status and the number of lines it missed
+    socketio.emitted.clear()
+    socketio.ack('slow')
+    emitter.flush()
+    assert socketio.emitted == [
+        ('log_batch', {'logs': [], 'dropped': 3}),
+        ('status_update', {'error_count': 3, 'version': 4}),
+    ]
+    socketio.ack('slow')
+    assert emitter.lagging() == 0
+
+    emitter.disconnect('slow')
+    emitter.log({'message': 'after'})
+    emitter.flush()
+    assert [to for to, _ in socketio.callbacks] == ['fast']
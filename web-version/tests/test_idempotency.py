@@ -0,0 +1,126 @@
+import pytest
+
+pytest.importorskip('tweepy')
+
+import idempotency
+from idempotency import PostAttemptStore, draft_key, timeline_text, RECORD_TTL
+from twitter_client import UncertainPostError, DuplicateTweetError, TimelineUnavailableError
+
+class FakeTwitter:
+    """Scripted post outcomes and a timeline the store reconciles against"""
+
+    def __init__(self, outcomes=(), timeline=None):
+        self.outcomes = list(outcomes)
+        self.timeline = [] if timeline is None else timeline
+        self.posts = []
+        self.timeline_reads = 0
+
+    def post_tweet(self, text, media_ids=None):
+        self.posts.append(text)
+        outcome = self.outcomes.pop(0) if self.outcomes else 'ok'
+        if outcome == 'ok':
+            tweet = {'id': str(100 + len(self.posts)), 'text': text}
+            self.timeline.insert(0, tweet)
+            return tweet
+        if outcome == 'timeout-posted':
+            self.timeline.insert(0, {'id': '999', 'text': text + ' https://t.co/abc123'})
+        raise outcome_error(outcome)
+
+    def get_recent_tweets(self, max_results=10):
+        self.timeline_reads += 1
+        if isinstance(self.timeline, Exception):
+            raise self.timeline
+        return self.timeline[:max_results]
+
+def outcome_error(outcome):
+    if outcome == 'duplicate':
+        return DuplicateTweetError('Duplicate tweet')
+    if outcome == 'error':
+        return Exception('Failed to post tweet: 400')
+    return UncertainPostError('Post outcome unknown: timeout')
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(idempotency, 'RECONCILE_DELAY', 0)
+    return PostAttemptStore(store_file=tmp_path / 'post_attempts.json')
+
+def test_timeline_text_ignores_media_link_and_formatting():
+    assert timeline_text('Big  news &amp; more https://t.co/xyz') == timeline_text('big news & more')
+    assert timeline_text('read https://example.com now') != timeline_text('read now')
+    assert draft_key('Hello  World') == draft_key('hello world')
+
+def test_post_once_posts_and_then_deduplicates(store):
+    twitter = FakeTwitter()
+    first = store.post_once(twitter, 'Trending now')
+    again = store.post_once(twitter, 'Trending now')
+    assert first['deduplicated'] is False
+    assert again == {'id': first['id'], 'text': 'Trending now', 'deduplicated': True, 'reconciled': False}
+    assert twitter.posts == ['Trending now']
+
+def test_timed_out_media_post_found_on_timeline(store):
+    twitter = FakeTwitter(outcomes=['timeout-posted'])
+    result = store.post_once(twitter, 'Chart of the day', media_ids=['1'])
+    assert result == {'id': '999', 'text': 'Chart of the day', 'deduplicated': False, 'reconciled': True}
+    assert twitter.posts == ['Chart of the day']
+    assert store.get(draft_key('Chart of the day'))['state'] == 'posted'
+
+def test_duplicate_rejection_not_on_timeline_posts_once_more(store):
+    twitter = FakeTwitter(outcomes=['duplicate', 'ok'])
+    result = store.post_once(twitter, 'Second try')
+    assert result['reconciled'] is False
+    assert twitter.posts == ['Second try', 'Second try']
+
+def test_failed_post_can_be_retried(store):
+    twitter = FakeTwitter(outcomes=['error'])
+    with pytest.raises(Exception):
+        store.post_once(twitter, 'Flaky')
+    assert store.get(draft_key('Flaky'))['state'] == 'failed'
+    assert store.post_once(twitter, 'Flaky')['deduplicated'] is False
+    assert twitter.posts == ['Flaky', 'Flaky']
+
+def test_unreadable_timeline_leaves_attempt_uncertain(store):
+    twitter = FakeTwitter(outcomes=['timeout'], timeline=TimelineUnavailableError('403 Forbidden'))
+    with pytest.raises(UncertainPostError):
+        store.post_once(twitter, 'Maybe live')
+    assert store.get(draft_key('Maybe live'))['state'] == 'uncertain'
+
+    # Never posted again while the outcome is unknown
+    with pytest.raises(UncertainPostError):
+        store.post_once(twitter, 'Maybe live')
+    assert twitter.posts == ['Maybe live']
+
+def test_reconcile_pending_recovers_posts_from_a_crash(store):
+    store._mark(draft_key('Crashed'), 'pending', text='Crashed')
+    store._mark(draft_key('Lost'), 'pending', text='Lost')
+    twitter = FakeTwitter(timeline=[{'id': '42', 'text': 'Crashed'}])
+    assert store.reconcile_pending(twitter) == [{'id': '42', 'text': 'Crashed'}]
+    assert store.get(draft_key('Lost'))['state'] == 'failed'
+    assert store.pending() == []
+
+def test_uncertain_record_expires_despite_failed_reconciles(store, monkeypatch):
+    key = draft_key('Stuck')
+    now = 1_000_000.0
+    monkeypatch.setattr(idempotency.time, 'time', lambda: now)
+    store._mark(key, 'uncertain', text='Stuck')
+
+    twitter = FakeTwitter(timeline=Exception('Failed to read timeline: 503'))
+    now += RECORD_TTL / 2
+    assert store.reconcile_pending(twitter) == []
+    assert store.get(key)['updated_at'] == 1_000_000.0
+
+    now += RECORD_TTL
+    store._mark(draft_key('Other'), 'posted', text='Other', tweet_id='7')
+    assert store.get(key) is None
+
+def test_hung_post_times_out_as_uncertain(monkeypatch):
+    import requests
+    import twitter_client
+
+    def request(method, url, timeout=None, **kwargs):
+        assert timeout == twitter_client.REQUEST_TIMEOUT
+        raise requests.exceptions.ReadTimeout('read timed out')
+
+    monkeypatch.setattr(requests.Session, 'request', lambda self, *args, **kwargs: request(*args, **kwargs))
+    twitter = twitter_client.TwitterClient('key', 'secret', 'token', 'token-secret')
+    with pytest.raises(UncertainPostError):
+        twitter.post_tweet('hello')
@@ -0,0 +1,64 @@
+import pytest
+
+import log_store
+from log_store import LogStore, format_entry
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(log_store.time, 'time', lambda: now[0])
+    return now
+
+def messages(entries):
+    return [entry[3] for entry in entries]
+
+def fill(store, clock, count):
+    for idx in range(count):
+        clock[0] += 1
+        store.append(f'm{idx}', 'error' if idx % 3 == 0 else 'info')
+
+def test_ring_buffer_keeps_newest_entries(tmp_path, clock):
+    store = LogStore(capacity=3, log_dir=tmp_path / 'logs')
+    fill(store, clock, 5)
+    assert len(store) == 3 and store.last_seq == 5
+    assert messages(store.recent()) == ['m2', 'm3', 'm4']
+    assert messages(store.recent(2)) == ['m3', 'm4']
+    assert format_entry(store.recent(1)[0])['id'] == 5
+
+def test_query_pages_filters_and_time_range(tmp_path, clock):
+    store = LogStore(capacity=3, log_dir=tmp_path / 'logs', max_file_bytes=300)
+    fill(store, clock, 20)
+
+    page, cursor = store.query(limit=8)
+    assert messages(page) == [f'm{idx}' for idx in range(12, 20)]
+    page, cursor = store.query(cursor=cursor, limit=8)
+    assert messages(page) == [f'm{idx}' for idx in range(4, 12)]
+    page, cursor = store.query(cursor=cursor, limit=8)
+    assert messages(page) == ['m0', 'm1', 'm2', 'm3'] and cursor is None
+
+    errors, _ = store.query(limit=100, level={'error'})
+    assert messages(errors) == [f'm{idx}' for idx in range(0, 20, 3)]
+    start = 1_800_000_000.0
+    window, _ = store.query(limit=100, since=start + 5, until=start + 7)
+    assert messages(window) == ['m4', 'm5', 'm6']
+
+def test_rotation_drops_oldest_files(tmp_path, clock):
+    store = LogStore(capacity=3, log_dir=tmp_path / 'logs', max_file_bytes=300, max_files=2)
+    fill(store, clock, 40)
+    assert len(list((tmp_path / 'logs').glob('*.log'))) == 2
+    entries, _ = store.query(limit=1000, level={'info', 'error'})
+    assert messages(entries)[-1] == 'm39'
+    assert len(entries) < 40
+
+def test_restart_restores_index_and_continues(tmp_path, clock):
+    store = LogStore(capacity=3, log_dir=tmp_path / 'logs')
+    fill(store, clock, 5)
+    with open(sorted((tmp_path / 'logs').glob('*.log'))[-1], 'ab') as f:
+        f.write(b'{"seq": 6, "ts"')  # Torn write
+
+    reloaded = LogStore(capacity=3, log_dir=tmp_path / 'logs')
+    assert messages(reloaded.recent()) == ['m2', 'm3', 'm4']
+    reloaded.append('after restart')
+    entries, _ = reloaded.query(limit=10, level={'info', 'error'})
+    assert messages(entries)[-2:] == ['m4', 'after restart']
+    assert entries[-1][0] == 6
@@ -0,0 +1,52 @@
+
+import login_limiter
+from login_limiter import LoginLimiter, SlidingWindowLimiter
+
+def test_sliding_window_weights_previous_window():
+    limiter = SlidingWindowLimiter(limit=2, window=100)
+    limiter.hit('ip', 10)
+    limiter.hit('ip', 20)
+    assert limiter.retry_after('ip', 30) == 70
+    # Both hits still count fully at the start of the next window
+    assert limiter.retry_after('ip', 100) == 50
+    assert limiter.retry_after('ip', 150) == 0
+    assert limiter.retry_after('ip', 250) == 0
+
+def test_progressive_lockout_after_free_failures():
+    limiter = SlidingWindowLimiter(limit=100, window=100, free_failures=3, base_delay=1, max_delay=4)
+    for _ in range(3):
+        limiter.failure('user', 0)
+    assert limiter.retry_after('user', 0) == 0
+    delays = []
+    for _ in range(4):
+        limiter.failure('user', 0)
+        delays.append(limiter.retry_after('user', 0))
+    assert delays == [1, 2, 4, 4]
+    assert limiter.locked(0) == 1
+
+    limiter.success('user', 0)
+    assert limiter.retry_after('user', 0) == 0
+
+def test_least_recently_seen_keys_are_dropped():
+    limiter = SlidingWindowLimiter(limit=1, window=100, max_keys=2)
+    limiter.hit('a', 0)
+    limiter.hit('b', 0)
+    limiter.retry_after('a', 1)
+    limiter.hit('c', 1)
+    assert len(limiter) == 2
+    assert limiter.retry_after('a', 2) > 0
+    assert limiter.retry_after('b', 2) == 0
+
+def test_login_limiter_checks_ip_and_username(monkeypatch):
+    monkeypatch.setattr(login_limiter.time, 'time', lambda: 1000.0)
+    limiter = LoginLimiter(ip_limit=3, username_limit=2, window=300)
+    assert limiter.check('1.1.1.1', 'Admin') == (True, 0)
+    assert limiter.check('2.2.2.2', 'admin') == (True, 0)
+    # Username limit applies across IPs, case-insensitively
+    allowed, retry_after = limiter.check('3.3.3.3', 'ADMIN')
+    assert not allowed and retry_after > 0
+    assert limiter.check('3.3.3.3', 'other') == (True, 0)
+
+    stats = limiter.stats()
+    assert (stats['allowed'], stats['rejected']) == (3, 1)
+    assert (stats['tracked_ips'], stats['tracked_usernames']) == (3, 2)
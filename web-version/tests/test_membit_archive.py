@@ -0,0 +1,107 @@
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('requests')
+
+import membit_archive
+from membit_archive import MembitArchive, INDEX_RECORD, build_trending_data, group_runs
+
+def day(text):
+    return datetime.fromisoformat(text).timestamp()
+
+def clusters(*entries):
+    """clusters_search JSON-RPC response with (label, engagement) clusters"""
+    items = [{'label': label, 'engagement_score': score} for label, score in entries]
+    return {'result': {'content': [{'type': 'text', 'text': json.dumps({'clusters': items})}]}}
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [day('2026-10-18T08:00')]
+    monkeypatch.setattr(membit_archive.time, 'time', lambda: now[0])
+    return now
+
+@pytest.fixture
+def archive(tmp_path):
+    return MembitArchive(archive_dir=tmp_path / 'archive')
+
+def test_entries_binary_search_by_time(archive, clock):
+    times = []
+    for idx in range(50):
+        clock[0] += 60
+        times.append(clock[0])
+        archive.record('clusters_search' if idx % 2 else 'posts_search', {'q': f'q{idx}', 'limit': 10}, {'result': None})
+
+    assert len(archive.entries()) == 50
+    window = archive.entries(start=times[10], end=times[20])
+    assert [entry[0] for entry in window] == times[10:20]
+    assert archive.entries(start=times[-1] + 1) == []
+    assert archive.entries(end=times[0]) == []
+
+    only_clusters = archive.entries(times[10], times[20], tool='clusters_search')
+    assert [entry[0] for entry in only_clusters] == times[11:20:2]
+    match = archive.entries(arguments={'q': 'q7', 'limit': 10})
+    assert [entry[0] for entry in match] == [times[7]]
+    assert archive.read(match[0])['arguments'] == {'q': 'q7', 'limit': 10}
+
+def test_timestamps_never_go_backwards(archive, clock):
+    archive.record('clusters_search', {'q': 'a'}, {})
+    clock[0] -= 30
+    archive.record('clusters_search', {'q': 'b'}, {})
+    first, second = archive.entries()
+    assert second[0] >= first[0]
+
+def test_retention_drops_old_segments_and_rewrites_index(tmp_path, clock):
+    archive = MembitArchive(archive_dir=tmp_path / 'archive', max_age_days=2)
+    for date in ('2026-10-14', '2026-10-15', '2026-10-16', '2026-10-17', '2026-10-18'):
+        clock[0] = day(f'{date}T12:00')
+        archive.record('clusters_search', {'q': date}, {'result': None})
+
+    assert archive.stats()['segments'] == 3
+    remaining = archive.entries()
+    assert [archive.read(entry)['arguments']['q'] for entry in remaining] == ['2026-10-16', '2026-10-17', '2026-10-18']
+    assert archive.index_path.stat().st_size == 3 * INDEX_RECORD.size
+
+def test_retention_by_size_keeps_newest_segment(tmp_path, clock):
+    archive = MembitArchive(archive_dir=tmp_path / 'archive', max_mb=0)
+    for date in ('2026-10-16', '2026-10-17', '2026-10-18'):
+        clock[0] = day(f'{date}T12:00')
+        archive.record('clusters_search', {'q': date}, {'result': None})
+    assert archive.prune() == [20261017]
+    assert [archive.read(entry)['arguments']['q'] for entry in archive.entries()] == ['2026-10-18']
+
+def test_replay_uses_archived_query_weights(archive, clock):
+    archive.record('query_weights', {'queries': [['Web3', 1.0], ['DeFi', 3.0]]}, None)
+    archive.record('clusters_search', {'q': 'Web3', 'limit': 10}, clusters(('Bitcoin ETF', 100)))
+    archive.record('clusters_search', {'q': 'DeFi', 'limit': 10}, clusters(('Aave v4', 100)))
+    clock[0] += 3600
+    archive.record('clusters_search', {'q': 'Web3', 'limit': 10}, clusters(('Bitcoin ETF', 100)))
+    archive.record('clusters_search', {'q': 'DeFi', 'limit': 10}, clusters(('Aave v4', 100)))
+
+    weighted, unweighted = list(group_runs(archive.replay()))
+    assert 'Aave v4' in build_trending_data(weighted, top_clusters=1)
+    # Runs without recorded weights fall back to the configured ones
+    assert 'Bitcoin ETF' in build_trending_data(unweighted, top_clusters=1, weights={'web3': 2.0})
+    assert 'Aave v4' in build_trending_data(unweighted, top_clusters=1, weights={'defi': 2.0})
+
+def test_client_records_status_of_failed_calls():
+    import requests
+    from membit_client import MembitClient
+
+    class Session:
+        def post(self, *args, **kwargs):
+            response = requests.Response()
+            response.status_code = self.status
+            return response
+
+    client = MembitClient('key')
+    client.session = Session()
+    client.session.status = 503
+    with pytest.raises(Exception):
+        client.get_trending_topics('Web3')
+    assert client.last_status == 503
+    client.session.post = lambda *args, **kwargs: (_ for _ in ()).throw(requests.ConnectionError('down'))
+    with pytest.raises(Exception):
+        client.search_posts('Web3')
+    assert client.last_status is None
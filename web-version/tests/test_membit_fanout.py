@@ -0,0 +1,67 @@
+import json
+import threading
+
+import pytest
+
+from membit_fanout import digest, fan_out, merge_ranked, normalize_queries, parse_queries, split_entries
+
+NOW = 1_800_000_000
+
+def clusters(*entries):
+    return json.dumps({'clusters': [{'label': label, 'engagement_score': score} for label, score in entries]})
+
+def test_parse_queries_weights_and_duplicates():
+    assert parse_queries('Web3, DeFi:0.8, web3:2, AI x crypto:0.7') == (('Web3', 1.0), ('DeFi', 0.8), ('AI x crypto', 0.7))
+    assert parse_queries('AI: agents') == (('AI: agents', 1.0),)
+    assert normalize_queries(' Web3 ,DeFi:0.50 ') == 'Web3, DeFi:0.5'
+    for bad in ('', ' , ', ':2', 'Web3:0', 'Web3:11'):
+        with pytest.raises(ValueError):
+            parse_queries(bad)
+
+def test_split_entries_formats():
+    assert len(split_entries(clusters(('A', 1), ('B', 2)), 'cluster')) == 2
+    assert split_entries('1. first\n2. second', 'post') == ['first', 'second']
+    assert split_entries('just text', 'post') == ['just text']
+    assert split_entries('  ', 'post') == []
+
+def test_merge_ranked_adds_weights_of_shared_entries():
+    results = [
+        ('Web3', 1.0, clusters(('Bitcoin ETF', 100), ('Solana', 120)), None),
+        ('DeFi', 0.8, clusters(('bitcoin  etf', 100), ('Aave', 50)), None),
+        ('AI', 1.0, None, TimeoutError('slow')),
+        ('NFT', 1.0, 'No trending data available', None),
+    ]
+    ranked = merge_ranked(results, 'cluster', top_n=2, now=NOW)
+    assert [item['label'] for item in ranked] == ['Bitcoin ETF', 'Solana']
+    assert ranked[0]['queries'] == ['Web3', 'DeFi']
+    assert ranked[0]['weight'] == pytest.approx(1.8)
+    assert merge_ranked(results, 'cluster', top_n=10, now=NOW)[-1]['label'] == 'Aave'
+
+def test_merge_ranked_prefers_recent_entries():
+    old = f'1. post_id="aaaa1111" likes=100 created_at={NOW - 48 * 3600}\n2. post_id="bbbb2222" likes=100 created_at={NOW}'
+    ranked = merge_ranked([('Web3', 1.0, old, None)], 'post', top_n=2, now=NOW)
+    assert [item['key'] for item in ranked] == ['post:bbbb2222', 'post:aaaa1111']
+
+def test_fan_out_keeps_query_order_errors_and_timeouts():
+    release = threading.Event()
+
+    def fetch(query):
+        if query == 'slow':
+            release.wait(5)
+        if query == 'bad':
+            raise RuntimeError('boom')
+        return query.upper()
+
+    try:
+        results = fan_out(fetch, [('slow', 1.0), ('ok', 0.5), ('bad', 1.0)], max_workers=3, timeout=0.2)
+    finally:
+        release.set()
+    assert [(query, weight, text) for query, weight, text, _ in results] == [('slow', 1.0, None), ('ok', 0.5, 'OK'), ('bad', 1.0, None)]
+    assert isinstance(results[0][3], TimeoutError)
+    assert str(results[2][3]) == 'boom'
+    assert fan_out(fetch, []) == []
+
+def test_digest_keeps_most_engaged_entries_in_order():
+    text = '1. low likes=1\n2. high likes=500\n3. mid likes=50'
+    assert digest('ETF', text, max_entries=2) == '[ETF]\n- high likes=500\n- mid likes=50'
+    assert digest('ETF', 'No posts found') is None
@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from near_duplicate import NUM_PERM, TweetHistory, minhash_signature
+
+TWEET = 'Bitcoin ETF inflows hit a new weekly record as institutions keep buying the dip #Bitcoin'
+
+def test_signature_ignores_case_urls_and_punctuation():
+    signature = minhash_signature(TWEET)
+    assert signature.shape == (NUM_PERM,) and signature.dtype == np.uint32
+    assert (minhash_signature(TWEET.upper() + '!! https://t.co/abc') == signature).all()
+    assert minhash_signature('hi').shape == (NUM_PERM,)
+
+def test_finds_near_duplicates_only(tmp_path):
+    history = TweetHistory(history_file=tmp_path / 'history.jsonl')
+    history.add(TWEET, tweet_id='1')
+
+    match = history.find_similar(TWEET.replace('weekly', 'monthly'))
+    assert match['id'] == '1' and match['similarity'] >= 0.6
+    assert history.find_similar('Aave v4 launches with a new liquidity hub for lenders on Ethereum #DeFi') is None
+    assert history.find_similar(TWEET, threshold=1.01) is None
+
+def test_history_survives_restart_and_compacts(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    history = TweetHistory(history_file=path, max_entries=5)
+    for idx in range(7):
+        history.add(f'{idx} unrelated tweet number {idx} about topic {idx * 7919}', tweet_id=str(idx))
+    # Compaction runs once the file holds 20% more than max_entries
+    assert len(history.entries) == 5
+    assert len(path.read_text().splitlines()) == 5
+
+    reloaded = TweetHistory(history_file=path, max_entries=5)
+    assert [entry['id'] for entry in reloaded.entries] == ['2', '3', '4', '5', '6']
+    assert reloaded.find_similar('6 unrelated tweet number 6 about topic 47514')['id'] == '6'
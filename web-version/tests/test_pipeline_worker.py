@@ -0,0 +1,75 @@
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+WEB_DIR = Path(__file__).resolve().parent.parent
+
+# Stands in for app.py: a main script with import-time side effects
+MAIN_SCRIPT = """
+import sys
+import time
+import multiprocessing
+sys.path.insert(0, {web_dir!r})
+with open({marker!r}, 'a') as f:
+    f.write(__name__ + '\\n')
+
+if __name__ == '__main__':
+    from pipeline_worker import _spawn_main
+    process = multiprocessing.get_context('spawn').Process(target=time.sleep, args=(0,))
+    with _spawn_main():
+        process.start()
+    process.join(30)
+    assert process.exitcode == 0, process.exitcode
+    assert sys.modules['__main__'].__name__ == '__main__'
+"""
+
+def test_spawned_worker_does_not_rerun_main_script(tmp_path):
+    marker = tmp_path / 'imports.txt'
+    script = tmp_path / 'main_script.py'
+    script.write_text(MAIN_SCRIPT.format(web_dir=str(WEB_DIR), marker=str(marker)))
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert marker.read_text().split() == ['__main__']
+
+class FakeProcess:
+    def is_alive(self):
+        return True
+
+def fake_worker(commands, events):
+    """Answers 'draft' requests like _worker_main does"""
+    while True:
+        command, payload = commands.get()
+        if command == 'shutdown':
+            return
+        if payload['draft_id'] == 404:
+            error = ValueError('Draft 404 is not waiting for approval')
+            events.put(('reply', payload['request_id'], None, error))
+        elif payload['draft_id'] != 0:
+            events.put(('reply', payload['request_id'], {'pending': 0, 'approved': 1}, None))
+
+def test_request_waits_for_the_workers_reply():
+    from pipeline_worker import PipelineWorker
+
+    forwarded = []
+    worker = PipelineWorker(forwarded.append)
+    worker.commands, worker.events = queue.Queue(), queue.Queue()
+    worker.process = FakeProcess()
+    threading.Thread(target=fake_worker, args=(worker.commands, worker.events), daemon=True).start()
+    threading.Thread(target=worker._relay, daemon=True).start()
+    try:
+        worker.events.put(('log', 'hello', 'info'))
+        assert worker.request('draft', action='approve', draft_id=1, options={}) == {'pending': 0, 'approved': 1}
+        with pytest.raises(ValueError, match='not waiting'):
+            worker.request('draft', action='approve', draft_id=404, options={})
+        # A worker that never answers does not hang the request
+        with pytest.raises(Exception, match='did not answer'):
+            worker.request('draft', timeout=0.2, action='approve', draft_id=0, options={})
+    finally:
+        worker._stopping = True
+        worker.send('shutdown')
+    assert forwarded == [('log', 'hello', 'info')]
+    assert worker._replies == {}
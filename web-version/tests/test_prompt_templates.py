@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from prompt_templates import DEFAULT_TEMPLATE, PromptTemplateStore, TemplateError
+
+@pytest.fixture
+def store(tmp_path):
+    return PromptTemplateStore(store_file=tmp_path / 'templates.json', legacy_file=tmp_path / 'prompt_template.txt')
+
+def test_save_rejects_invalid_templates(store):
+    with pytest.raises(TemplateError, match='Unknown variable'):
+        store.save('custom', 'Data: {trending_data} {nope}')
+    assert store.active_source() == DEFAULT_TEMPLATE
+
+def test_invalid_active_template_falls_back_with_warning(store):
+    store.save('custom', 'Data: {trending_data}')
+    assert store.active_source() == 'Data: {trending_data}'
+
+    # A template saved by an older version that no longer compiles
+    store.state['templates']['custom'][-1]['source'] = 'Data: {trending_data} {removed}'
+    logs = []
+    assert store.active_source(lambda message, level: logs.append((level, message))) == DEFAULT_TEMPLATE
+    assert [level for level, _ in logs] == ['warning'] and "'custom' is invalid" in logs[0][1]
+    assert json.loads(store.store_path.read_text())['active'] == 'custom'
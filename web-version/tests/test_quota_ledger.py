@@ -0,0 +1,74 @@
+import pytest
+
+import quota_ledger
+from quota_ledger import DAY_SECONDS, QuotaLedger
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(quota_ledger.time, 'time', lambda: now[0])
+    return now
+
+def ledger(tmp_path, **limits):
+    return QuotaLedger(ledger_file=tmp_path / 'ledger.json', **limits)
+
+def test_token_bucket_refills_at_daily_rate(tmp_path, clock):
+    quota = ledger(tmp_path, daily_post_limit=24, burst=2)
+    quota.record_post()
+    quota.record_post()
+    allowed, retry_after, reason = quota.check()
+    assert not allowed and retry_after == 3600 and 'token bucket' in reason
+
+    clock[0] += 3600
+    assert quota.check() == (True, 0, None)
+
+def test_daily_window_waits_for_the_oldest_post(tmp_path, clock):
+    quota = ledger(tmp_path, daily_post_limit=2, burst=10)
+    start = clock[0]
+    quota.record_post()
+    clock[0] += 600
+    quota.record_post()
+    clock[0] = start + DAY_SECONDS / 2 + 100
+    allowed, retry_after, reason = quota.check()
+    assert not allowed and 'Daily post limit' in reason
+    assert retry_after == int(start + DAY_SECONDS - clock[0])
+
+    clock[0] = start + DAY_SECONDS + 1
+    assert quota.check()[0]
+    assert quota.headroom()['posts_left_24h'] == 1
+
+def test_monthly_window(tmp_path, clock):
+    quota = ledger(tmp_path, daily_post_limit=100, monthly_post_limit=3, burst=100)
+    for _ in range(3):
+        quota.record_post()
+        clock[0] += DAY_SECONDS
+    assert 'Monthly post limit' in quota.check()[2]
+    assert quota.headroom()['posts_left_30d'] == 0
+
+def test_media_limit_only_applies_to_media_runs(tmp_path, clock):
+    quota = ledger(tmp_path, daily_media_limit=1)
+    quota.record_media()
+    assert quota.check()[0]
+    assert 'media upload limit' in quota.check(with_media=True)[2]
+
+def test_rate_limit_block_persists(tmp_path, clock):
+    quota = ledger(tmp_path)
+    quota.block_until(clock[0] + 900)
+    reloaded = ledger(tmp_path)
+    allowed, retry_after, reason = reloaded.check()
+    assert not allowed and retry_after == 900 and '429' in reason
+    assert reloaded.headroom()['blocked_until'] == clock[0] + 900
+
+    clock[0] += 901
+    assert reloaded.check()[0]
+    assert reloaded.headroom()['blocked_until'] is None
+
+def test_media_rate_limit_block_keeps_text_posts(tmp_path, clock):
+    quota = ledger(tmp_path)
+    quota.block_media_until(clock[0] + 600)
+    reloaded = ledger(tmp_path)
+    assert reloaded.check() == (True, 0, None)
+    allowed, retry_after, reason = reloaded.check(with_media=True)
+    assert not allowed and retry_after == 600 and 'media upload rate limit' in reason
+    assert reloaded.headroom()['media_blocked_until'] == clock[0] + 600
+    assert reloaded.headroom()['blocked_until'] is None
@@ -0,0 +1,68 @@
+import pytest
+
+from settings_store import Setting, SettingsStore, flag
+
+SETTINGS = [
+    Setting('SCHEDULE_HOURS', int, 6, minimum=1),
+    Setting('DRAFT_REQUIRE_APPROVAL', flag, False),
+    Setting('MEMBIT_API_KEY'),
+]
+
+@pytest.fixture
+def env(monkeypatch):
+    for setting in SETTINGS:
+        monkeypatch.delenv(setting.env_key, raising=False)
+    return monkeypatch
+
+def test_flag_coercion():
+    assert flag(' Yes ') is True and flag('on') is True and flag(True) is True
+    assert flag('0') is False and flag('off') is False
+    with pytest.raises(ValueError):
+        flag('maybe')
+
+def test_parse_casts_and_checks_minimum():
+    setting = Setting('SCHEDULE_HOURS', int, 6, minimum=1)
+    assert setting.parse(' 4 ') == 4
+    assert setting.parse('') == 6
+    assert setting.parse(None) == 6
+    with pytest.raises(ValueError, match='whole number'):
+        setting.parse('four')
+    with pytest.raises(ValueError, match='at least 1'):
+        setting.parse('0')
+
+def test_invalid_environment_value_falls_back_to_default(env, tmp_path, capsys):
+    env.setenv('SCHEDULE_HOURS', 'six')
+    env.setenv('DRAFT_REQUIRE_APPROVAL', 'yes')
+    store = SettingsStore(env_file=tmp_path / '.env', settings=SETTINGS)
+    assert store.current.schedule_hours == 6
+    assert store.current.draft_require_approval is True
+    assert 'SCHEDULE_HOURS' in capsys.readouterr().out
+
+def test_update_persists_and_notifies(env, tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_text('# comment\nMEMBIT_API_KEY=abc\nOTHER=kept\n')
+    store = SettingsStore(env_file=env_path, settings=SETTINGS)
+    seen = []
+    store.add_listener(lambda settings, changed: seen.append((settings.schedule_hours, changed)))
+
+    assert store.update(schedule_hours='4', membit_api_key='') == {'schedule_hours'}
+    assert seen == [(4, {'schedule_hours'})]
+    assert store.version == 1
+    assert env_path.read_text() == '# comment\nMEMBIT_API_KEY=abc\nOTHER=kept\nSCHEDULE_HOURS=4\n'
+    assert store.update(schedule_hours=4) == set()
+
+def test_update_rejects_invalid_values_without_changes(env, tmp_path):
+    env_path = tmp_path / '.env'
+    store = SettingsStore(env_file=env_path, settings=SETTINGS)
+    with pytest.raises(ValueError):
+        store.update(schedule_hours='2', draft_require_approval='maybe')
+    with pytest.raises(ValueError, match='Unknown setting'):
+        store.update(nope='1')
+    assert store.current.schedule_hours == 6
+    assert not env_path.exists()
+
+def test_settings_are_read_only(env, tmp_path):
+    store = SettingsStore(env_file=tmp_path / '.env', settings=SETTINGS)
+    with pytest.raises(AttributeError):
+        store.current.schedule_hours = 1
+    assert store.current.get('SCHEDULE_HOURS') == 6
@@ -0,0 +1,39 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import topic_selector
+from topic_selector import TopicSelector, hashed_features
+
+def test_hashed_features_are_normalized():
+    vector = hashed_features('Bitcoin ETF inflows, bitcoin ETF record')
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    assert not hashed_features('the of and').any()
+
+def test_without_history_the_top_trend_wins(tmp_path):
+    selector = TopicSelector(history_file=tmp_path / 'topics.json')
+    label, scores = selector.select(['Bitcoin ETF', 'Aave v4'])
+    assert label == 'Bitcoin ETF'
+    assert scores['Bitcoin ETF'] > scores['Aave v4']
+    assert selector.select([]) == (None, {})
+
+def test_recent_topics_are_avoided_until_they_fade(tmp_path, monkeypatch):
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(topic_selector.time, 'time', lambda: now[0])
+    path = tmp_path / 'topics.json'
+    selector = TopicSelector(history_file=path, half_life_hours=24)
+    selector.record('Bitcoin ETF', 'Bitcoin ETF inflows hit a new weekly record #Bitcoin')
+    assert selector.select(['Bitcoin ETF', 'Aave v4'])[0] == 'Aave v4'
+
+    # History is reloaded from disk and decays with age
+    now[0] += 30 * 24 * 3600
+    reloaded = TopicSelector(history_file=path, half_life_hours=24)
+    assert len(reloaded.entries) == 1
+    assert reloaded.select(['Bitcoin ETF', 'Aave v4'])[0] == 'Bitcoin ETF'
+
+def test_history_is_capped(tmp_path):
+    selector = TopicSelector(history_file=tmp_path / 'topics.json', max_entries=2)
+    for label in ('a', 'b', 'c'):
+        selector.record(label, f'tweet about {label}')
+    assert [entry['label'] for entry in selector.entries] == ['b', 'c']
+    assert selector.matrix.shape[0] == 2
@@ -0,0 +1,65 @@
+import pytest
+
+from trend_delta import TrendSnapshots, compute_delta, format_delta, prompt_mode
+
+def item(key, engagement, label=None):
+    return {'key': key, 'label': label or key.title(), 'engagement': engagement, 'text': f'{key} text'}
+
+def snapshot(*items):
+    return TrendSnapshots.snapshot(list(items))
+
+def test_compute_delta_classifies_entries_in_rank_order():
+    previous = snapshot(item('btc', 100), item('eth', 50), item('sol', 10), item('old', 5))
+    current = snapshot(item('new', 1), item('sol', 30), item('btc', 110), item('eth', 40))
+    delta = compute_delta(previous, current)
+    assert [entry['key'] for entry in delta['new']] == ['new']
+    assert [(entry['key'], entry['previous_engagement']) for entry in delta['rising']] == [('sol', 10)]
+    # +10% is below the rise ratio, a drop is unchanged too
+    assert [entry['key'] for entry in delta['unchanged']] == ['btc', 'eth']
+    assert [entry['key'] for entry in delta['dropped']] == ['old']
+
+def test_format_delta_lists_changes_and_baseline():
+    previous = snapshot(item('btc', 100), item('old', 5))
+    current = snapshot(item('new', 1), item('btc', 100))
+    text = format_delta(compute_delta(previous, current), age_hours=6)
+    assert text.startswith('WHAT CHANGED IN THE LAST 6.0 HOURS:')
+    assert 'NEW TOPICS:\n1. new text' in text
+    assert 'NO LONGER TRENDING: Old' in text
+    assert 'STILL TRENDING (background only):\n- Btc' in text
+
+def test_retries_compare_against_the_same_snapshot(tmp_path):
+    snapshots = TrendSnapshots(snapshot_file=tmp_path / 'snapshot.json')
+    snapshots.compare([item('btc', 100)], now=1000)
+    snapshots.commit()
+
+    first, _ = snapshots.compare([item('btc', 100), item('eth', 50)], now=2000)
+    retry, age_hours = snapshots.compare([item('btc', 100), item('eth', 50)], now=2100)
+    assert [entry['key'] for entry in first['new']] == ['eth']
+    assert retry == first
+    assert age_hours == pytest.approx(1100 / 3600)
+
+def test_commit_persists_and_discard_keeps_previous(tmp_path):
+    path = tmp_path / 'snapshot.json'
+    snapshots = TrendSnapshots(snapshot_file=path)
+    assert snapshots.compare([item('btc', 100)], now=1000) == (None, None)
+    snapshots.commit()
+
+    snapshots.compare([item('eth', 50)], now=2000)
+    snapshots.discard()
+    snapshots.commit()
+
+    reloaded = TrendSnapshots(snapshot_file=path)
+    assert reloaded.previous['taken_at'] == 1000
+    assert list(reloaded.previous['clusters']) == ['btc']
+    assert 'text' not in reloaded.previous['clusters']['btc']
+
+def test_stale_snapshot_is_not_compared(tmp_path):
+    snapshots = TrendSnapshots(snapshot_file=tmp_path / 'snapshot.json', max_age_hours=1)
+    snapshots.compare([item('btc', 100)], now=0)
+    snapshots.commit()
+    assert snapshots.compare([item('btc', 100)], now=7200) == (None, None)
+
+def test_prompt_mode_validation():
+    assert prompt_mode(' Delta ') == 'delta'
+    with pytest.raises(ValueError):
+        prompt_mode('summary')
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from tweet_length import MAX_WEIGHTED_LENGTH, URL_LENGTH, is_valid_length, weighted_length
+
+WEB_DIR = Path(__file__).resolve().parent.parent
+
+def test_ascii_counts_one_per_char():
+    assert weighted_length('') == 0
+    assert weighted_length('Bitcoin ETF inflows #Web3') == 25
+
+def test_urls_count_as_url_length():
+    assert weighted_length('https://membit.ai/reports/restaking-2025') == URL_LENGTH
+    assert weighted_length('read it here membit.ai/x.') == len('read it here ') + URL_LENGTH + 1
+
+def test_emoji_sequences_count_as_two():
+    assert weighted_length('🚀') == 2
+    assert weighted_length('👨‍👩‍👧') == 2        # ZWJ family
+    assert weighted_length('👍🏽') == 2          # skin tone modifier
+    assert weighted_length('🇮🇩') == 2          # flag
+    assert weighted_length('1️⃣') == 2          # keycap
+
+def test_cjk_counts_two_per_char():
+    assert weighted_length('以太坊') == 6
+    assert weighted_length('ETH 以太坊') == 4 + 6
+
+def test_is_valid_length_at_the_limit():
+    assert is_valid_length('a' * MAX_WEIGHTED_LENGTH)
+    assert not is_valid_length('a' * (MAX_WEIGHTED_LENGTH + 1))
+    assert not is_valid_length('以' * 141)
+    assert is_valid_length('以' * 5, max_length=10)
+
+def test_python_version_copy_is_identical():
+    web_copy = (WEB_DIR / 'tweet_length.py').read_text(encoding='utf-8')
+    python_copy = (WEB_DIR.parent / 'python-version' / 'tweet_length.py').read_text(encoding='utf-8')
+    assert web_copy == python_copy
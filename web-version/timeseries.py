@@ -0,0 +1,201 @@
+import math
+import time
+import threading
+
+# name -> (bucket seconds, number of buckets)
+RESOLUTIONS = {
+    'minute': (60, 180),    # last 3 hours
+    'hour': (3600, 168),    # last 7 days
+    'day': (86400, 90)      # last 90 days
+}
+
+# Pipeline stage -> upstream service, for upstream error rates
+UPSTREAMS = {
+    'membit_clusters_search': 'membit',
+    'membit_clusters_info': 'membit',
+    'membit_posts_search': 'membit',
+    'gemini_tweet': 'gemini',
+    'gemini_image_prompt': 'gemini',
+    'gemini_batch': 'gemini',
+    'pollinations': 'pollinations',
+    'media_upload': 'twitter',
+    'tweet_post': 'twitter',
+    'reconcile': 'twitter'
+}
+
+# Run outcomes counted as errors
+ERROR_OUTCOMES = ('failed', 'rate_limited', 'uncertain', 'duplicate')
+
+class Ring:
+    """
+    Fixed number of time buckets, each with count/sum/min/max
+
+    A slot is reused when its bucket falls out of the window, so memory
+    never grows with uptime.
+    """
+
+    def __init__(self, step, slots):
+        self.step = step
+        self.slots = slots
+        self.buckets = [-1] * slots
+        self.count = [0] * slots
+        self.total = [0.0] * slots
+        self.low = [0.0] * slots
+        self.high = [0.0] * slots
+
+    def add(self, ts, value):
+        bucket = int(ts // self.step)
+        i = bucket % self.slots
+        if self.buckets[i] > bucket:
+            return  # Older than the window
+        if self.buckets[i] != bucket:
+            self.buckets[i] = bucket
+            self.count[i] = 0
+            self.total[i] = 0.0
+            self.low[i] = value
+            self.high[i] = value
+        self.count[i] += 1
+        self.total[i] += value
+        if value < self.low[i]:
+            self.low[i] = value
+        if value > self.high[i]:
+            self.high[i] = value
+
+    def window(self, now):
+        """Buckets oldest -> newest ending at `now`: (first bucket, [(count, sum, min, max)])"""
+        last = int(now // self.step)
+        first = last - self.slots + 1
+        rows = []
+        for bucket in range(first, last + 1):
+            i = bucket % self.slots
+            if self.buckets[i] == bucket:
+                rows.append((self.count[i], self.total[i], self.low[i], self.high[i]))
+            else:
+                rows.append((0, 0.0, None, None))
+        return first, rows
+
+def downsample(rows, points):
+    """
+    Merge adjacent buckets so at most `points` remain
+    Groups are aligned to the newest bucket; oldest buckets that do not fill
+    a whole group are dropped so every point covers the same time span.
+    Returns: (rows, factor, dropped)
+    """
+    factor = max(1, math.ceil(len(rows) / points))
+    if factor == 1:
+        return rows, 1, 0
+    offset = len(rows) % factor
+    merged = [_merge(rows[i:i + factor]) for i in range(offset, len(rows), factor)]
+    return merged, factor, offset
+
+def _compact(value):
+    """3 decimals, whole numbers without the trailing .0 (smaller JSON)"""
+    value = round(value, 3)
+    return int(value) if value == int(value) else value
+
+def _merge(group):
+    count = sum(row[0] for row in group)
+    total = sum(row[1] for row in group)
+    lows = [row[2] for row in group if row[2] is not None]
+    highs = [row[3] for row in group if row[3] is not None]
+    return (count, total, min(lows) if lows else None, max(highs) if highs else None)
+
+class TimeSeriesStore:
+    """
+    In-process rolling statistics at minute, hour and day resolution
+
+    Every observation goes into one ring per resolution. Series are keyed by
+    name (successes, errors, retries, latency.<stage>, upstream_calls.<service>,
+    upstream_errors.<service>), a fixed set, so memory use is constant.
+    """
+
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.resolutions = resolutions
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, name, value=1, ts=None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            rings = self._series.get(name)
+            if rings is None:
+                rings = self._series[name] = {
+                    resolution: Ring(step, slots) for resolution, (step, slots) in self.resolutions.items()
+                }
+            for ring in rings.values():
+                ring.add(ts, value)
+
+    def names(self):
+        with self._lock:
+            return sorted(self._series)
+
+    def query(self, resolution='hour', names=None, limit=None, points=None, now=None):
+        """
+        Compact arrays for charting, one value per bucket oldest -> newest
+        limit: only the newest `limit` buckets, points: downsample to at most
+        this many values. Counters return `values`; latency series return
+        `count`, `avg` and `max` (ms). Upstream error rates are derived per bucket.
+        """
+        if resolution not in self.resolutions:
+            raise ValueError(f"Invalid resolution '{resolution}' (use {', '.join(self.resolutions)})")
+        now = time.time() if now is None else now
+        step, slots = self.resolutions[resolution]
+        if limit:
+            slots = max(1, min(int(limit), slots))
+        points = max(1, min(points or slots, slots))
+
+        with self._lock:
+            selected = [name for name in (names or sorted(self._series)) if name in self._series]
+            windows = {name: self._series[name][resolution].window(now) for name in selected}
+
+        first = int(now // step) - slots + 1
+        factor = max(1, math.ceil(slots / points))
+        dropped = slots % factor if factor > 1 else 0
+
+        result = {}
+        for name, (_, rows) in windows.items():
+            rows = downsample(rows[-slots:], points)[0]
+            if name.startswith('latency.'):
+                result[name] = {
+                    'count': [row[0] for row in rows],
+                    'avg': [round(row[1] / row[0] * 1000, 1) if row[0] else None for row in rows],
+                    'max': [round(row[3] * 1000, 1) if row[3] is not None else None for row in rows]
+                }
+            else:
+                result[name] = {'values': [_compact(row[1]) for row in rows]}
+
+        # Error rate per upstream service: errors / calls in each bucket
+        for name in list(result):
+            if name.startswith('upstream_calls.'):
+                service = name.split('.', 1)[1]
+                calls = result[name]['values']
+                errors = result.get(f'upstream_errors.{service}', {'values': [0] * len(calls)})['values']
+                result[f'upstream_error_rate.{service}'] = {
+                    'rate': [round(e / c, 3) if c else None for e, c in zip(errors, calls)]
+                }
+
+        return {
+            'resolution': resolution,
+            'step': step * factor,
+            'start': (first + dropped) * step,
+            'series': result
+        }
+
+    def on_metric(self, name, value, labels):
+        """Registry listener: turn metric observations into series"""
+        if name == 'bot_runs_total':
+            outcome = labels.get('outcome')
+            if outcome == 'success':
+                self.record('successes', value)
+            elif outcome in ERROR_OUTCOMES:
+                self.record('errors', value)
+        elif name == 'bot_retries_total':
+            self.record('retries', value)
+        elif name == 'bot_stage_duration_seconds':
+            stage = labels.get('stage')
+            self.record(f'latency.{stage}', value)
+            service = UPSTREAMS.get(stage)
+            if service:
+                self.record(f'upstream_calls.{service}')
+                if labels.get('outcome') == 'error':
+                    self.record(f'upstream_errors.{service}')
@@ -0,0 +1,107 @@
+import re
+import json
+import time
+import zlib
+import threading
+from pathlib import Path
+import numpy as np
+
+NUM_FEATURES = 1024
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with'.split()
+)
+
+def hashed_features(text):
+    """L2-normalized hashed bag of words and bigrams"""
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+    features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+    vector = np.zeros(NUM_FEATURES, dtype=np.float32)
+    if not features:
+        return vector
+
+    indices = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features), dtype=np.uint32, count=len(features))
+    np.add.at(vector, indices % NUM_FEATURES, 1.0)
+    np.log1p(vector, out=vector)  # Damp repeated terms
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class TopicSelector:
+    """
+    Pick the trending cluster least similar to recently covered topics
+
+    Recently used cluster labels and tweet texts are kept as rows of a
+    hashed-feature matrix. Candidates are scored in one matrix product by
+    cosine dissimilarity, weighted by how recent each past topic is.
+    """
+
+    def __init__(self, history_file='data/topic_history.json', max_entries=50,
+                 half_life_hours=24, rank_weight=0.15):
+        self.history_path = Path(__file__).parent / history_file
+        self.max_entries = max_entries
+        self.half_life = half_life_hours * 3600
+        self.rank_weight = rank_weight
+        self._lock = threading.Lock()
+        self.entries = self._load_history()
+        self.matrix = self._build_matrix(self.entries)
+
+    def _load_history(self):
+        """Load recent topics from file"""
+        if self.history_path.exists():
+            try:
+                with open(self.history_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)[-self.max_entries:]
+            except (OSError, ValueError):
+                pass
+        return []
+
+    def _save_history(self):
+        """Save recent topics to file"""
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.history_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        tmp_path.replace(self.history_path)
+
+    @staticmethod
+    def _build_matrix(entries):
+        """Feature matrix with one row per past topic"""
+        if not entries:
+            return np.zeros((0, NUM_FEATURES), dtype=np.float32)
+        return np.stack([hashed_features(f"{e.get('label') or ''} {e.get('text') or ''}") for e in entries])
+
+    def select(self, labels):
+        """
+        Choose the most novel label, trending rank breaks ties
+        Returns: (label, scores) where scores maps label -> score
+        """
+        if not labels:
+            return None, {}
+
+        candidates = np.stack([hashed_features(label) for label in labels])
+
+        with self._lock:
+            if len(self.entries):
+                ages = time.time() - np.array([e['timestamp'] for e in self.entries], dtype=np.float64)
+                recency = np.power(0.5, np.maximum(ages, 0) / self.half_life).astype(np.float32)
+                similarity = (candidates @ self.matrix.T) * recency  # (labels, history)
+                novelty = 1.0 - similarity.max(axis=1)
+            else:
+                novelty = np.ones(len(labels), dtype=np.float32)
+
+        # Labels come sorted by trend, keep a small preference for the top ones
+        rank_bonus = self.rank_weight * (1.0 - np.arange(len(labels)) / len(labels))
+        scores = novelty + rank_bonus
+
+        best = int(scores.argmax())
+        return labels[best], {label: round(float(score), 3) for label, score in zip(labels, scores)}
+
+    def record(self, label, text):
+        """Record the topic of a posted tweet"""
+        entry = {'label': label, 'text': text, 'timestamp': time.time()}
+        with self._lock:
+            self.entries = (self.entries + [entry])[-self.max_entries:]
+            row = hashed_features(f"{label or ''} {text or ''}")
+            self.matrix = np.vstack([self.matrix, row[None, :]])[-self.max_entries:]
+            self._save_history()
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_local = threading.local()
+
+def current_trace():
+    """Trace of the run executing on this thread, if any"""
+    return getattr(_local, 'trace', None)
+
+class Span:
+    """One timed stage of a run"""
+
+    def __init__(self, trace, name, parent, attributes):
+        self.trace = trace
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes)
+        self.start = time.perf_counter()
+        self.end = None
+        self.outcome = 'success'
+        self.index = None
+
+    def set(self, **attributes):
+        """Attach attributes (payload sizes, token counts, HTTP status, ...)"""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def close(self, outcome=None):
+        """End the span (spans still open when the run ends are closed then)"""
+        if self.end is not None:
+            return
+        self.end = time.perf_counter()
+        if outcome:
+            self.outcome = outcome
+        if self.trace is not None and self.index in self.trace._stack:
+            self.trace._stack.remove(self.index)
+
+    def to_row(self):
+        # Compact row: [name, parent index, start ms, duration ms, outcome, attributes]
+        start_ms = (self.start - self.trace.start) * 1000
+        duration_ms = ((self.end or time.perf_counter()) - self.start) * 1000
+        return [self.name, self.parent, round(start_ms, 1), round(duration_ms, 1), self.outcome, self.attributes]
+
+class Trace:
+    """
+    Span timings of one pipeline run
+
+    Span start/end use the monotonic clock relative to the start of the run,
+    the wall clock is only recorded once for the run itself.
+    """
+
+    def __init__(self, name='run'):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.outcome = None
+        self.attributes = {}
+        self.spans = []
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def begin(self, name, **attributes):
+        """Open a span nested under the innermost open span"""
+        with self._lock:
+            span = Span(self, name, self._stack[-1] if self._stack else None, attributes)
+            span.index = len(self.spans)
+            self.spans.append(span)
+            self._stack.append(span.index)
+        return span
+
+    def begin_child(self, parent, name, **attributes):
+        """
+        Open a span under `parent` for work running on another thread
+        It is not put on the nesting stack, so concurrent children do not
+        nest under each other.
+        """
+        with self._lock:
+            span = Span(self, name, parent.index if parent is not None else None, attributes)
+            span.index = len(self.spans)
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span = self.begin(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            span.close('error')
+            raise
+        finally:
+            span.close()
+
+    def finish(self, outcome):
+        for index in reversed(self._stack):
+            self.spans[index].close()
+        self.end = time.perf_counter()
+        self.outcome = outcome
+
+    def to_dict(self):
+        return {
+            'id': self.trace_id,
+            'name': self.name,
+            'started_at': round(self.started_at, 3),
+            'duration_ms': round(((self.end or time.perf_counter()) - self.start) * 1000, 1),
+            'outcome': self.outcome,
+            'attributes': self.attributes,
+            'spans': [span.to_row() for span in self.spans]
+        }
+
+def begin_span(name, **attributes):
+    """Open a span on the current run's trace, close it with span.close()"""
+    trace = current_trace()
+    if trace is None:
+        return Span(None, name, None, attributes)
+    return trace.begin(name, **attributes)
+
+@contextmanager
+def span(name, **attributes):
+    """Record a span on the current run's trace (no-op outside a run)"""
+    trace = current_trace()
+    if trace is None:
+        yield Span(None, name, None, attributes)
+        return
+    with trace.span(name, **attributes) as s:
+        yield s
+
+def waterfall(record):
+    """Expand a stored trace into a waterfall (one dict per span, with depth)"""
+    depths = []
+    spans = []
+    for name, parent, start_ms, duration_ms, outcome, attributes in record['spans']:
+        depth = 0 if parent is None else depths[parent] + 1
+        depths.append(depth)
+        spans.append({
+            'name': name,
+            'parent': parent,
+            'depth': depth,
+            'start_ms': start_ms,
+            'duration_ms': duration_ms,
+            'outcome': outcome,
+            'attributes': attributes
+        })
+    result = {key: value for key, value in record.items() if key != 'spans'}
+    result['spans'] = spans
+    return result
+
+class TraceStore:
+    """
+    Append-only JSON lines file of finished traces
+
+    An in-memory index maps trace id -> file offset, so any past run is read
+    with one seek. The index is extended by scanning new lines on lookup,
+    which also picks up traces written by the worker process. When the file
+    holds more than max_traces, it is rewritten with the newest half.
+    """
+
+    def __init__(self, trace_file='data/traces.jsonl', max_traces=1000):
+        self.trace_file = Path(__file__).parent / trace_file
+        self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        self._index = OrderedDict()
+        self._scanned = 0
+
+    @contextmanager
+    def run(self, name='run'):
+        """Trace a run on this thread; yields the Trace"""
+        trace = Trace(name)
+        _local.trace = trace
+        try:
+            yield trace
+        except BaseException:
+            trace.finish('error')
+            raise
+        finally:
+            _local.trace = None
+            if trace.end is None:
+                # Returned without an outcome (stopped mid-run)
+                trace.finish('incomplete')
+            try:
+                self.save(trace)
+            except Exception:
+                pass
+
+    def save(self, trace):
+        """Append a finished trace"""
+        line = json.dumps(trace.to_dict(), separators=(',', ':'), ensure_ascii=False) + '\n'
+        with self._lock:
+            self._scan()
+            with open(self.trace_file, 'a', encoding='utf-8') as f:
+                offset = f.tell()
+                f.write(line)
+            self._index[trace.trace_id] = offset
+            self._scanned = offset + len(line.encode('utf-8'))
+            if len(self._index) > self.max_traces:
+                self._compact()
+
+    def _scan(self):
+        """Index lines appended since the last scan"""
+        if not self.trace_file.exists():
+            self._index.clear()
+            self._scanned = 0
+            return
+        size = self.trace_file.stat().st_size
+        if size < self._scanned:
+            # Rewritten (compacted) by another process, start over
+            self._index.clear()
+            self._scanned = 0
+        if size == self._scanned:
+            return
+        with open(self.trace_file, 'rb') as f:
+            f.seek(self._scanned)
+            offset = self._scanned
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partial line still being written
+                try:
+                    self._index[json.loads(line)['id']] = offset
+                except (ValueError, KeyError):
+                    pass
+                offset += len(line)
+            self._scanned = offset
+
+    def _compact(self):
+        keep = list(self._index.values())[-(self.max_traces // 2):]
+        with open(self.trace_file, 'rb') as f:
+            lines = []
+            for offset in keep:
+                f.seek(offset)
+                lines.append(f.readline())
+        tmp = self.trace_file.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.writelines(lines)
+        os.replace(tmp, self.trace_file)
+        self._index.clear()
+        self._scanned = 0
+        self._scan()
+
+    def _read(self, offset):
+        with open(self.trace_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def get(self, trace_id):
+        """Stored trace by id, or None"""
+        with self._lock:
+            self._scan()
+            offset = self._index.get(trace_id)
+            if offset is None:
+                return None
+            record = self._read(offset)
+            if record.get('id') != trace_id:
+                # File was compacted under us, reindex once
+                self._index.clear()
+                self._scanned = 0
+                self._scan()
+                offset = self._index.get(trace_id)
+                return self._read(offset) if offset is not None else None
+            return record
+
+    def recent(self, limit=20):
+        """Summaries of the newest traces, newest first"""
+        with self._lock:
+            self._scan()
+            offsets = list(self._index.values())[-limit:][::-1]
+            records = [self._read(offset) for offset in offsets]
+        return [{key: value for key, value in record.items() if key not in ('spans', 'attributes')} for record in records]
@@ -0,0 +1,143 @@
+import json
+import time
+import threading
+from pathlib import Path
+from atomic_file import atomic_write, file_lock
+
+PROMPT_MODES = ('full', 'delta')
+
+def prompt_mode(value):
+    """Validate a Membit prompt mode ('full' or 'delta')"""
+    mode = str(value).strip().lower()
+    if mode not in PROMPT_MODES:
+        raise ValueError(f"must be one of {', '.join(PROMPT_MODES)}, got '{value}'")
+    return mode
+
+def compute_delta(previous, current, rise_ratio=1.25):
+    """
+    Compare two snapshots ({key: {label, engagement, rank, ...}}) in O(n)
+    Returns: {new, rising, dropped, unchanged}, lists of snapshot entries in
+    current rank order (dropped in previous rank order). Rising entries have
+    engagement at least `rise_ratio` times what it was and carry
+    'previous_engagement'.
+    """
+    delta = {'new': [], 'rising': [], 'dropped': [], 'unchanged': []}
+    for key, entry in current.items():
+        before = previous.get(key)
+        if before is None:
+            delta['new'].append(entry)
+        elif entry['engagement'] > before['engagement'] and entry['engagement'] >= before['engagement'] * rise_ratio:
+            delta['rising'].append(dict(entry, previous_engagement=before['engagement']))
+        else:
+            delta['unchanged'].append(entry)
+    delta['dropped'] = [entry for key, entry in previous.items() if key not in current]
+
+    for entries in delta.values():
+        entries.sort(key=lambda entry: entry['rank'])
+    return delta
+
+def _change(before, after):
+    if not before:
+        return f'engagement {after:g}, was 0'
+    return f'engagement {before:g} -> {after:g}, +{(after / before - 1) * 100:.0f}%'
+
+def format_delta(delta, age_hours, baseline=3):
+    """Prompt text for a delta: new and rising topics in full, then a short baseline"""
+    sections = [f"WHAT CHANGED IN THE LAST {age_hours:.1f} HOURS:"]
+    if delta['new']:
+        sections.append('NEW TOPICS:\n' + '\n\n'.join(
+            f"{idx}. {entry['text']}" for idx, entry in enumerate(delta['new'], 1)
+        ))
+    if delta['rising']:
+        sections.append('RISING TOPICS:\n' + '\n\n'.join(
+            f"{idx}. {entry['text']}\n({_change(entry['previous_engagement'], entry['engagement'])})"
+            for idx, entry in enumerate(delta['rising'], 1)
+        ))
+    if delta['dropped']:
+        sections.append('NO LONGER TRENDING: ' + ', '.join(entry['label'] or entry['key'] for entry in delta['dropped']))
+    if delta['unchanged'] and baseline:
+        sections.append('STILL TRENDING (background only):\n' + '\n'.join(
+            f"- {entry['label'] or entry['text'][:80]}" for entry in delta['unchanged'][:baseline]
+        ))
+    return '\n\n'.join(sections)
+
+class TrendSnapshots:
+    """
+    Last trending snapshot, to tell what changed between runs
+
+    Only the ranked clusters of the previous run are kept (key, label,
+    engagement, rank), in memory and in a small JSON file so the delta
+    survives restarts. A run's snapshot replaces it only once the run
+    posted or queued something from that data. A snapshot older than `max_age_hours` is not
+    compared against.
+    """
+
+    def __init__(self, snapshot_file='data/trend_snapshot.json', max_age_hours=72):
+        self.snapshot_path = Path(__file__).parent / snapshot_file
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self.previous = self._load_snapshot()
+        self.pending = None
+
+    def _load_snapshot(self):
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if isinstance(snapshot.get('clusters'), dict):
+                    return snapshot
+            except (OSError, ValueError, AttributeError):
+                pass
+        return None
+
+    @staticmethod
+    def snapshot(items):
+        """Snapshot of merge_ranked cluster items, keyed by cluster key"""
+        return {
+            item['key']: {
+                'key': item['key'],
+                'label': item['label'],
+                'engagement': item['engagement'],
+                'rank': rank,
+                'text': item['text']
+            }
+            for rank, item in enumerate(items)
+        }
+
+    def compare(self, items, now=None):
+        """
+        Compare ranked cluster items with the previous snapshot, keep them as pending
+        Retries within a run compare against the same previous snapshot;
+        commit() makes the pending snapshot the one the next run compares to.
+        Returns: (delta, age in hours), or (None, None) without a usable previous snapshot
+        """
+        now = time.time() if now is None else now
+        current = self.snapshot(items)
+        with self._lock:
+            previous = self.previous
+            self.pending = {'taken_at': now, 'clusters': current}
+
+        if previous is None or now - previous['taken_at'] > self.max_age:
+            return None, None
+        return compute_delta(previous['clusters'], current), (now - previous['taken_at']) / 3600
+
+    def discard(self):
+        """Forget the pending snapshot (its run did not use the data)"""
+        with self._lock:
+            self.pending = None
+
+    def commit(self):
+        """Keep the pending snapshot as the previous one (its data was posted or queued)"""
+        with self._lock:
+            if self.pending is None:
+                return
+            self.previous, self.pending = self.pending, None
+            stored = {
+                'taken_at': self.previous['taken_at'],
+                'clusters': {
+                    key: {k: v for k, v in entry.items() if k != 'text'}
+                    for key, entry in self.previous['clusters'].items()
+                }
+            }
+            with file_lock(self.snapshot_path):
+                atomic_write(self.snapshot_path, json.dumps(stored, ensure_ascii=False))
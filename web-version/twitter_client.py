@@ -1,4 +1,27 @@
+import time
+import functools
 import tweepy
+import requests
+from tweet_length import weighted_length, MAX_WEIGHTED_LENGTH
+
+# Seconds before a Twitter call gives up, a hung post surfaces as UncertainPostError
+REQUEST_TIMEOUT = 30
+
+class RateLimitError(Exception):
+    """Raised when Twitter answers 429 Too Many Requests"""
+    
+    def __init__(self, message, reset_at):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+class UncertainPostError(Exception):
+    """Raised when a post may or may not have been accepted (timeout, 5xx)"""
+
+class DuplicateTweetError(Exception):
+    """Raised when Twitter rejects a post as duplicate content"""
+
+class TimelineUnavailableError(Exception):
+    """Raised when the API access level does not allow reading the timeline (403, e.g. Free tier)"""
 
 class TwitterClient:
     """Client for Twitter API v2"""
@@ -11,18 +34,24 @@ class TwitterClient:
             access_token=access_token,
             access_token_secret=access_secret
         )
+        # tweepy.Client has no timeout option and requests waits forever by default
+        self.client.session.request = functools.partial(self.client.session.request, timeout=REQUEST_TIMEOUT)
         
         # Also authenticate v1.1 API for media upload
         auth = tweepy.OAuth1UserHandler(
             api_key, api_secret, access_token, access_secret
         )
-        self.api_v1 = tweepy.API(auth)
+        self.api_v1 = tweepy.API(auth, timeout=REQUEST_TIMEOUT)
+        self._user_id = None
+        self._timeline_forbidden = False
     
     def upload_media(self, image_path):
         """Upload media to Twitter (v1.1 API)"""
         try:
             media = self.api_v1.media_upload(image_path)
             return media.media_id
+        except tweepy.TooManyRequests as e:
+            raise self._rate_limit_error(e, "Media upload rate limited")
         except Exception as e:
             raise Exception(f"Failed to upload media: {str(e)}")
     
@@ -30,8 +59,9 @@ class TwitterClient:
         """Post a tweet with optional media"""
         try:
             # Validate tweet length
-            if len(text) > 280:
-                raise ValueError(f"Tweet too long: {len(text)} characters (max 280)")
+            tweet_length = weighted_length(text)
+            if tweet_length > MAX_WEIGHTED_LENGTH:
+                raise ValueError(f"Tweet too long: {tweet_length} characters (max {MAX_WEIGHTED_LENGTH})")
             
             if len(text) == 0:
                 raise ValueError("Tweet cannot be empty")
@@ -50,5 +80,52 @@ class TwitterClient:
                 'id': response.data['id'],
                 'text': text
             }
+        except tweepy.TooManyRequests as e:
+            raise self._rate_limit_error(e, "Tweet rate limited")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, tweepy.TwitterServerError) as e:
+            raise UncertainPostError(f"Post outcome unknown: {str(e)}")
+        except tweepy.Forbidden as e:
+            if 'duplicate' in str(e).lower():
+                raise DuplicateTweetError(f"Duplicate tweet: {str(e)}")
+            raise Exception(f"Failed to post tweet: {str(e)}")
         except Exception as e:
             raise Exception(f"Failed to post tweet: {str(e)}")
+    
+    def get_recent_tweets(self, max_results=10):
+        """Get recent tweets from the authenticated user's timeline"""
+        if self._timeline_forbidden:
+            raise TimelineUnavailableError("Reading the timeline is not allowed with this API access level")
+        try:
+            if not self._user_id:
+                me = self.client.get_me(user_auth=True)
+                self._user_id = me.data.id
+            
+            response = self.client.get_users_tweets(
+                id=self._user_id,
+                max_results=max(5, min(max_results, 100)),
+                user_auth=True
+            )
+            return [{'id': str(tweet.id), 'text': tweet.text} for tweet in (response.data or [])]
+        except tweepy.Forbidden as e:
+            # get_me/get_users_tweets need the Basic tier, don't ask again
+            self._timeline_forbidden = True
+            raise TimelineUnavailableError(f"Reading the timeline is not allowed with this API access level: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to read timeline: {str(e)}")
+    
+    def _rate_limit_error(self, error, message):
+        """Build RateLimitError with the reset time from the 429 response headers"""
+        headers = getattr(error.response, 'headers', None) or {}
+        reset_at = 0
+        for prefix in ('x-user-limit-24hour', 'x-app-limit-24hour', 'x-rate-limit'):
+            # Only honour a window that is actually exhausted
+            if headers.get(f'{prefix}-remaining', '0') != '0':
+                continue
+            try:
+                reset_at = max(reset_at, int(headers.get(f'{prefix}-reset', 0)))
+            except (TypeError, ValueError):
+                continue
+        if not reset_at:
+            # No header, fall back to the 15 minute window
+            reset_at = int(time.time()) + 15 * 60
+        return RateLimitError(f"{message} (429), resets at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reset_at))}", reset_at)